@@ -0,0 +1,182 @@
+"""이미지 검색 인덱스 벤치마크
+
+CLIP 임베딩과 비슷하게 군집을 이루는 합성 512차원 벡터로
+common.vector_index의 인덱스 종류(flat, ivf, hnsw, pq)별
+재현율(recall@1, recall@k), 질의당 지연 시간, 인덱스 크기, 생성 시간을 비교한다.
+
+질의의 절반은 저장된 벡터와 코사인 유사도가 --dup-cosine이 되도록 잡음을 더한
+근사 중복(재업로드 이미지), 나머지 절반은 새 벡터다. 정답은 flat(정확 검색) 결과이며,
+근사 중복 질의는 --thresholds의 각 코사인 유사도로 원본을 찾았는지(중복 판정률)도
+함께 출력한다 (pq는 유사도가 근사값이라 높은 임계값에서 판정률이 떨어진다).
+
+실행: python -m benchmark.index_benchmark [--sizes 10000 100000 1000000] [--types flat hnsw]
+(1M 벡터는 원본만 2GB이므로 여유 메모리가 8GB 이상일 때 실행)
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from common import vector_index
+
+DIM = 512
+
+
+def make_vectors(num_vectors, dim, num_clusters=256, seed=0, block=100_000):
+    """군집 중심 주변에 분포한 L2 정규화 벡터 (block 단위로 생성해 임시 메모리 제한)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    vectors = np.empty((num_vectors, dim), dtype=np.float32)
+    for start in range(0, num_vectors, block):
+        count = min(block, num_vectors - start)
+        labels = rng.integers(0, num_clusters, count)
+        noise = rng.standard_normal((count, dim)).astype(np.float32)
+        vectors[start : start + count] = centers[labels] + 0.8 * noise
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_queries(vectors, num_queries, dup_cosine=0.995, seed=1):
+    """(질의 벡터, 근사 중복 원본 id 또는 -1)
+
+    단위 벡터에 표준편차 σ인 dim차원 잡음을 더하면 잡음 노름이 약 σ·√dim이므로
+    원본과의 코사인 유사도는 약 1/√(1 + σ²·dim)이다. 이 값이 dup_cosine이 되도록
+    σ를 정해 차원이 바뀌어도 근사 중복의 유사도가 같게 한다.
+    """
+    rng = np.random.default_rng(seed)
+    dim = vectors.shape[1]
+    sigma = math.sqrt(1 / dup_cosine**2 - 1) / math.sqrt(dim)
+    num_duplicates = num_queries // 2
+    sources = rng.integers(0, len(vectors), num_duplicates)
+    duplicates = vectors[sources] + sigma * rng.standard_normal(
+        (num_duplicates, dim)
+    ).astype(np.float32)
+    fresh = make_vectors(num_queries - num_duplicates, dim, seed=seed + 1)
+    queries = vector_index.normalize(np.vstack([duplicates, fresh]))
+    expected = np.concatenate(
+        [sources, np.full(num_queries - num_duplicates, -1)]
+    ).astype(np.int64)
+    return queries, expected
+
+
+def index_size_mb(index):
+    """직렬화한 인덱스 파일 크기 (MB)"""
+    fd, path = tempfile.mkstemp(suffix=".faiss")
+    os.close(fd)
+    try:
+        faiss.write_index(index, path)
+        return os.path.getsize(path) / (1024 * 1024)
+    finally:
+        os.remove(path)
+
+
+def build(index_type, vectors, params):
+    """인덱스 생성 (학습 표본은 클러스터당 64개로 제한해 1M에서도 학습 시간을 억제)"""
+    index = vector_index.build_index(index_type, vectors.shape[1], len(vectors), **params)
+    if not index.is_trained:
+        nlist = faiss.extract_index_ivf(index).nlist
+        sample = np.random.default_rng(2).permutation(len(vectors))[: 64 * nlist]
+        index.train(vectors[np.sort(sample)])
+    index = vector_index.with_ids(index)
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    vector_index.configure_search(index, **params)
+    return index
+
+
+def measure(index, queries, k, batch_size):
+    """(질의당 평균 지연 ms, 유사도, id)"""
+    begin = time.perf_counter()
+    similarities, ids = vector_index.search(index, queries, k, batch_size=batch_size)
+    latency_ms = (time.perf_counter() - begin) * 1000 / len(queries)
+    return latency_ms, similarities, ids
+
+
+def recall(ids, truth, k):
+    """정확 검색 top-k 중 찾은 비율 평균"""
+    hits = [len(set(row[:k]) & set(expected[:k])) for row, expected in zip(ids, truth)]
+    return float(np.mean(hits)) / k
+
+
+def duplicate_rate(similarities, ids, expected, threshold):
+    """근사 중복 질의 중 원본을 threshold 이상 유사도로 찾은 비율"""
+    mask = expected >= 0
+    found = (ids[mask, 0] == expected[mask]) & (similarities[mask, 0] >= threshold)
+    return float(found.mean()) if mask.any() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 검색 인덱스 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--types", nargs="*", default=list(vector_index.INDEX_TYPES))
+    parser.add_argument("--dim", type=int, default=DIM)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256, help="검색 배치 크기")
+    parser.add_argument("--nprobe", type=int, default=vector_index.DEFAULT_PARAMS["nprobe"])
+    parser.add_argument(
+        "--ef-search", type=int, default=vector_index.DEFAULT_PARAMS["ef_search"]
+    )
+    parser.add_argument("--pq-m", type=int, default=vector_index.DEFAULT_PARAMS["pq_m"])
+    parser.add_argument(
+        "--dup-cosine", type=float, default=0.995, help="근사 중복 질의와 원본의 코사인 유사도"
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="*",
+        default=[0.95, 0.98, 0.99, 0.995],
+        help="중복 판정 코사인 유사도 (각각 중복 판정률 출력)",
+    )
+    parser.add_argument(
+        "--warn-build-sec", type=float, default=60, help="생성 시간이 이보다 길면 경고"
+    )
+    args = parser.parse_args()
+
+    params = {"nprobe": args.nprobe, "ef_search": args.ef_search, "pq_m": args.pq_m}
+
+    dup_header = " ".join(f"{f'dup@{t:g}':>9}" for t in args.thresholds)
+    print(
+        f"{'size':>9} {'type':<6} {'build(s)':>9} {'ms/query':>9} "
+        f"{'recall@1':>9} {f'recall@{args.k}':>10} {dup_header} {'size(MB)':>9}"
+    )
+    for size in args.sizes:
+        vectors = make_vectors(size, args.dim)
+        queries, expected = make_queries(vectors, args.queries, args.dup_cosine)
+
+        exact = build("flat", vectors, params)
+        _, _, truth = measure(exact, queries, args.k, args.batch_size)
+        del exact
+
+        for index_type in args.types:
+            begin = time.perf_counter()
+            index = build(index_type, vectors, params)
+            build_sec = time.perf_counter() - begin
+
+            if build_sec > args.warn_build_sec:
+                print(
+                    f"경고: {size}개 {index_type} 인덱스 생성에 {build_sec:.0f}초 소요 "
+                    f"(--warn-build-sec {args.warn_build_sec:g})",
+                    file=sys.stderr,
+                )
+
+            latency_ms, similarities, ids = measure(index, queries, args.k, args.batch_size)
+            dups = " ".join(
+                f"{duplicate_rate(similarities, ids, expected, threshold):>9.3f}"
+                for threshold in args.thresholds
+            )
+            print(
+                f"{size:>9} {index_type:<6} {build_sec:>9.2f} {latency_ms:>9.3f} "
+                f"{recall(ids, truth, 1):>9.3f} {recall(ids, truth, args.k):>10.3f} "
+                f"{dups} {index_size_mb(index):>9.1f}"
+            )
+            del index
+
+
+if __name__ == "__main__":
+    main()
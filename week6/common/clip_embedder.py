@@ -0,0 +1,81 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+def upload_key(file):
+    """업로드 파일 식별 키 (Streamlit file_id, 없으면 내용 해시)"""
+    file_id = getattr(file, "file_id", None)
+    if file_id:
+        return file_id
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+
+def load_image(data):
+    """업로드 바이트를 RGB 이미지로 디코딩"""
+    image = Image.open(BytesIO(data))
+    return image.convert("RGB")
+
+
+class ClipEmbedder:
+    """CLIP 이미지 임베딩을 배치 단위로 계산
+
+    이미지 디코딩과 CLIPProcessor 전처리는 스레드 풀에서 배치별로 수행하고,
+    모델은 batch_size장씩 한 번의 forward로 처리한다.
+    현재 배치를 추론하는 동안 다음 배치 하나만 미리 전처리하므로
+    전처리된 텐서는 많아야 두 배치 분량만 메모리에 올라간다.
+    """
+
+    def __init__(self, model, processor, device, batch_size=16, num_workers=4):
+        self.model = model
+        self.processor = processor
+        self.device = device
+        self.batch_size = max(1, batch_size)
+        self.num_workers = max(1, num_workers)
+
+    def _preprocess(self, images):
+        return self.processor(images=images, return_tensors="pt")["pixel_values"]
+
+    def embed_images(self, images):
+        """PIL 이미지 목록 → (N, D) float32 임베딩"""
+        if not images:
+            return np.zeros((0, self.model.config.projection_dim), dtype=np.float32)
+
+        batches = [
+            images[i : i + self.batch_size]
+            for i in range(0, len(images), self.batch_size)
+        ]
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(self._preprocess, batches[0])
+            for next_batch in batches[1:] + [None]:
+                pixel_values = pending.result()
+                if next_batch is not None:
+                    # 현재 배치를 추론하는 동안 다음 배치 전처리
+                    pending = executor.submit(self._preprocess, next_batch)
+                with torch.inference_mode():
+                    features = self.model.get_image_features(
+                        pixel_values=pixel_values.to(self.device)
+                    )
+                results.append(features.cpu().numpy().astype(np.float32))
+        return np.concatenate(results)
+
+    def embed_texts(self, texts):
+        """텍스트 목록 → (N, D) float32 임베딩 (CLIP 텍스트 인코더, 77토큰 초과분은 잘림)"""
+        inputs = self.processor(
+            text=list(texts), return_tensors="pt", padding=True, truncation=True
+        )
+        with torch.inference_mode():
+            features = self.model.get_text_features(
+                **{name: tensor.to(self.device) for name, tensor in inputs.items()}
+            )
+        return features.cpu().numpy().astype(np.float32)
+
+    def load_images(self, datas):
+        """이미지 바이트 목록을 병렬 디코딩"""
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            return list(executor.map(load_image, datas))
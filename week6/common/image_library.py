@@ -0,0 +1,395 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+from io import BytesIO
+
+import faiss
+import numpy as np
+from PIL import Image
+
+from common import vector_index
+
+THUMBNAIL_SIZE = (256, 256)
+
+# 인덱스 벡터까지 메모리 맵으로 읽는 플래그 (IO_FLAG_MMAP_IFC가 없는 버전은 IVF 리스트만 매핑)
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+def hash_bytes(data):
+    """이미지 원본 바이트의 내용 해시"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(image):
+    """64비트 차이 해시(dHash): 크기 조정/재압축된 같은 사진은 비트 차이가 작다"""
+    small = image.convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _to_signed(value):
+    # sqlite INTEGER는 부호 있는 64비트
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def estimate_image_tokens(width, height):
+    """OpenAI 비전 모델(detail=high)의 이미지 입력 토큰 수 추정
+
+    2048px 안으로, 짧은 변 768px 이하로 줄인 뒤 512px 타일당 170토큰 + 기본 85토큰
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+def encode_jpeg(data, max_side, quality=85):
+    """긴 변을 max_side 이하로 줄인 JPEG 바이트와 (너비, 높이)"""
+    image = Image.open(BytesIO(data)).convert("RGB")
+    image.thumbnail((max_side, max_side))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue(), image.size
+
+
+def make_thumbnail(image):
+    """썸네일 JPEG 바이트"""
+    thumbnail = image.convert("RGB")
+    thumbnail.thumbnail(THUMBNAIL_SIZE)
+    buffer = BytesIO()
+    thumbnail.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class ImageLibrary:
+    """디스크에 유지되는 이미지 라이브러리
+
+    <directory>/
+        index.faiss     FAISS 인덱스 (L2 정규화 벡터의 내적, 이미지 id = FAISS id)
+        library.db      메타데이터 (id → 원본 경로, 파일명, 해시, 지각 해시, 썸네일 위치)
+                        + 다른 바이트지만 같은 이미지로 판정된 내용 해시 별칭
+        thumbnails.bin  썸네일 JPEG를 이어 붙인 파일 (메타데이터의 offset/size로 읽음)
+        images/         원본 이미지 (<해시>.<확장자>)
+
+    시작할 때 인덱스를 메모리 맵으로 열기 때문에 라이브러리 크기와 관계없이 바로 로드된다.
+    추가/삭제가 생기면 그때 인덱스를 메모리로 읽어 변경 후 임시 파일을 거쳐 교체 저장한다.
+    여러 세션(스레드)에서 함께 사용해도 된다.
+
+    index_type이 flat이 아니어도 이미지가 train_size장 미만일 때는 정확 검색(flat)을 쓰고,
+    train_size장에 도달하면 그때까지의 벡터로 학습해 설정한 인덱스로 다시 만든다.
+    """
+
+    def __init__(self, directory, dim=512, index_type="flat", train_size=2048, **index_params):
+        vector_index.validate_params(index_type, dim, train_size, **index_params)
+        self.directory = directory
+        self.dim = dim
+        self.index_type = index_type
+        self.train_size = train_size
+        self.index_params = index_params
+        self.index_path = os.path.join(directory, "index.faiss")
+        self.thumbnail_path = os.path.join(directory, "thumbnails.bin")
+        self.image_dir = os.path.join(directory, "images")
+        os.makedirs(self.image_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "library.db"), check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS images (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                name TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                phash INTEGER,
+                thumb_offset INTEGER NOT NULL,
+                thumb_size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS images_hash ON images (hash);
+            CREATE TABLE IF NOT EXISTS hash_aliases (
+                hash TEXT PRIMARY KEY,
+                image_id INTEGER NOT NULL
+            );
+            """
+        )
+        self._phashes = None  # (id 배열, 지각 해시 배열) 지연 로드
+        self.index, self._writable = self._load_index()
+        self._reconcile()
+
+    def _load_index(self):
+        """(인덱스, 쓰기 가능 여부) 반환"""
+        if not os.path.exists(self.index_path):
+            return vector_index.rebuild("flat", self.dim, [], []), True
+        try:
+            index, writable = faiss.read_index(self.index_path, MMAP_FLAGS), False
+        except RuntimeError:
+            # 메모리 맵을 지원하지 않는 인덱스 형식이면 전체를 읽는다
+            index, writable = faiss.read_index(self.index_path), True
+        vector_index.configure_search(index, **self.index_params)
+        return index, writable
+
+    def _ensure_writable(self):
+        if not self._writable:
+            self.index = faiss.read_index(self.index_path)
+            vector_index.configure_search(self.index, **self.index_params)
+            self._writable = True
+
+    def _save_index(self, index=None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            faiss.write_index(self.index if index is None else index, tmp_path)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def _target_type(self, count=None):
+        """이미지가 count장(기본값: 현재 수)일 때 사용할 인덱스 종류
+
+        한 번 전환한 뒤에는 삭제로 이미지 수가 줄어도 유지한다.
+        """
+        if count is None:
+            count = self.index.ntotal
+        if (
+            self.index_type == "flat"
+            or count >= self.train_size
+            or vector_index.index_type_of(self.index) == self.index_type
+        ):
+            return self.index_type
+        return "flat"
+
+    def _maybe_rebuild(self):
+        """인덱스 종류가 설정/이미지 수와 맞지 않으면 저장된 벡터로 다시 생성"""
+        target = self._target_type()
+        if vector_index.index_type_of(self.index) == target:
+            return False
+        vectors, ids = vector_index.reconstruct_all(self.index)
+        self.index = vector_index.rebuild(
+            target, self.dim, vectors, ids, **self.index_params
+        )
+        return True
+
+    def _index_with(self, vectors, ids):
+        """vectors를 추가한 인덱스
+
+        인덱스 종류를 바꿔야 하면 기존 벡터와 합쳐 새 인덱스를 만들고 현재 인덱스는 건드리지 않으므로,
+        학습이 실패해도 메타데이터에 없는 id가 인덱스에 남지 않는다.
+        """
+        target = self._target_type(self.index.ntotal + len(ids))
+        if vector_index.index_type_of(self.index) == target:
+            self.index.add_with_ids(vectors, ids)
+            return self.index
+        stored, stored_ids = vector_index.reconstruct_all(self.index)
+        return vector_index.rebuild(
+            target,
+            self.dim,
+            np.vstack([stored, vectors]),
+            np.concatenate([stored_ids, ids]),
+            **self.index_params,
+        )
+
+    def _reconcile(self):
+        """인덱스 저장 후 메타데이터 커밋 전에 중단된 경우 등 불일치 정리"""
+        ids = set(vector_index.stored_ids(self.index).tolist())
+        rows = {row["id"] for row in self._db.execute("SELECT id FROM images")}
+        orphans = ids - rows
+        if orphans:
+            self._ensure_writable()
+            self.index = vector_index.remove(
+                self.index, sorted(orphans), **self.index_params
+            )
+            self._save_index()
+        missing = rows - ids
+        if missing:
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM images WHERE id = ?", [(i,) for i in missing]
+                )
+        # 설정한 인덱스 종류가 바뀐 경우
+        if self._maybe_rebuild():
+            self._writable = True
+            self._save_index()
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def add(self, items, vectors):
+        """이미지 추가
+
+        Args:
+            items: [{"name", "data"(원본 바이트), "image"(PIL 이미지),
+                     "hash"(선택), "phash"(선택)}, ...]
+            vectors: (N, dim) 임베딩
+        Returns:
+            추가된 이미지 id 목록
+        """
+        vectors = vector_index.normalize(np.reshape(vectors, (len(items), self.dim)))
+        with self._lock:
+            self._ensure_writable()
+            with open(self.thumbnail_path, "ab") as thumbnails:
+                offset = thumbnails.tell()
+                rows = []
+                for item in items:
+                    content_hash = item.get("hash") or hash_bytes(item["data"])
+                    extension = os.path.splitext(item["name"])[1].lower() or ".img"
+                    path = os.path.join(self.image_dir, content_hash + extension)
+                    if not os.path.exists(path):
+                        with open(path, "wb") as f:
+                            f.write(item["data"])
+
+                    phash = item.get("phash")
+                    if phash is None:
+                        phash = perceptual_hash(item["image"])
+
+                    thumbnail = make_thumbnail(item["image"])
+                    thumbnails.write(thumbnail)
+                    rows.append(
+                        (
+                            path,
+                            item["name"],
+                            content_hash,
+                            _to_signed(phash),
+                            offset,
+                            len(thumbnail),
+                        )
+                    )
+                    offset += len(thumbnail)
+
+            with self._db:
+                ids = [
+                    self._db.execute(
+                        "INSERT INTO images"
+                        " (path, name, hash, phash, thumb_offset, thumb_size)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        row,
+                    ).lastrowid
+                    for row in rows
+                ]
+                new_ids = np.array(ids, dtype=np.int64)
+                index = self._index_with(vectors, new_ids)
+                try:
+                    self._save_index(index)
+                except Exception:
+                    if index is self.index:
+                        # 메타데이터 커밋이 취소되므로 인덱스에서도 되돌린다
+                        self.index = vector_index.remove(
+                            self.index, new_ids, **self.index_params
+                        )
+                    raise
+                self.index = index
+            self._phashes = None
+            return ids
+
+    def remove(self, ids):
+        """이미지 삭제 (같은 원본을 참조하는 항목이 없으면 원본 파일도 삭제)
+
+        썸네일 파일은 이어 쓰기 전용이라 삭제된 항목의 영역은 그대로 남는다.
+        """
+        ids = [int(i) for i in ids]
+        with self._lock:
+            self._ensure_writable()
+            rows = [self.get(i) for i in ids]
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM images WHERE id = ?", [(i,) for i in ids]
+                )
+                self._db.executemany(
+                    "DELETE FROM hash_aliases WHERE image_id = ?", [(i,) for i in ids]
+                )
+                self.index = vector_index.remove(self.index, ids, **self.index_params)
+                self._maybe_rebuild()
+                self._save_index()
+            self._phashes = None
+            for row in rows:
+                if row is None:
+                    continue
+                shared = self._db.execute(
+                    "SELECT 1 FROM images WHERE path = ? LIMIT 1", (row["path"],)
+                ).fetchone()
+                if shared is None and os.path.exists(row["path"]):
+                    os.remove(row["path"])
+
+    def find_by_hash(self, hashes):
+        """내용 해시로 이미 저장된 이미지 찾기 ({해시: 이미지 id}, 별칭 포함)"""
+        hashes = list(set(hashes))
+        found = {}
+        with self._lock:
+            # sqlite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                for row in self._db.execute(
+                    f"SELECT hash, image_id FROM hash_aliases WHERE hash IN ({marks})"
+                    f" UNION ALL SELECT hash, id FROM images WHERE hash IN ({marks})",
+                    chunk + chunk,
+                ):
+                    found[row[0]] = row[1]
+        return found
+
+    def add_alias(self, content_hash, image_id):
+        """다른 바이트지만 같은 이미지로 판정된 내용 해시 기록 (다음 업로드는 해시로 바로 찾음)"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hash_aliases (hash, image_id) VALUES (?, ?)",
+                (content_hash, int(image_id)),
+            )
+
+    def find_by_phash(self, phash, max_distance):
+        """지각 해시의 해밍 거리가 max_distance 이하인 가장 가까운 이미지 id (없으면 None)"""
+        with self._lock:
+            if self._phashes is None:
+                rows = self._db.execute(
+                    "SELECT id, phash FROM images WHERE phash IS NOT NULL"
+                ).fetchall()
+                self._phashes = (
+                    np.array([row[0] for row in rows], dtype=np.int64),
+                    np.array([row[1] for row in rows], dtype=np.int64).view(np.uint64),
+                )
+            ids, phashes = self._phashes
+        if len(ids) == 0:
+            return None
+        diff = np.bitwise_xor(phashes, np.uint64(phash))
+        distances = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        best = int(distances.argmin())
+        return int(ids[best]) if distances[best] <= max_distance else None
+
+    def search(self, vectors, k=1):
+        """(코사인 유사도, 이미지 id) 배열 반환 (결과가 없는 자리는 id -1)"""
+        with self._lock:
+            return vector_index.search(self.index, vectors, k)
+
+    def get(self, image_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM images WHERE id = ?", (int(image_id),)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def entries(self, offset=0, limit=None):
+        """이미지 메타데이터 (추가 순서, offset번째부터 최대 limit개)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM images ORDER BY id LIMIT ? OFFSET ?",
+                (-1 if limit is None else int(limit), int(offset)),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def thumbnail(self, image_id):
+        """썸네일 JPEG 바이트"""
+        row = self.get(image_id)
+        with open(self.thumbnail_path, "rb") as f:
+            return os.pread(f.fileno(), row["thumb_size"], row["thumb_offset"])
+
+    def read_image(self, image_id):
+        """원본 이미지 바이트"""
+        with open(self.get(image_id)["path"], "rb") as f:
+            return f.read()
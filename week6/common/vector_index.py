@@ -0,0 +1,196 @@
+import math
+
+import faiss
+import numpy as np
+
+# flat: 정확 검색 (내적)
+# ivf : 역색인 (IVF, 벡터 원본 저장) - nprobe로 정확도/속도 조절
+# hnsw: 그래프 기반 근사 검색 - ef_search로 정확도/속도 조절 (학습 불필요)
+# pq  : 역색인 + PQ 압축 (IVF,PQ) - 벡터당 pq_m 바이트만 저장
+#       (검색에 쓰지 않는 polysemous 학습은 끈다: 10k 벡터 학습 170초 -> 25초)
+INDEX_TYPES = ("flat", "ivf", "hnsw", "pq")
+
+DEFAULT_PARAMS = {
+    "nlist": None,  # None이면 학습 벡터 수로 결정 (약 4√N)
+    "nprobe": 16,
+    "hnsw_m": 32,
+    "ef_construction": 80,
+    "ef_search": 64,
+    "pq_m": 64,
+}
+
+# FAISS 권장 최소 학습 벡터 수 (클러스터당)
+MIN_POINTS_PER_CENTROID = 39
+
+# PQ 코드북(8비트, 256개 중심) 학습에 필요한 최소 벡터 수
+PQ_MIN_TRAIN = 256
+
+
+def normalize(vectors):
+    """L2 정규화한 float32 사본 (정규화 벡터의 내적 = 코사인 유사도)"""
+    vectors = np.array(vectors, dtype=np.float32, copy=True).reshape(len(vectors), -1)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def choose_nlist(num_vectors):
+    """학습 벡터 수에 맞는 IVF 클러스터 수"""
+    nlist = int(4 * math.sqrt(max(num_vectors, 1)))
+    return max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def validate_params(index_type, dim, train_size, **params):
+    """train_size개 벡터로 index_type 인덱스를 학습할 수 있는지 확인 (안 되면 ValueError)"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 종류: {index_type} ({', '.join(INDEX_TYPES)})")
+    if index_type not in ("ivf", "pq"):
+        return
+    params = {**DEFAULT_PARAMS, **params}
+    nlist = params["nlist"] or choose_nlist(train_size)
+    if train_size < nlist:
+        raise ValueError(
+            f"{index_type} 인덱스는 학습 벡터가 nlist({nlist})개 이상이어야 합니다 "
+            f"(train_size={train_size})"
+        )
+    if index_type == "pq":
+        if train_size < PQ_MIN_TRAIN:
+            raise ValueError(
+                f"pq 인덱스는 학습 벡터가 {PQ_MIN_TRAIN}개 이상이어야 합니다 "
+                f"(train_size={train_size})"
+            )
+        if dim % params["pq_m"]:
+            raise ValueError(f"pq_m({params['pq_m']})은 벡터 차원({dim})의 약수여야 합니다")
+
+
+def build_index(index_type, dim, num_vectors=0, **params):
+    """내적(코사인) 기준 인덱스 생성 (ivf/pq는 train 필요)"""
+    params = {**DEFAULT_PARAMS, **params}
+    metric = faiss.METRIC_INNER_PRODUCT
+    nlist = params["nlist"] or choose_nlist(num_vectors)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "ivf":
+        index = faiss.index_factory(dim, f"IVF{nlist},Flat", metric)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["hnsw_m"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "pq":
+        index = faiss.index_factory(dim, f"IVF{nlist},PQ{params['pq_m']}np", metric)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 종류: {index_type} ({', '.join(INDEX_TYPES)})")
+
+    configure_search(index, **params)
+    return index
+
+
+def _base(index):
+    """IndexIDMap 등 래퍼를 벗긴 실제 인덱스"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def index_type_of(index):
+    """인덱스 객체의 종류 (INDEX_TYPES 중 하나)"""
+    base = _base(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVFPQ):
+        return "pq"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def configure_search(index, nprobe=None, ef_search=None, **_):
+    """검색 시점 파라미터 적용 (파일에서 읽은 인덱스에도 다시 적용해야 함)"""
+    base = _base(index)
+    if isinstance(base, faiss.IndexIVF) and nprobe:
+        base.nprobe = min(nprobe, base.nlist)
+    if isinstance(base, faiss.IndexHNSW) and ef_search:
+        base.hnsw.efSearch = ef_search
+
+
+def with_ids(index):
+    """사용자 id로 추가/삭제할 수 있는 인덱스
+
+    IVF 계열은 역색인에 id를 직접 저장하고 remove_ids도 id 기준으로 동작하므로 그대로 쓰고,
+    나머지는 IndexIDMap2로 감싼다 (IVF를 IndexIDMap으로 감싸면 삭제 후 id가 어긋난다).
+    """
+    if isinstance(_base(index), faiss.IndexIVF):
+        return index
+    return faiss.IndexIDMap2(index)
+
+
+def stored_ids(index):
+    """인덱스에 저장된 사용자 id 전체"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.vector_to_array(index.id_map).astype(np.int64)
+    base = _base(index)
+    invlists = base.invlists
+    ids = [
+        faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy()
+        for i in range(base.nlist)
+        if invlists.list_size(i)
+    ]
+    return np.concatenate(ids).astype(np.int64) if ids else np.zeros(0, dtype=np.int64)
+
+
+def reconstruct_all(index):
+    """저장된 (벡터, id) 전체 (pq는 복원 근사값)"""
+    ids = stored_ids(index)
+    base = _base(index)
+    if len(ids) == 0:
+        return np.zeros((0, base.d), dtype=np.float32), ids
+    if isinstance(base, faiss.IndexIVF):
+        base.set_direct_map_type(faiss.DirectMap.Hashtable)
+        vectors = np.vstack([base.reconstruct(int(i)) for i in ids])
+    else:
+        vectors = base.reconstruct_n(0, base.ntotal)
+    return vectors.astype(np.float32), ids
+
+
+def rebuild(index_type, dim, vectors, ids, **params):
+    """주어진 (벡터, id)로 새 인덱스 생성 (학습이 필요하면 이 벡터로 학습)"""
+    index = with_ids(build_index(index_type, dim, len(vectors), **params))
+    if not index.is_trained:
+        index.train(vectors)
+    if len(vectors):
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def remove(index, ids, **params):
+    """id 삭제 후 인덱스 반환 (HNSW처럼 삭제를 지원하지 않으면 남은 벡터로 다시 생성)"""
+    ids = np.asarray(ids, dtype=np.int64)
+    try:
+        index.remove_ids(ids)
+        return index
+    except RuntimeError:
+        vectors, stored = reconstruct_all(index)
+        keep = ~np.isin(stored, ids)
+        return rebuild(
+            index_type_of(index), vectors.shape[1], vectors[keep], stored[keep], **params
+        )
+
+
+def search(index, vectors, k=1, batch_size=1024):
+    """정규화한 질의 벡터를 batch_size개씩 나눠 검색 (코사인 유사도, id)
+
+    결과가 없는 자리는 id -1, 유사도 -inf
+    """
+    vectors = normalize(vectors)
+    similarities = np.full((len(vectors), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(vectors), k), -1, dtype=np.int64)
+    if index.ntotal == 0:
+        return similarities, ids
+    for start in range(0, len(vectors), batch_size):
+        D, I = index.search(vectors[start : start + batch_size], k)
+        similarities[start : start + len(D)] = D
+        ids[start : start + len(I)] = I
+    ids[ids < 0] = -1
+    similarities[ids < 0] = -np.inf
+    return similarities, ids
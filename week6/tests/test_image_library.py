@@ -0,0 +1,149 @@
+import hashlib
+import os
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from common import vector_index
+from common.image_library import ImageLibrary, hash_bytes, perceptual_hash
+
+DIM = 32
+TRAIN_SIZE = 256  # pq 학습 최소 벡터 수
+
+
+class StubEmbedder:
+    """픽셀 내용으로 정해지는 임의 단위 벡터를 돌려주는 CLIP 대역"""
+
+    def embed_images(self, images):
+        vectors = []
+        for image in images:
+            seed = int.from_bytes(hashlib.sha256(image.tobytes()).digest()[:8], "big")
+            vectors.append(np.random.default_rng(seed).standard_normal(DIM))
+        return np.array(vectors, dtype=np.float32)
+
+
+def make_items(start, count, size=16):
+    items = []
+    for i in range(start, start + count):
+        pixels = np.random.default_rng(i).integers(0, 256, (size, size, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels)
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        items.append({"name": f"image_{i}.png", "data": buffer.getvalue(), "image": image})
+    return items
+
+
+def add(library, items):
+    return library.add(items, StubEmbedder().embed_images([item["image"] for item in items]))
+
+
+def open_library(directory, index_type):
+    return ImageLibrary(directory, DIM, index_type=index_type, train_size=TRAIN_SIZE, pq_m=8)
+
+
+def assert_finds_self(library, items, ids):
+    _, found = library.search(StubEmbedder().embed_images([item["image"] for item in items]))
+    assert np.mean(found[:, 0] == np.array(ids)) >= 0.95
+
+
+@pytest.mark.parametrize("index_type", vector_index.INDEX_TYPES)
+def test_add_remove_and_reload(tmp_path, index_type):
+    library = open_library(tmp_path, index_type)
+    first = make_items(0, 200)
+    first_ids = add(library, first)
+
+    # train_size 미만이면 정확 검색
+    assert vector_index.index_type_of(library.index) == "flat"
+
+    second = make_items(200, 100)
+    second_ids = add(library, second)
+    assert vector_index.index_type_of(library.index) == index_type
+    assert len(library) == 300
+    assert_finds_self(library, first + second, first_ids + second_ids)
+
+    removed = first_ids[:10]
+    removed_path = library.get(removed[0])["path"]
+    library.remove(removed)
+    assert len(library) == 290
+    assert library.get(removed[0]) is None
+    assert not os.path.exists(removed_path)
+    _, found = library.search(StubEmbedder().embed_images([first[0]["image"]]), k=5)
+    assert removed[0] not in found[0]
+
+    reopened = open_library(tmp_path, index_type)
+    assert len(reopened) == 290
+    assert vector_index.index_type_of(reopened.index) == index_type
+    assert [entry["id"] for entry in reopened.entries()] == first_ids[10:] + second_ids
+    assert_finds_self(reopened, first[10:] + second, first_ids[10:] + second_ids)
+    assert reopened.read_image(second_ids[0]) == second[0]["data"]
+    assert Image.open(BytesIO(reopened.thumbnail(second_ids[0]))).format == "JPEG"
+
+
+def test_find_by_hash_and_alias(tmp_path):
+    library = open_library(tmp_path, "flat")
+    items = make_items(0, 3)
+    ids = add(library, items)
+    hashes = [hash_bytes(item["data"]) for item in items]
+
+    assert library.find_by_hash(hashes + ["unknown"]) == dict(zip(hashes, ids))
+
+    # 다른 바이트(재압축)지만 같은 이미지로 판정된 해시
+    library.add_alias("other-bytes", ids[1])
+    assert library.find_by_hash(["other-bytes"]) == {"other-bytes": ids[1]}
+
+    library.remove([ids[1]])
+    assert library.find_by_hash(["other-bytes", hashes[1]]) == {}
+
+
+def test_same_bytes_share_original_file(tmp_path):
+    library = open_library(tmp_path, "flat")
+    item = make_items(0, 1)[0]
+    first, second = add(library, [item, dict(item, name="copy.png")])
+
+    assert library.get(first)["path"] == library.get(second)["path"]
+    library.remove([first])
+    assert os.path.exists(library.get(second)["path"])
+
+
+def test_find_by_phash_matches_resized_image(tmp_path):
+    library = open_library(tmp_path, "flat")
+    items = make_items(0, 5, size=64)
+    ids = add(library, items)
+
+    resized = items[2]["image"].resize((48, 48), Image.LANCZOS)
+    assert library.find_by_phash(perceptual_hash(resized), max_distance=10) == ids[2]
+    assert library.find_by_phash(perceptual_hash(resized) ^ ((1 << 64) - 1), 10) is None
+
+    library.remove([ids[2]])
+    assert library.find_by_phash(perceptual_hash(items[2]["image"]), 0) is None
+
+
+@pytest.mark.parametrize(
+    "before, after",
+    [("flat", "ivf"), ("flat", "hnsw"), ("flat", "pq"), ("pq", "hnsw"), ("hnsw", "flat")],
+)
+def test_switch_index_type_on_existing_library(tmp_path, before, after):
+    library = open_library(tmp_path, before)
+    items = make_items(0, 300)
+    ids = add(library, items)
+    assert vector_index.index_type_of(library.index) == before
+
+    switched = open_library(tmp_path, after)
+
+    assert vector_index.index_type_of(switched.index) == after
+    assert set(vector_index.stored_ids(switched.index).tolist()) == set(ids)
+    assert_finds_self(switched, items, ids)
+    # 다시 열어도 바뀐 종류로 저장되어 있다
+    assert vector_index.index_type_of(open_library(tmp_path, after).index) == after
+
+
+def test_switch_below_train_size_stays_flat(tmp_path):
+    library = open_library(tmp_path, "flat")
+    ids = add(library, make_items(0, 10))
+
+    switched = open_library(tmp_path, "ivf")
+
+    assert vector_index.index_type_of(switched.index) == "flat"
+    assert [entry["id"] for entry in switched.entries()] == ids
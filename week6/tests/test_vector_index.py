@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from common import vector_index
+
+DIM = 32
+
+
+def random_vectors(count, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, DIM)).astype(np.float32)
+
+
+def make_index(index_type, vectors):
+    ids = np.arange(100, 100 + len(vectors), dtype=np.int64)
+    index = vector_index.rebuild(index_type, DIM, vector_index.normalize(vectors), ids, pq_m=8)
+    return index, ids
+
+
+def exact_top_k(vectors, queries, ids, k):
+    similarities = vector_index.normalize(queries) @ vector_index.normalize(vectors).T
+    order = np.argsort(-similarities, axis=1)[:, :k]
+    return np.take_along_axis(similarities, order, axis=1), ids[order]
+
+
+def test_normalize_returns_unit_copy():
+    vectors = random_vectors(5) * 3
+
+    unit = vector_index.normalize(vectors)
+
+    assert np.allclose(np.linalg.norm(unit, axis=1), 1.0)
+    assert not np.shares_memory(unit, vectors)
+
+
+def test_flat_top_k_matches_cosine_order():
+    vectors, queries = random_vectors(200), random_vectors(20, seed=1)
+    index, ids = make_index("flat", vectors)
+
+    similarities, found = vector_index.search(index, queries * 5, k=10, batch_size=7)
+    expected_similarities, expected_ids = exact_top_k(vectors, queries, ids, 10)
+
+    # 질의 크기와 무관하게 코사인 유사도 내림차순
+    assert np.all(np.diff(similarities, axis=1) <= 1e-6)
+    assert np.allclose(similarities, expected_similarities, atol=1e-5)
+    assert np.array_equal(found, expected_ids)
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "hnsw", "pq"])
+def test_approximate_top_k_is_sorted_and_finds_self(index_type):
+    vectors = random_vectors(512)
+    index, ids = make_index(index_type, vectors)
+    vector_index.configure_search(index, nprobe=64, ef_search=128)
+
+    similarities, found = vector_index.search(index, vectors[:50], k=5)
+
+    assert vector_index.index_type_of(index) == index_type
+    assert np.all(np.diff(similarities, axis=1) <= 1e-6)
+    assert np.mean(found[:, 0] == ids[:50]) >= 0.95
+    if index_type != "pq":
+        # 원본 벡터를 저장하므로 유사도도 정확한 코사인 값
+        assert np.allclose(similarities[:, 0], 1.0, atol=1e-5)
+
+
+def test_search_fills_missing_results():
+    index, ids = make_index("flat", random_vectors(3))
+
+    similarities, found = vector_index.search(index, random_vectors(2, seed=1), k=5)
+
+    assert np.all(found[:, 3:] == -1)
+    assert np.all(np.isneginf(similarities[:, 3:]))
+    empty = vector_index.rebuild("flat", DIM, [], [])
+    similarities, found = vector_index.search(empty, random_vectors(1), k=2)
+    assert found.tolist() == [[-1, -1]]
+
+
+@pytest.mark.parametrize("index_type", vector_index.INDEX_TYPES)
+def test_remove_drops_ids(index_type):
+    vectors = random_vectors(300)
+    index, ids = make_index(index_type, vectors)
+
+    index = vector_index.remove(index, ids[:10], pq_m=8)
+
+    assert index.ntotal == 290
+    assert vector_index.index_type_of(index) == index_type
+    assert set(vector_index.stored_ids(index).tolist()) == set(ids[10:].tolist())
+
+
+def test_validate_params_rejects_untrainable_settings():
+    with pytest.raises(ValueError):
+        vector_index.validate_params("annoy", DIM, 1000)
+    with pytest.raises(ValueError):
+        vector_index.validate_params("pq", DIM, 100)
+    with pytest.raises(ValueError):
+        vector_index.validate_params("pq", DIM, 1000, pq_m=7)
+    vector_index.validate_params("pq", DIM, 1000, pq_m=8)
@@ -1,15 +1,23 @@
+import sys, os
+WEEK_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(WEEK_DIR)
+
 import streamlit as st
 import base64
-from PIL import Image
-from io import BytesIO
-import numpy as np
-import faiss
 import torch
 from transformers import CLIPProcessor, CLIPModel
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
-import os
+from common.clip_embedder import ClipEmbedder, upload_key
+from common.image_library import (
+    ImageLibrary,
+    encode_jpeg,
+    estimate_image_tokens,
+    hash_bytes,
+    perceptual_hash,
+)
+from common.vector_index import normalize
 
 # OpenAI API 환경 변수 로드
 load_dotenv()
@@ -33,42 +41,99 @@ if "clip_model" not in st.session_state:
 clip_model = st.session_state.clip_model
 clip_processor = st.session_state.clip_processor
 
-# FAISS 벡터 저장소 초기화 (한 번만 실행)
-if "vector_db" not in st.session_state:
-    faiss_index = faiss.IndexFlatL2(512)  # 512차원 벡터 저장
-    st.session_state.vector_db = faiss_index
-    st.session_state.image_metadata = {}  # FAISS에 저장된 이미지 정보 (파일명 저장)
+# 임베딩 배치 크기 / 전처리 스레드 수 (환경 변수로 조정)
+CLIP_BATCH_SIZE = int(os.getenv("CLIP_BATCH_SIZE", "16"))
+CLIP_NUM_WORKERS = int(os.getenv("CLIP_NUM_WORKERS", "4"))
+
+embedder = ClipEmbedder(
+    clip_model,
+    clip_processor,
+    device,
+    batch_size=CLIP_BATCH_SIZE,
+    num_workers=CLIP_NUM_WORKERS,
+)
+
+# 질문마다 첨부할 관련 이미지 수, 이미지 입력 토큰 예산, 첨부 이미지 긴 변 최대 크기 (px)
+IMAGE_CONTEXT_TOP_K = int(os.getenv("IMAGE_CONTEXT_TOP_K", "4"))
+IMAGE_CONTEXT_TOKEN_BUDGET = int(os.getenv("IMAGE_CONTEXT_TOKEN_BUDGET", "3000"))
+IMAGE_CONTEXT_MAX_SIDE = int(os.getenv("IMAGE_CONTEXT_MAX_SIDE", "768"))
+
+# 이미지 라이브러리 경로 (FAISS 인덱스 + 메타데이터, 세션이 바뀌어도 유지)
+IMAGE_LIBRARY_DIR = os.getenv("IMAGE_LIBRARY_DIR", os.path.join(WEEK_DIR, "image_library"))
+
+# 검색 인덱스 종류 (flat, ivf, hnsw, pq) 와 학습을 시작할 이미지 수
+IMAGE_INDEX_TYPE = os.getenv("IMAGE_INDEX_TYPE", "flat")
+IMAGE_INDEX_TRAIN_SIZE = int(os.getenv("IMAGE_INDEX_TRAIN_SIZE", "2048"))
+
+# 사이드바 라이브러리 목록 한 페이지의 썸네일 수
+IMAGE_LIBRARY_PAGE_SIZE = int(os.getenv("IMAGE_LIBRARY_PAGE_SIZE", "12"))
+
+# 코사인 유사도가 이 값 이상이면 동일한 이미지로 판단
+DUPLICATE_COSINE = float(os.getenv("IMAGE_DUPLICATE_COSINE", "0.99"))
+
+# 지각 해시 해밍 거리가 이 값 이하이면 CLIP 없이 동일한 이미지로 판단 (설정하지 않으면 사용 안 함)
+PHASH_MAX_DISTANCE = (
+    int(os.environ["IMAGE_PHASH_MAX_DISTANCE"])
+    if os.getenv("IMAGE_PHASH_MAX_DISTANCE")
+    else None
+)
+
+
+@st.cache_resource
+def get_image_library(directory, dim, index_type, train_size):
+    """프로세스 전역 이미지 라이브러리 (모든 세션이 공유)"""
+    return ImageLibrary(directory, dim, index_type=index_type, train_size=train_size)
+
+
+library = get_image_library(
+    IMAGE_LIBRARY_DIR,
+    clip_model.config.projection_dim,
+    IMAGE_INDEX_TYPE,
+    IMAGE_INDEX_TRAIN_SIZE,
+)
+
+# 이번 세션에서 이미 임베딩한 업로드 (업로드 키 → 이미지 id)
+# Streamlit은 상호작용마다 스크립트를 다시 실행하므로 같은 파일을 다시 임베딩하지 않도록 기록
+if "embedded_files" not in st.session_state:
+    st.session_state.embedded_files = {}
 
 # 채팅 메시지 저장소 초기화 (채팅 기록 유지)
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
 
-# CLIP을 사용하여 이미지 벡터화
-def get_image_embedding(image: Image.Image) -> np.ndarray:
-    inputs = clip_processor(images=image, return_tensors="pt").to(device)
-    with torch.no_grad():
-        image_features = clip_model.get_image_features(**inputs)
-    return image_features.cpu().numpy().flatten()
-
-
 # 이미지를 Base64 인코딩하는 함수
 def encode_image_to_base64(image_data):
     return base64.b64encode(image_data).decode("utf-8")
 
 
-# FAISS에서 중복 이미지 확인
-def find_duplicate_image(image_vector):
-    """FAISS에서 중복된 이미지가 있는지 확인하고, 있으면 해당 인덱스를 반환"""
-    if st.session_state.vector_db.ntotal == 0:
-        return None  # 저장된 벡터가 없으면 중복 아님
+@st.cache_data(max_entries=256)
+def encode_image_for_prompt(image_id, max_side):
+    """프롬프트 첨부용 JPEG Base64와 예상 토큰 수 (이미지 id는 재사용되지 않으므로 id로 캐시)"""
+    data, (width, height) = encode_jpeg(library.read_image(image_id), max_side)
+    return encode_image_to_base64(data), estimate_image_tokens(width, height)
+
 
-    image_vector = np.array(image_vector, dtype=np.float32).reshape(1, -1)
-    D, I = st.session_state.vector_db.search(image_vector, 1)  # 가장 가까운 벡터 검색
+def select_context_images(prompt):
+    """질문과 관련된 이미지를 CLIP 텍스트 임베딩으로 검색해 유사도 순 이미지 id 목록 반환"""
+    if len(library) <= IMAGE_CONTEXT_TOP_K:
+        return [entry["id"] for entry in library.entries()]
+    text_vector = embedder.embed_texts([prompt])
+    _, ids = library.search(text_vector, IMAGE_CONTEXT_TOP_K)
+    return [int(image_id) for image_id in ids[0] if image_id != -1]
 
-    if D[0][0] < 0.001:  # 거리가 0에 가까우면 동일한 이미지로 판단
-        return I[0][0]  # 중복된 이미지의 인덱스 반환
-    return None
+
+# 라이브러리에서 중복 이미지 확인
+def find_duplicate_images(image_vectors):
+    """라이브러리에서 중복된 이미지를 한 번에 검색해 이미지 id (중복이 아니면 None) 목록 반환"""
+    if len(library) == 0:
+        return [None] * len(image_vectors)  # 저장된 벡터가 없으면 중복 아님
+
+    D, I = library.search(image_vectors, 1)  # 가장 가까운 벡터 검색
+    return [
+        int(ids[0]) if ids[0] != -1 and similarities[0] >= DUPLICATE_COSINE else None
+        for similarities, ids in zip(D, I)
+    ]
 
 
 # 이미지 업로드
@@ -79,38 +144,113 @@ uploaded_files = st.file_uploader(
 )
 
 if uploaded_files:
-    for file in uploaded_files:
-        image = Image.open(file)
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-
-        # CLIP 벡터 생성
-        image_vector = get_image_embedding(image)
-        image_vector = np.array(image_vector, dtype=np.float32).reshape(1, -1)
-
-        # 중복된 이미지인지 확인
-        duplicate_index = find_duplicate_image(image_vector)
-        if duplicate_index is not None:
-            st.info(
-                f"{file.name} 이미지는 이미 업로드된 이미지와 동일합니다. 기존 이미지를 유지합니다."
-            )
-        else:
-            # FAISS에 벡터 추가
-            st.session_state.vector_db.add(image_vector)
-
-            # 이미지 정보를 저장 (Base64 인코딩 포함)
-            image_base64 = encode_image_to_base64(buffer.getvalue())
-            st.session_state.image_metadata[st.session_state.vector_db.ntotal - 1] = {
-                "name": file.name,
-                "base64": image_base64,
-            }
+    embedded_files = st.session_state.embedded_files
+    new_files = [
+        file for file in uploaded_files if upload_key(file) not in embedded_files
+    ]
+
+    if new_files:
+        datas = [file.getvalue() for file in new_files]
+        hashes = [hash_bytes(data) for data in datas]
+        first = {}  # 내용 해시 → 이번 업로드에서 처음 나온 위치
+        for position, content_hash in enumerate(hashes):
+            first.setdefault(content_hash, position)
+
+        # 1단계: 내용 해시 - 같은 바이트를 다시 올리면 디코딩/모델 추론 없이 기존 이미지 사용
+        resolved = library.find_by_hash(hashes)  # 내용 해시 → 이미지 id
+        candidates = [content_hash for content_hash in first if content_hash not in resolved]
+        added = set()  # 라이브러리에 새로 추가된 내용 해시
+
+        if candidates:
+            images = embedder.load_images([datas[first[h]] for h in candidates])
+            phashes = [perceptual_hash(image) for image in images]
+
+            # 2단계 (선택): 지각 해시 - 크기 조정/재압축된 같은 사진
+            if PHASH_MAX_DISTANCE is not None:
+                for content_hash, phash in zip(candidates, phashes):
+                    image_id = library.find_by_phash(phash, PHASH_MAX_DISTANCE)
+                    if image_id is not None:
+                        resolved[content_hash] = image_id
+
+            # 3단계: 앞 단계에서 찾지 못한 이미지만 배치로 CLIP 벡터 생성 후 FAISS 검색
+            remaining = [i for i, h in enumerate(candidates) if h not in resolved]
+            if remaining:
+                image_vectors = embedder.embed_images([images[i] for i in remaining])
+                unit_vectors = normalize(image_vectors)
+                duplicate_ids = find_duplicate_images(image_vectors)
+
+                items = []  # 라이브러리에 추가할 이미지
+                positions = []  # items 각각의 image_vectors 위치
+                pending = {}  # 내용 해시 → items 위치
+                for position, i in enumerate(remaining):
+                    content_hash = candidates[i]
+                    if duplicate_ids[position] is not None:
+                        resolved[content_hash] = duplicate_ids[position]
+                        continue
+
+                    # 같은 업로드 안에 동일한 이미지가 있는지 확인
+                    if items:
+                        similarities = unit_vectors[positions] @ unit_vectors[position]
+                        if similarities.max() >= DUPLICATE_COSINE:
+                            pending[content_hash] = int(similarities.argmax())
+                            continue
+
+                    pending[content_hash] = len(items)
+                    positions.append(position)
+                    items.append(
+                        {
+                            "name": new_files[first[content_hash]].name,
+                            "data": datas[first[content_hash]],
+                            "hash": content_hash,
+                            "image": images[i],
+                            "phash": phashes[i],
+                        }
+                    )
+
+                if items:
+                    # 새 이미지를 한 번에 라이브러리(FAISS 인덱스, 메타데이터)에 추가
+                    ids = library.add(items, image_vectors[positions])
+                    added = {item["hash"] for item in items}
+                    for content_hash, item_index in pending.items():
+                        resolved[content_hash] = ids[item_index]
+
+            # 바이트는 다르지만 같은 이미지로 판정된 해시는 별칭으로 남겨 다음 업로드는 1단계에서 처리
+            for content_hash in candidates:
+                if content_hash not in added:
+                    library.add_alias(content_hash, resolved[content_hash])
+
+        for position, (file, content_hash) in enumerate(zip(new_files, hashes)):
+            embedded_files[upload_key(file)] = resolved[content_hash]
+            if content_hash not in added or first[content_hash] != position:
+                st.info(
+                    f"{file.name} 이미지는 이미 업로드된 이미지와 동일합니다. 기존 이미지를 유지합니다."
+                )
 
-        st.image(image, caption=f"업로드된 이미지: {file.name}", use_column_width=True)
+    for file in uploaded_files:
+        st.image(file, caption=f"업로드된 이미지: {file.name}", use_column_width=True)
 
     st.success(
         f"{len(uploaded_files)}개의 이미지가 업로드되었습니다. 질문을 입력하세요!"
     )
 
+# 라이브러리 목록 (현재 페이지의 썸네일만 읽어 표시, 삭제 가능)
+with st.sidebar:
+    st.subheader(f"이미지 라이브러리 ({len(library)}개)")
+    num_pages = max(1, -(-len(library) // IMAGE_LIBRARY_PAGE_SIZE))
+    page = st.number_input("페이지", min_value=1, max_value=num_pages, value=1)
+    for entry in library.entries(
+        (page - 1) * IMAGE_LIBRARY_PAGE_SIZE, IMAGE_LIBRARY_PAGE_SIZE
+    ):
+        st.image(library.thumbnail(entry["id"]), caption=entry["name"])
+        if st.button("삭제", key=f"remove_{entry['id']}"):
+            library.remove([entry["id"]])
+            st.session_state.embedded_files = {
+                key: image_id
+                for key, image_id in st.session_state.embedded_files.items()
+                if image_id != entry["id"]
+            }
+            st.rerun()
+
 # 기존 대화 기록 표시 (채팅 기록 유지)
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -125,27 +265,31 @@ if prompt:
         st.markdown(prompt)
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    # 업로드된 모든 이미지 정보를 OpenAI에게 전달 (Base64 포함)
-    if len(st.session_state.image_metadata) > 0:
-        image_info = []
-        for i, idx in enumerate(st.session_state.image_metadata):
-            image_data = st.session_state.image_metadata[idx]
-            image_info.append(
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{image_data['base64']}"
-                    },
-                }
-            )
+    # 질문과 관련된 이미지만 토큰 예산 안에서 OpenAI에게 전달 (축소한 JPEG Base64)
+    image_info = []
+    image_names = []
+    used_tokens = 0
+    for image_id in select_context_images(prompt):
+        entry = library.get(image_id)
+        if entry is None:
+            continue
+        image_base64, tokens = encode_image_for_prompt(image_id, IMAGE_CONTEXT_MAX_SIDE)
+        if image_info and used_tokens + tokens > IMAGE_CONTEXT_TOKEN_BUDGET:
+            break
+        used_tokens += tokens
+        image_names.append(entry["name"])
+        image_info.append(
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"},
+            }
+        )
+
+    if image_info:
         image_text = "\n".join(
-            [
-                f"이미지 {i+1}: {st.session_state.image_metadata[idx]['name']}"
-                for i, idx in enumerate(st.session_state.image_metadata)
-            ]
+            [f"이미지 {i+1}: {name}" for i, name in enumerate(image_names)]
         )
     else:
-        image_info = []
         image_text = "현재 업로드된 이미지가 없습니다."
 
     print(image_text)
@@ -155,7 +299,7 @@ if prompt:
         content=[
             {
                 "type": "text",
-                "text": f"사용자가 {len(st.session_state.image_metadata)} 개의 이미지를 업로드했습니다.\n{image_text}\n\n사용자의 질문: {prompt}\n",
+                "text": f"사용자가 {len(library)} 개의 이미지를 업로드했습니다. 질문과 관련된 {len(image_info)} 개를 첨부합니다.\n{image_text}\n\n사용자의 질문: {prompt}\n",
             },
         ]
         + image_info,  # 이미지 리스트를 추가
@@ -0,0 +1,138 @@
+"""Wav2Vec2 추론 백엔드 벤치마크
+
+study/train_file 코퍼스로 torch / quantized / onnx 백엔드의
+실시간 배율(RTF = 추론 시간 / 오디오 길이)과 WER을 비교한다.
+WER 차이는 torch 백엔드 기준이다.
+
+WER은 모델과 코퍼스의 언어가 같아야 의미가 있다. 기본 코퍼스는 한국어이므로
+한국어 CTC 모델(KOREAN_MODEL)로 측정한다. 앱의 영어 모델(WAV2VEC2_MODEL)은
+영어 코퍼스와 함께 지정한다 (코퍼스 형식은 [{"audio_path", "text"}] JSON).
+'vs torch'(기준 백엔드 출력과의 차이)는 언어와 무관하게 백엔드 변경의 영향을 보여준다.
+
+실행: python -m benchmark.backend_benchmark [--backends torch quantized onnx]
+      python -m benchmark.backend_benchmark --model facebook/wav2vec2-base-960h --corpus en.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+import torch
+from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+
+from common.audio_stream import DecodedAudio
+from model.inference_backend import create_backend
+from model.word2back_transcriber import SAMPLE_RATE
+
+CORPUS_PATH = os.path.join("study", "train_file", "corpus.json")
+
+# 기본(한국어) 코퍼스와 언어가 같은 Wav2Vec2 CTC 모델
+KOREAN_MODEL = "kresnik/wav2vec2-large-xlsr-korean"
+
+
+def normalize_text(text):
+    """문장 부호를 지우고 소문자로 (CTC 출력에는 문장 부호가 없고 영어 모델은 대문자만 낸다)"""
+    return re.sub(r"[^\w\s']", " ", text).lower()
+
+
+def word_error_rate(reference, hypothesis):
+    """단어 단위 편집 거리 / 기준 단어 수 (문장 부호, 대소문자 무시)"""
+    ref = normalize_text(reference).split()
+    hyp = normalize_text(hypothesis).split()
+    if not ref:
+        return float(bool(hyp))
+
+    distance = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        previous, distance[0] = distance[0], i
+        for j, hyp_word in enumerate(hyp, start=1):
+            current = min(
+                distance[j] + 1,
+                distance[j - 1] + 1,
+                previous + (ref_word != hyp_word),
+            )
+            previous, distance[j] = distance[j], current
+    return distance[len(hyp)] / len(ref)
+
+
+def load_corpus(corpus_path):
+    """(오디오 경로, 정답 텍스트) 목록 (경로는 코퍼스 파일 기준으로 해석)"""
+    corpus_dir = os.path.dirname(corpus_path)
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    return [
+        (os.path.join(corpus_dir, os.path.basename(item["audio_path"])), item["text"])
+        for item in items
+    ]
+
+
+def run_backend(name, model_name, processor, corpus, onnx_path):
+    """백엔드 하나로 코퍼스 전체를 변환하고 (RTF, 예측 목록) 반환"""
+    model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+    backend = create_backend(name, model, onnx_path)
+    if backend.name != name:
+        print(f"[{name}] 사용할 수 없어 {backend.name} 백엔드로 대체됨")
+
+    audio_seconds = 0.0
+    inference_seconds = 0.0
+    predictions = []
+    for audio_path, _ in corpus:
+        with DecodedAudio(audio_path, sample_rate=SAMPLE_RATE) as audio:
+            samples = np.asarray(audio.samples)
+            audio_seconds += audio.duration
+        inputs = processor(samples, sampling_rate=SAMPLE_RATE, return_tensors="pt")
+
+        begin = time.perf_counter()
+        logits = backend.logits(inputs["input_values"])
+        inference_seconds += time.perf_counter() - begin
+
+        predicted_ids = torch.argmax(logits, dim=-1)
+        predictions.append(processor.batch_decode(predicted_ids)[0])
+
+    return inference_seconds / audio_seconds, predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wav2Vec2 추론 백엔드 벤치마크")
+    parser.add_argument(
+        "--backends", nargs="+", default=["torch", "quantized", "onnx"]
+    )
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument(
+        "--model", default=KOREAN_MODEL, help="코퍼스와 같은 언어의 Wav2Vec2 CTC 모델"
+    )
+    parser.add_argument("--onnx-path", help="기본값: .cache/<모델 이름>.onnx")
+    args = parser.parse_args()
+
+    onnx_path = args.onnx_path or os.path.join(
+        ".cache", f"{args.model.rsplit('/', 1)[-1]}.onnx"
+    )
+    torch.set_num_threads(os.cpu_count() or 1)
+    processor = Wav2Vec2Processor.from_pretrained(args.model)
+    corpus = load_corpus(args.corpus)
+    references = [text for _, text in corpus]
+    print(f"코퍼스 {len(corpus)}개 파일, 모델 {args.model}")
+
+    baseline = None
+    print(f"{'backend':<10} {'RTF':>8} {'WER':>8} {'ΔWER':>8} {'vs torch':>9}")
+    for name in args.backends:
+        rtf, predictions = run_backend(name, args.model, processor, corpus, onnx_path)
+        wer = np.mean(
+            [word_error_rate(r, p) for r, p in zip(references, predictions)]
+        )
+        if baseline is None:
+            baseline = (wer, predictions)
+        # 기준 백엔드 출력과의 차이 (정답과 무관하게 백엔드 변경으로 달라진 정도)
+        drift = np.mean(
+            [word_error_rate(b, p) for b, p in zip(baseline[1], predictions)]
+        )
+        print(
+            f"{name:<10} {rtf:>8.3f} {wer:>8.3f} {wer - baseline[0]:>+8.3f} {drift:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
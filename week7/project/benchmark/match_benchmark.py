@@ -0,0 +1,104 @@
+"""화자 매칭 벤치마크
+
+3시간 분량의 합성 전사/화자 분리 결과로 기존 전수 비교 방식과
+정렬 기반 매칭(common.utils.match_segments_with_speakers)의 속도와 결과를 비교한다.
+
+실행: python -m benchmark.match_benchmark
+"""
+
+import argparse
+import random
+import time
+
+from common.utils import match_segments_with_speakers
+
+
+def naive_match_segments_with_speakers(segments, diarization):
+    """기존 O(세그먼트 × 화자 구간) 매칭 (비교 기준)"""
+    matched_segments = [
+        {
+            "start": diar["start"],
+            "end": diar["end"],
+            "label": diar["label"],
+            "text": "",
+        }
+        for diar in diarization
+    ]
+
+    for segment in segments:
+        max_overlap = 0
+        max_overlap_idx = 0
+        for idx, diar in enumerate(diarization):
+            overlap = min(segment["end"], diar["end"]) - max(
+                segment["start"], diar["start"]
+            )
+            if overlap > max_overlap:
+                max_overlap = overlap
+                max_overlap_idx = idx
+        if max_overlap > 0:
+            matched_segments[max_overlap_idx]["text"] += segment["text"].strip() + " "
+
+    return [item for item in matched_segments if item["text"]]
+
+
+def make_synthetic_transcript(duration_sec, seed=0):
+    """합성 ASR 세그먼트와 압축된 화자 구간 생성"""
+    rng = random.Random(seed)
+
+    diarization = []
+    t = 0.0
+    speaker = 0
+    while t < duration_sec:
+        end = t + rng.uniform(1.0, 15.0)
+        diarization.append(
+            {"start": round(t, 3), "end": round(end, 3), "label": f"SPEAKER_{speaker:02d}"}
+        )
+        # 짧은 침묵 또는 겹치는 발화
+        t = end + rng.uniform(-0.5, 1.5)
+        speaker = 1 - speaker
+
+    segments = []
+    t = 0.0
+    while t < duration_sec:
+        end = t + rng.uniform(0.5, 8.0)
+        segments.append(
+            {"start": round(t, 3), "end": round(end, 3), "text": f" 문장 {len(segments)} "}
+        )
+        t = end + rng.uniform(0.0, 0.5)
+
+    return segments, diarization
+
+
+def _time(func, *args):
+    begin = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="화자 매칭 벤치마크")
+    parser.add_argument("--hours", type=float, default=3.0, help="합성 녹음 길이(시간)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--skip-naive", action="store_true", help="기존 방식 측정 생략"
+    )
+    args = parser.parse_args()
+
+    segments, diarization = make_synthetic_transcript(args.hours * 3600, args.seed)
+    print(f"세그먼트 {len(segments)}개, 화자 구간 {len(diarization)}개")
+
+    fast, fast_sec = _time(match_segments_with_speakers, segments, diarization)
+    print(f"정렬 기반 매칭: {fast_sec:.3f}s")
+
+    if not args.skip_naive:
+        naive, naive_sec = _time(
+            naive_match_segments_with_speakers, segments, diarization
+        )
+        print(f"전수 비교 매칭: {naive_sec:.3f}s ({naive_sec / fast_sec:.1f}x)")
+        if naive != fast:
+            raise SystemExit("매칭 결과가 기존 방식과 다릅니다")
+        print("결과 일치")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""음성 노트 파이프라인 종단 간 벤치마크
+
+OpenAI 클라이언트와 pyannote 파이프라인을 결정적인 로컬 대역(fake)으로 바꿔
+네트워크/GPU 없이 Transcriber(선택적으로 Word2backTranscriber)의 처리량을 잰다.
+입력은 upload_people/sample/0002.mp3, study/train_file 청크, 합성 장시간 녹음이다.
+
+케이스마다 실시간 배율(RTF = 처리 시간 / 오디오 길이), 최대 RSS, 단계별 시간을 출력하고
+저장된 기준 결과(benchmark/pipeline_baseline.json)와 비교해 느려진 항목을 표시한다.
+--check를 주면 느려진 항목이 있거나 기준 결과가 없을 때 종료 코드 1을 반환한다.
+실행 지표(<작업>.json/.prom)는 ./metrics가 아니라 벤치마크 임시 디렉토리에 저장한다.
+
+실행: python -m benchmark.pipeline_benchmark [--synthetic-min 10 60] [--save-baseline | --check]
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import types
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from common.audio_stream import DecodedAudio
+from common.result_cache import ResultCache
+from common.settings import get_settings
+from model.transcriber import Transcriber
+
+SAMPLE_PATH = os.path.join("upload_people", "sample", "0002.mp3")
+TRAIN_CHUNKS = os.path.join("study", "train_file", "chunk_*.wav")
+BASELINE_PATH = os.path.join("benchmark", "pipeline_baseline.json")
+
+SAMPLE_RATE = 16000
+SEGMENT_SEC = 5.0  # 가짜 ASR 세그먼트 길이
+TURN_SEC = 7.0  # 가짜 화자 전환 간격
+
+
+def bench_settings(metrics_dir):
+    """지표 저장 위치만 벤치마크 디렉토리로 바꾼 설정"""
+    settings = get_settings()
+    return {**settings, "metrics": {**settings["metrics"], "dir": metrics_dir}}
+
+
+def wav_duration(data):
+    """WAV 바이트의 길이 (초)"""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+class FakeTranscriptions:
+    """OpenAI audio.transcriptions 대역: 오디오 길이에 맞춰 고정 길이 세그먼트 반환
+
+    latency_sec만큼 기다려 API 왕복 시간을 흉내 낸다.
+    파일 객체로 들어오는 입력(단일 업로드)은 미리 잰 길이(durations)를 사용한다.
+    """
+
+    def __init__(self, durations, latency_sec):
+        self.durations = durations
+        self.latency_sec = latency_sec
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def create(self, file, **kwargs):
+        with self._lock:
+            self.requests += 1
+        if isinstance(file, tuple):
+            duration = wav_duration(file[1])
+        else:
+            duration = self.durations[os.path.abspath(file.name)]
+        time.sleep(self.latency_sec)
+
+        count = max(1, int(np.ceil(duration / SEGMENT_SEC)))
+        segments = [
+            {
+                "start": i * SEGMENT_SEC,
+                "end": min((i + 1) * SEGMENT_SEC, duration),
+                "text": f" segment {i}",
+            }
+            for i in range(count)
+        ]
+        return types.SimpleNamespace(segments=segments)
+
+
+class FakeOpenAI:
+    def __init__(self, durations, latency_sec):
+        self.audio = types.SimpleNamespace(
+            transcriptions=FakeTranscriptions(durations, latency_sec)
+        )
+
+
+class FakeDiarization:
+    """pyannote 파이프라인 대역: TURN_SEC마다 화자가 바뀌는 결과 반환
+
+    오디오 길이 × rtf 만큼 기다려 화자 분리 연산 시간을 흉내 낸다.
+    """
+
+    def __init__(self, rtf):
+        self.rtf = rtf
+
+    def __call__(self, audio_input, num_speakers=2):
+        duration = audio_input["waveform"].shape[-1] / audio_input["sample_rate"]
+        time.sleep(duration * self.rtf)
+
+        lines = []
+        start = 0.0
+        turn = 0
+        while start < duration:
+            end = min(start + TURN_SEC, duration)
+            lines.append(f"{start:.3f} {end:.3f} SPEAKER_{turn % num_speakers:02d}")
+            start = end
+            turn += 1
+        lab = "\n".join(lines) + "\n"
+        return types.SimpleNamespace(to_lab=lambda: lab)
+
+
+class BenchTranscriber(Transcriber):
+    """가짜 클라이언트/파이프라인과 빈 캐시를 쓰는 Transcriber
+
+    병렬 화자 분리는 작업 프로세스 대신 스레드에서 실행한다
+    (작업 프로세스는 실제 pyannote 모델을 로드하기 때문).
+    """
+
+    def __init__(self, client, pipeline, cache_dir, metrics_dir):
+        self.metrics_dir = metrics_dir
+        super().__init__(openai_api_key="benchmark", hf_token="benchmark")
+        self.client = client
+        self._fake_pipeline = pipeline
+        self.cache = ResultCache(cache_dir, self.config["cache"]["max_size_mb"])
+
+    @property
+    def config(self):
+        return bench_settings(self.metrics_dir)
+
+    @property
+    def pipeline(self):
+        return self._fake_pipeline
+
+    def _get_diarization_executor(self):
+        if self._diarization_executor is None:
+            self._diarization_executor = ThreadPoolExecutor(max_workers=1)
+        return self._diarization_executor
+
+    def _submit_diarization(self, audio, speaker_num):
+        def run():
+            begin = time.perf_counter()
+            lab = self._diarize_speaker(audio, speaker_num)
+            return lab, time.perf_counter() - begin
+
+        return self._get_diarization_executor().submit(run)
+
+
+def write_synthetic_wav(path, minutes, seed=0):
+    """두 화자가 번갈아 말하는 것처럼 톤이 바뀌는 합성 녹음 (1분 단위로 기록)"""
+    rng = np.random.default_rng(seed)
+    block = SAMPLE_RATE * 60
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for minute in range(minutes):
+            t = np.arange(block) / SAMPLE_RATE + minute * 60
+            speaker = (t // TURN_SEC).astype(int) % 2
+            freq = np.where(speaker == 0, 180.0, 240.0)
+            signal = 0.3 * np.sin(2 * np.pi * freq * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+            signal += 0.02 * rng.standard_normal(block)
+            wav.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def probe_durations(paths):
+    """입력 파일 길이 (가짜 ASR의 단일 업로드 응답용, 측정 시간에는 포함하지 않음)"""
+    durations = {}
+    for path in paths:
+        with DecodedAudio(path, sample_rate=SAMPLE_RATE) as audio:
+            durations[os.path.abspath(path)] = audio.duration
+    return durations
+
+
+def merge_metrics(runs):
+    """여러 파일 실행 결과를 하나의 케이스 결과로 합산"""
+    merged = {"wall_sec": 0.0, "audio_sec": 0.0, "spans": {}, "peak_rss_mb": None}
+    for data in runs:
+        merged["wall_sec"] += data["wall_sec"]
+        merged["audio_sec"] += data["values"].get("audio_sec") or 0.0
+        for stage, seconds in data["spans"].items():
+            merged["spans"][stage] = merged["spans"].get(stage, 0.0) + seconds
+        if data["peak_rss_mb"] is not None:
+            merged["peak_rss_mb"] = max(merged["peak_rss_mb"] or 0.0, data["peak_rss_mb"])
+    merged["rtf"] = merged["wall_sec"] / merged["audio_sec"] if merged["audio_sec"] else None
+    return merged
+
+
+def run_transcriber(paths, args, durations, metrics_dir):
+    """Transcriber로 파일들을 변환하고 합산 지표 반환"""
+    runs = []
+    for path in paths:
+        cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+        transcriber = BenchTranscriber(
+            FakeOpenAI(durations, args.asr_latency),
+            FakeDiarization(args.diarization_rtf),
+            cache_dir,
+            metrics_dir,
+        )
+        try:
+            transcriber.transcribe(path, speaker_num=2)
+            runs.append(transcriber.metrics.to_dict())
+        finally:
+            transcriber.close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return merge_metrics(runs)
+
+
+def run_word2back(paths, args, metrics_dir):
+    """Word2backTranscriber로 파일들을 변환하고 합산 지표 반환 (Wav2Vec2 모델 필요)"""
+    from model.word2back_transcriber import Word2backTranscriber
+
+    class BenchWord2back(Word2backTranscriber):
+        pipeline = FakeDiarization(args.diarization_rtf)
+
+        @property
+        def config(self):
+            return bench_settings(metrics_dir)
+
+    transcriber = BenchWord2back(hf_token="benchmark")
+    runs = []
+    for path in paths:
+        transcriber.transcribe(path)
+        runs.append(transcriber.metrics.to_dict())
+    return merge_metrics(runs)
+
+
+def compare(results, baseline, tolerance, min_delta_sec):
+    """기준 대비 느려진 (케이스, 항목, 기준, 현재) 목록"""
+    regressions = []
+    for case, current in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        items = [("wall_sec", base["wall_sec"], current["wall_sec"])]
+        items += [
+            (f"span:{stage}", base["spans"][stage], seconds)
+            for stage, seconds in current["spans"].items()
+            if stage in base["spans"]
+        ]
+        for name, before, after in items:
+            if after > before * (1 + tolerance) and after - before > min_delta_sec:
+                regressions.append((case, name, before, after))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'case':<28} {'audio(s)':>9} {'wall(s)':>9} {'RTF':>8} {'RSS(MB)':>8}  stages")
+    for case, data in results.items():
+        rtf = f"{data['rtf']:.4f}" if data["rtf"] is not None else "-"
+        rss = f"{data['peak_rss_mb']:.0f}" if data["peak_rss_mb"] is not None else "-"
+        stages = ", ".join(f"{k}={v:.2f}" for k, v in data["spans"].items())
+        print(
+            f"{case:<28} {data['audio_sec']:>9.1f} {data['wall_sec']:>9.2f} "
+            f"{rtf:>8} {rss:>8}  {stages}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="음성 노트 파이프라인 벤치마크")
+    parser.add_argument("--synthetic-min", type=int, nargs="*", default=[10, 30])
+    parser.add_argument("--asr-latency", type=float, default=0.2, help="가짜 ASR 요청당 지연 (초)")
+    parser.add_argument(
+        "--diarization-rtf", type=float, default=0.02, help="가짜 화자 분리 RTF"
+    )
+    parser.add_argument("--word2back", action="store_true", help="Word2backTranscriber도 측정")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save-baseline", action="store_true")
+    mode.add_argument(
+        "--check", action="store_true", help="느려진 항목이 있거나 기준 결과가 없으면 실패"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 지연 비율")
+    parser.add_argument("--min-delta", type=float, default=1.0, help="무시할 절대 차이 (초)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench-audio-")
+    metrics_dir = os.path.join(work_dir, "metrics")
+    try:
+        cases = {}
+        if os.path.exists(SAMPLE_PATH):
+            cases["sample_0002"] = [SAMPLE_PATH]
+        chunks = sorted(glob.glob(TRAIN_CHUNKS))
+        if chunks:
+            cases["train_chunks"] = chunks
+        for minutes in args.synthetic_min:
+            path = os.path.join(work_dir, f"synthetic_{minutes}min.wav")
+            write_synthetic_wav(path, minutes)
+            cases[f"synthetic_{minutes}min"] = [path]
+
+        durations = probe_durations(path for paths in cases.values() for path in paths)
+
+        results = {}
+        for case, paths in cases.items():
+            print(f"[{case}] 파일 {len(paths)}개 변환 중...")
+            results[f"transcriber/{case}"] = run_transcriber(
+                paths, args, durations, metrics_dir
+            )
+            if args.word2back and not case.startswith("synthetic"):
+                results[f"word2back/{case}"] = run_word2back(paths, args, metrics_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준 결과 저장: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"기준 결과가 없습니다: {args.baseline} (--save-baseline으로 생성)")
+        return 1 if args.check else 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    missing = [case for case in results if case not in baseline]
+    for case in missing:
+        print(f"기준 결과에 없는 케이스: {case}")
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for case, name, before, after in regressions:
+        print(f"느려짐: {case} {name} {before:.2f}s → {after:.2f}s ({after / before:.2f}배)")
+    if not regressions:
+        print("기준 대비 느려진 항목 없음")
+    return 1 if args.check and (regressions or missing) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
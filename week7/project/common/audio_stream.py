@@ -0,0 +1,215 @@
+import io
+import os
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+import torch
+
+
+class DecodedAudio:
+    """ffmpeg로 한 번만 디코딩한 모노 PCM 오디오
+
+    디코딩 결과는 고정 크기 블록 단위로 임시 파일에 기록한 뒤 메모리 맵으로 열기 때문에
+    녹음 길이와 관계없이 프로세스 메모리는 블록/윈도우 크기만큼만 사용한다.
+    ASR 청크와 화자 분리 입력 모두 이 하나의 디코딩 결과에서 만든다.
+    """
+
+    BLOCK_SIZE = 1024 * 1024  # ffmpeg 출력 읽기 단위 (bytes)
+
+    def __init__(self, file_name, sample_rate=16000):
+        self.file_name = file_name
+        self.sample_rate = sample_rate
+        self._pcm_path = None
+        self._samples = None
+        self._owns_pcm = True
+
+    @classmethod
+    def from_pcm(cls, pcm_path, sample_rate):
+        """다른 프로세스가 디코딩해 둔 PCM 파일을 그대로 연다 (파일은 삭제하지 않음)"""
+        audio = cls(pcm_path, sample_rate)
+        audio._pcm_path = pcm_path
+        audio._owns_pcm = False
+        if os.path.getsize(pcm_path) > 0:
+            audio._samples = np.memmap(pcm_path, dtype=np.float32, mode="c")
+        else:
+            audio._samples = np.zeros(0, dtype=np.float32)
+        return audio
+
+    @property
+    def samples(self):
+        """PCM 샘플 (처음 접근할 때 디코딩하므로 캐시 적중 시에는 디코딩하지 않음)"""
+        if self._samples is None:
+            fd, self._pcm_path = tempfile.mkstemp(suffix=".f32")
+            os.close(fd)
+            try:
+                self._decode()
+            except Exception:
+                os.remove(self._pcm_path)
+                self._pcm_path = None
+                raise
+            if os.path.getsize(self._pcm_path) > 0:
+                # copy-on-write 매핑: 원본 파일을 건드리지 않고 torch 텐서로 감쌀 수 있다
+                self._samples = np.memmap(self._pcm_path, dtype=np.float32, mode="c")
+            else:
+                self._samples = np.zeros(0, dtype=np.float32)
+        return self._samples
+
+    def _decode(self):
+        """ffmpeg 파이프로 float32 PCM을 스트리밍 디코딩"""
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            self.file_name,
+            "-f",
+            "f32le",
+            "-ac",
+            "1",
+            "-ar",
+            str(self.sample_rate),
+            "pipe:1",
+        ]
+        with tempfile.TemporaryFile() as stderr, open(self._pcm_path, "wb") as out:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            while True:
+                block = process.stdout.read(self.BLOCK_SIZE)
+                if not block:
+                    break
+                out.write(block)
+            process.stdout.close()
+            if process.wait() != 0:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", errors="replace").strip()
+                raise RuntimeError(f"오디오 디코딩 실패: {message}")
+
+    @property
+    def decoded(self):
+        """이미 디코딩되었는지 여부 (캐시 적중 시에는 디코딩하지 않을 수 있음)"""
+        return self._samples is not None
+
+    def decode(self):
+        """아직 디코딩하지 않았다면 지금 디코딩"""
+        return self.samples
+
+    @property
+    def pcm_path(self):
+        """디코딩된 PCM 임시 파일 경로 (필요하면 먼저 디코딩)"""
+        self.decode()
+        return self._pcm_path
+
+    @property
+    def num_samples(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        """오디오 길이 (초)"""
+        return self.num_samples / self.sample_rate
+
+    def windows(self, window_sec):
+        """고정 길이 PCM 윈도우를 (인덱스, 시작 샘플, 샘플 슬라이스)로 순회"""
+        window = int(window_sec * self.sample_rate)
+        for index, start in enumerate(range(0, self.num_samples, window)):
+            yield index, start, self.samples[start : start + window]
+
+    def to_wav_bytes(self, samples):
+        """PCM 슬라이스를 16bit WAV 바이트로 변환 (업로드용 메모리 버퍼)"""
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+    def to_pyannote_input(self):
+        """pyannote 파이프라인용 메모리 입력 (디스크 WAV 내보내기 불필요)"""
+        waveform = torch.from_numpy(self.samples).unsqueeze(0)
+        return {"waveform": waveform, "sample_rate": self.sample_rate}
+
+    def close(self):
+        """메모리 맵 해제 및 임시 PCM 파일 삭제"""
+        self._samples = None
+        if self._owns_pcm and self._pcm_path and os.path.exists(self._pcm_path):
+            os.remove(self._pcm_path)
+        self._pcm_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ChunkManifest:
+    """분할 청크별 시작 샘플/길이 기록
+
+    청크 내부 기준으로 받은 세그먼트 시간을 샘플 단위로 정확한 전체 시간으로 되돌린다.
+    청크 기준 결과만 캐시하면 되므로 보정 방식이 바뀌어도 ASR을 다시 호출할 필요가 없다.
+    """
+
+    def __init__(self, sample_rate, starts, lengths):
+        self.sample_rate = sample_rate
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+
+    @classmethod
+    def from_audio(cls, audio, window_sec):
+        """DecodedAudio.windows와 같은 경계로 매니페스트 생성"""
+        window = int(window_sec * audio.sample_rate)
+        starts = np.arange(0, audio.num_samples, window, dtype=np.int64)
+        lengths = np.minimum(window, audio.num_samples - starts)
+        return cls(audio.sample_rate, starts, lengths)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["sample_rate"], data["starts"], data["lengths"])
+
+    def to_dict(self):
+        return {
+            "sample_rate": self.sample_rate,
+            "starts": self.starts.tolist(),
+            "lengths": self.lengths.tolist(),
+        }
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def duration(self):
+        """전체 오디오 길이 (초)"""
+        return float(self.lengths.sum()) / self.sample_rate
+
+    def rebase(self, chunk_segments):
+        """청크 기준 세그먼트 시간을 전체 오디오 기준으로 한 번에 보정
+
+        Args:
+            chunk_segments: {청크 인덱스: [{"start", "end", "text"}, ...]}
+                (일부 청크만 넘기면 해당 청크만 인덱스 순서대로 보정)
+        """
+        indices = sorted(chunk_segments)
+        counts = [len(chunk_segments[i]) for i in indices]
+        total = sum(counts)
+        if total == 0:
+            return []
+
+        flat = [segment for i in indices for segment in chunk_segments[i]]
+        chunk_index = np.repeat(np.asarray(indices, dtype=np.int64), counts)
+        offsets = self.starts[chunk_index] / self.sample_rate
+        durations = self.lengths[chunk_index] / self.sample_rate
+
+        starts = np.fromiter((s["start"] for s in flat), dtype=np.float64, count=total)
+        ends = np.fromiter((s["end"] for s in flat), dtype=np.float64, count=total)
+        # 모델이 청크 길이를 넘는 종료 시간을 돌려주는 경우 다음 청크와 겹치지 않도록 자른다
+        starts = offsets + np.minimum(starts, durations)
+        ends = offsets + np.minimum(ends, durations)
+
+        return [
+            {"start": start, "end": end, "text": segment["text"]}
+            for start, end, segment in zip(starts.tolist(), ends.tolist(), flat)
+        ]
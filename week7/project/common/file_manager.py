@@ -1,7 +1,80 @@
 import os
+import codecs
 import json
+import mmap
+import threading
+import time
 import chardet  # 인코딩 자동 감지를 위한 라이브러리
-import yaml
+from collections import OrderedDict
+from common.settings import get_settings
+from common.transcript_store import TranscriptStore
+
+
+class NoteCatalog:
+    """노트 디렉토리 목록 메모리 캐시
+
+    Streamlit rerun마다 FileManager가 새로 만들어지므로 목록은 프로세스 전역으로 둔다.
+    ttl_sec 동안은 파일 시스템을 전혀 조회하지 않고, 그 뒤에는 기본 디렉토리의 mtime만
+    확인해 노트가 추가/삭제되었을 때만 다시 스캔한다.
+    이 프로세스에서 만든 노트는 바로 목록에 반영한다.
+    """
+
+    def __init__(self, base_dir, ttl_sec):
+        self.base_dir = base_dir
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._notes = None
+        self._mtime_ns = None
+        self._checked_at = 0.0
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _scan(self):
+        # scandir의 is_dir은 대부분 추가 stat 없이 디렉토리 항목 정보로 판단한다
+        with os.scandir(self.base_dir) as entries:
+            self._notes = [entry.name for entry in entries if entry.is_dir()]
+
+    def notes(self):
+        """노트 이름 목록"""
+        with self._lock:
+            now = time.monotonic()
+            if self._notes is None or now - self._checked_at >= self.ttl_sec:
+                mtime_ns = os.stat(self.base_dir).st_mtime_ns
+                if self._notes is None or mtime_ns != self._mtime_ns:
+                    self._scan()
+                    self._mtime_ns = mtime_ns
+                self._checked_at = now
+            return list(self._notes)
+
+    def __contains__(self, note_name):
+        return note_name in self.notes()
+
+    def add(self, note_name):
+        """노트 디렉토리 생성 (이미 있으면 False)"""
+        with self._lock:
+            try:
+                os.makedirs(os.path.join(self.base_dir, note_name))
+            except FileExistsError:
+                return False
+            if self._notes is not None:
+                self._notes.append(note_name)
+                self._mtime_ns = os.stat(self.base_dir).st_mtime_ns
+            return True
+
+
+# 파일별 인코딩 확인 결과 ((경로, 크기, 수정 시각) → 인코딩)
+ENCODING_CACHE_SIZE = 1024
+_encoding_cache = OrderedDict()
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_note_catalog(base_dir, ttl_sec):
+    """기본 디렉토리별 프로세스 전역 노트 목록"""
+    with _catalogs_lock:
+        if base_dir not in _catalogs:
+            _catalogs[base_dir] = NoteCatalog(base_dir, ttl_sec)
+        return _catalogs[base_dir]
 
 
 class FileManager:
@@ -9,63 +82,107 @@ class FileManager:
 
     def __init__(self, base_dir):
         """기본 저장 디렉토리 설정"""
-        with open("config.yml", "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
         self.base_dir = os.path.abspath(base_dir)  # 절대 경로 변환
-        os.makedirs(self.base_dir, exist_ok=True)
+        self.catalog = get_note_catalog(
+            self.base_dir, self.config["file"]["catalog_ttl_sec"]
+        )
+
+    @property
+    def config(self):
+        """공유 설정 (config.yml 변경 시 자동 반영)"""
+        return get_settings()
 
     def get_note_list(self):
         """저장된 노트 목록 반환"""
-        return [d for d in os.listdir(self.base_dir) if os.path.isdir(os.path.join(self.base_dir, d))]
+        return self.catalog.notes()
+
+    def create_note(self, note_name):
+        """새 노트 생성 (이미 있으면 False)"""
+        return self.catalog.add(note_name)
 
     def get_file_path(self, note_name, file_name):
-        """노트 내 특정 파일 경로 반환"""
-        note_path = os.path.abspath(
-            os.path.join(self.base_dir, note_name)
-        )  # 절대 경로 변환
-        os.makedirs(note_path, exist_ok=True)
-        return os.path.join(note_path, file_name)
+        """노트 내 특정 파일 경로 반환 (디렉토리는 파일을 쓸 때 생성)"""
+        return os.path.join(self.base_dir, note_name, file_name)
+
+    @staticmethod
+    def _ensure_parent(file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
     def save_file(self, file_path, data):
         """텍스트 파일 저장"""
+        self._ensure_parent(file_path)
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(data)
 
+    def save_binary(self, file_path, data):
+        """바이너리 파일 저장 (업로드한 오디오 등)"""
+        self._ensure_parent(file_path)
+        with open(file_path, "wb") as f:
+            f.write(data)
+
     def load_file(self, file_path):
-        """파일 불러오기 (바이너리 & 텍스트 구분)"""
+        """파일 불러오기 (바이너리 & 텍스트 구분)
+
+        큰 바이너리 파일은 메모리 전체로 읽지 않고 읽기 전용 mmap(bytes처럼 슬라이스 가능)으로 반환한다.
+        """
         if not os.path.exists(file_path):
             return None
 
         ext = os.path.splitext(file_path)[1].lower()
         if ext in self.config["file"]["binary_extensions"]:
+            threshold = self.config["file"]["mmap_threshold_mb"] * 1024 * 1024
             with open(file_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size >= threshold:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
                 return f.read()
 
-        # 텍스트 파일: 인코딩 감지 후 처리
+        # 텍스트 파일: 인코딩 확인 후 처리
         with open(file_path, "rb") as f:
             raw_data = f.read()  # 바이너리 데이터 읽기
+            stat = os.fstat(f.fileno())
 
-        # chardet으로 인코딩 감지
-        encoding_detected = chardet.detect(raw_data)["encoding"]
-
-        if not encoding_detected:
-            encoding_detected = "utf-8"  # 기본 UTF-8로 설정
+        # 같은 내용(크기/수정 시각)이면 이전에 확인한 인코딩 재사용
+        cache_key = (file_path, stat.st_size, stat.st_mtime_ns)
+        encoding = _encoding_cache.get(cache_key)
+        if encoding is None:
+            encoding = self._detect_encoding(raw_data)
+            _encoding_cache[cache_key] = encoding
+            if len(_encoding_cache) > ENCODING_CACHE_SIZE:
+                _encoding_cache.popitem(last=False)
 
         try:
-            return raw_data.decode(encoding_detected)  # 감지된 인코딩 적용
+            return raw_data.decode(encoding)  # 확인된 인코딩 적용
         except UnicodeDecodeError:
             return raw_data.decode("ISO-8859-1", errors="replace")
 
+    def _detect_encoding(self, raw_data):
+        """엄격한 UTF-8 디코딩을 먼저 시도하고, 실패할 때만 앞부분 일부로 chardet 감지"""
+        if raw_data.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+        try:
+            raw_data.decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+        sample = raw_data[: self.config["file"]["detect_sample_kb"] * 1024]
+        return chardet.detect(sample)["encoding"] or "utf-8"  # 감지 실패 시 기본 UTF-8
+
     def save_jsonl(self, file_path, data_list):
-        """JSONL 형식 데이터 저장 (개행 추가)"""
-        with open(file_path, "w", encoding="utf-8") as f:
-            for item in data_list:
-                json.dump(item, f, ensure_ascii=False)
-                f.write("\n")  # JSON 데이터가 정확히 구분되도록 개행 추가
+        """JSONL 형식 데이터 저장 (인덱스도 새로 생성)"""
+        self._ensure_parent(file_path)
+        self.open_transcript(file_path).replace(data_list)
+
+    def open_transcript(self, file_path):
+        """인덱스 기반 노트 저장소 열기 (페이지/시간/화자 단위 조회, 이어 쓰기)"""
+        return TranscriptStore(file_path)
 
     def load_jsonl(self, file_path):
-        """JSONL 형식 데이터 불러오기"""
+        """JSONL 형식 데이터 불러오기
+
+        변환 작업이 이어 쓰는 중인 파일도 읽을 수 있도록 개행으로 끝나지 않은 마지막 줄은 무시한다.
+        """
         if os.path.exists(file_path):
             with open(file_path, "r", encoding="utf-8") as f:
-                return [json.loads(line) for line in f]
+                return [json.loads(line) for line in f if line.endswith("\n")]
         return []
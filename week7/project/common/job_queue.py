@@ -0,0 +1,191 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from common.logger_config import get_log_queue, init_worker_logging
+
+
+# 실행을 시작한 뒤 끝나지 못한 작업(작업 프로세스 비정상 종료, 서버 재시작)을 다시 실행하는 최대 횟수.
+# 작업 프로세스를 죽이는 입력이 서버가 재시작될 때마다 계속 재실행되지 않도록 한다.
+MAX_ATTEMPTS = 3
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def _state_path(jobs_dir, job_id):
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def read_job(jobs_dir, job_id):
+    """작업 상태 읽기 (없으면 None)"""
+    try:
+        with open(_state_path(jobs_dir, job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_job(jobs_dir, state):
+    """작업 상태 저장 (임시 파일 후 교체로 읽는 쪽이 중간 상태를 보지 않도록 함)"""
+    state["updated_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=jobs_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, _state_path(jobs_dir, state["id"]))
+
+
+def _run_job(jobs_dir, job_id, handler):
+    """작업 프로세스에서 실행: 상태를 갱신하면서 handler(params, progress) 호출"""
+    lock = threading.Lock()
+    state = read_job(jobs_dir, job_id)
+    state["status"] = JobStatus.RUNNING
+    state["error"] = None
+    state["attempts"] = state.get("attempts", 0) + 1
+    write_job(jobs_dir, state)
+
+    def progress(done, total, stage=None):
+        # ASR 청크 완료 콜백은 여러 스레드에서 동시에 호출될 수 있다
+        with lock:
+            state["progress"] = {"done": done, "total": total, "stage": stage}
+            write_job(jobs_dir, state)
+
+    try:
+        result = handler(state["params"], progress)
+        with lock:
+            state["status"] = JobStatus.DONE
+            state["result"] = result
+            write_job(jobs_dir, state)
+    except Exception as e:
+        with lock:
+            state["status"] = JobStatus.FAILED
+            state["error"] = f"{type(e).__name__}: {e}"
+            state["traceback"] = traceback.format_exc()
+            write_job(jobs_dir, state)
+
+
+class JobQueue:
+    """프로세스 풀 기반 로컬 작업 큐
+
+    작업 상태는 jobs_dir 아래 JSON 파일로 저장되므로 브라우저를 새로 고치거나
+    다른 세션에서도 작업 ID만 있으면 진행 상황을 조회할 수 있다.
+    서버가 재시작되면 끝나지 않은 작업을 다시 제출한다.
+    """
+
+    def __init__(self, jobs_dir, max_workers, handlers):
+        """
+        Args:
+            jobs_dir: 작업 상태 저장 디렉토리
+            max_workers: 동시에 실행할 작업 프로세스 수
+            handlers: {작업 종류: handler(params, progress)} (모듈 최상위 함수여야 함)
+        """
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.handlers = handlers
+        self.max_workers = max_workers
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._resume_unfinished()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_logging,
+            initargs=(get_log_queue(),),
+        )
+
+    def _resume_unfinished(self):
+        """이전 서버 프로세스에서 끝나지 못한 작업 재제출 (MAX_ATTEMPTS번 실행했으면 실패 처리)"""
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            state = read_job(self.jobs_dir, name[: -len(".json")])
+            if not state or state["status"] not in (JobStatus.QUEUED, JobStatus.RUNNING):
+                continue
+            if state.get("attempts", 0) >= MAX_ATTEMPTS:
+                state["status"] = JobStatus.FAILED
+                state["error"] = (
+                    f"작업이 {state['attempts']}번 실행 중에 중단되어 다시 실행하지 않습니다"
+                )
+                write_job(self.jobs_dir, state)
+                continue
+            self._dispatch(state)
+
+    def _dispatch(self, state):
+        state["status"] = JobStatus.QUEUED
+        write_job(self.jobs_dir, state)
+        args = (_run_job, self.jobs_dir, state["id"], self.handlers[state["kind"]])
+        with self._lock:
+            try:
+                future = self._executor.submit(*args)
+            except BrokenProcessPool:
+                # 작업 프로세스가 비정상 종료되면 풀 전체를 쓸 수 없으므로 새로 만든다
+                self._executor = self._new_executor()
+                future = self._executor.submit(*args)
+        future.add_done_callback(lambda future: self._on_done(state["id"], future))
+
+    def _on_done(self, job_id, future):
+        """작업 프로세스가 결과를 남기지 못하고 끝난 작업 실패 처리
+
+        handler 예외는 _run_job이 상태 파일에 기록하므로, 여기서는 작업 프로세스
+        비정상 종료(BrokenProcessPool)나 인자 직렬화 실패처럼 future에만 남는 오류를 처리한다.
+        """
+        if future.cancelled():
+            # shutdown으로 취소된 작업은 QUEUED로 남겨 다음 서버 시작 때 재제출
+            return
+        error = future.exception()
+        if error is None:
+            return
+        state = read_job(self.jobs_dir, job_id)
+        if state is None or state["status"] in (JobStatus.DONE, JobStatus.FAILED):
+            return
+        state["status"] = JobStatus.FAILED
+        state["error"] = f"{type(error).__name__}: {error}"
+        write_job(self.jobs_dir, state)
+
+    def submit(self, kind, params):
+        """작업 제출 후 작업 ID 반환"""
+        state = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params,
+            "status": JobStatus.QUEUED,
+            "progress": {"done": 0, "total": 0, "stage": None},
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "created_at": time.time(),
+        }
+        self._dispatch(state)
+        return state["id"]
+
+    def get(self, job_id):
+        """작업 상태 조회"""
+        return read_job(self.jobs_dir, job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(jobs_dir, max_workers, handlers):
+    """서버 프로세스 전역 작업 큐 (Streamlit rerun 사이에서 공유)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(jobs_dir, max_workers, handlers)
+        return _queue
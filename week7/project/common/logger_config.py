@@ -1,39 +1,103 @@
+import atexit
 import logging
+import multiprocessing
 import os
-from datetime import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from common.settings import get_settings
 
+LOGGER_NAME = "SpeechNote"
 
-def setup_logger():
-    # 로그 디렉토리 생성
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
+_lock = threading.Lock()
 
-    # 로그 파일명에 날짜 포함
-    log_file = os.path.join(
-        log_dir, f"speechnote_{datetime.now().strftime('%Y%m%d')}.log"
-    )
 
-    # 로거 설정
-    logger = logging.getLogger("SpeechNote")
-    logger.setLevel(logging.DEBUG)
+def _configure(logger):
+    """config.yml logging 항목대로 핸들러 구성
 
-    # 파일 핸들러
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
+    로거에는 QueueHandler 하나만 붙이고, 실제 파일/콘솔 출력은 QueueListener 스레드가 처리한다.
+    파일은 자정마다 교체되며 backup_count일치만 보관한다.
+    로그 파일은 메인 프로세스만 열고, 작업 프로세스는 init_worker_logging으로
+    같은 큐에 기록한다 (여러 프로세스가 같은 파일을 교체하지 않도록).
+    """
+    config = get_settings()["logging"]
+    formatter = logging.Formatter(config["format"])
 
     # 콘솔 핸들러
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(config["console_level"])
+    console_handler.setFormatter(formatter)
+
+    if multiprocessing.parent_process() is not None:
+        # init_worker_logging 전에 로그를 남긴 작업 프로세스: 파일은 열지 않고 콘솔에만 출력
+        logger.setLevel(console_handler.level)
+        logger.addHandler(console_handler)
+        logger.propagate = False
+        return
 
-    # 포맷 설정
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    os.makedirs(config["directory"], exist_ok=True)
+
+    # 파일 핸들러 (일 단위 교체)
+    file_handler = TimedRotatingFileHandler(
+        os.path.join(config["directory"], "speechnote.log"),
+        when="midnight",
+        backupCount=config["backup_count"],
+        encoding="utf-8",
+        delay=True,
     )
+    file_handler.setLevel(config["file_level"])
     file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
 
-    # 핸들러 추가
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # 작업 프로세스에도 넘길 수 있는 프로세스 간 큐
+    log_queue = multiprocessing.get_context("spawn").Queue()
+    listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    queue_handler = QueueHandler(log_queue)
+
+    logger.setLevel(min(file_handler.level, console_handler.level))
+    logger.addHandler(queue_handler)
+    logger.propagate = False
 
+    listener.start()
+    # 종료 시 큐에 남은 로그 기록
+    atexit.register(listener.stop)
+
+
+def setup_logger():
+    """공유 로거 반환 (핸들러는 프로세스마다 한 번만 구성)"""
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if not logger.handlers:
+            _configure(logger)
     return logger
+
+
+def get_log_queue():
+    """작업 프로세스에 넘길 로그 큐 (ProcessPoolExecutor initargs로 전달, 없으면 None)"""
+    for handler in setup_logger().handlers:
+        if isinstance(handler, QueueHandler):
+            return handler.queue
+    return None
+
+
+def init_worker_logging(log_queue):
+    """작업 프로세스 로거를 메인 프로세스 로그 큐에 기록하도록 구성
+
+    ProcessPoolExecutor initializer로 호출한다. 작업 프로세스가 다시 작업 프로세스를 만들 때도
+    get_log_queue()가 이 큐를 돌려주므로 모든 로그가 메인 프로세스의 파일 하나로 모인다.
+    """
+    if log_queue is None:
+        return
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        config = get_settings()["logging"]
+        logger.setLevel(
+            min(
+                logging.getLevelName(config["file_level"]),
+                logging.getLevelName(config["console_level"]),
+            )
+        )
+        logger.addHandler(QueueHandler(log_queue))
+        logger.propagate = False
@@ -0,0 +1,175 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil  # 선택 의존성: 현재 RSS 조회 (자식 프로세스 포함)
+except ImportError:
+    psutil = None
+
+
+def current_rss_mb():
+    """현재 프로세스와 자식 프로세스(화자 분리 작업 프로세스, ffmpeg)의 RSS 합 (MB)
+
+    psutil이 없으면 Linux에서 현재 프로세스 RSS만 읽고, 그것도 안 되면 None.
+    """
+    if psutil is not None:
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass  # 조회 중 종료된 프로세스
+        return rss / (1024 * 1024)
+    try:
+        # /proc/self/statm 두 번째 값: 현재 RSS (페이지 단위)
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Metrics:
+    """작업 하나의 단계별 계측
+
+    span(단계)으로 감싼 구간의 실행 시간을 누적하고, 카운터(처리 바이트, 요청 수 등)와
+    값(오디오 길이 등)을 함께 기록한다. 각 span이 끝날 때와 start_sampling 이후 백그라운드
+    스레드에서 주기적으로 RSS를 샘플링해 이 작업 동안의 최대값을 남긴다.
+    여러 스레드에서 동시에 기록해도 된다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.spans = {}
+        self.counters = {}
+        self.values = {}
+        self.peak_rss_mb = None
+        self._lock = threading.Lock()
+        self._begin = time.perf_counter()
+        self._sampler = None
+        self._stop_sampling = threading.Event()
+        self.sample_memory()
+
+    @contextmanager
+    def span(self, stage):
+        """블록 실행 시간을 stage에 누적"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - begin)
+            self.sample_memory()
+
+    def record(self, stage, seconds):
+        """다른 곳에서 잰 실행 시간 기록 (예: 작업 프로세스의 화자 분리 시간)"""
+        with self._lock:
+            self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def incr(self, counter, value=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def set(self, key, value):
+        with self._lock:
+            self.values[key] = value
+
+    def sample_memory(self):
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        with self._lock:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+
+    def start_sampling(self, interval_sec):
+        """stop_sampling까지 interval_sec마다 RSS 샘플링 (span 중간의 최대값도 잡도록)"""
+        if self._sampler is not None:
+            return
+
+        def run():
+            while not self._stop_sampling.wait(interval_sec):
+                self.sample_memory()
+
+        self._sampler = threading.Thread(
+            target=run, name=f"metrics-{self.name}", daemon=True
+        )
+        self._sampler.start()
+
+    def stop_sampling(self):
+        """백그라운드 샘플링 종료 (마지막으로 한 번 더 샘플링)"""
+        if self._sampler is None:
+            return
+        self._stop_sampling.set()
+        self._sampler.join()
+        self._sampler = None
+        self.sample_memory()
+
+    @property
+    def wall_sec(self):
+        return time.perf_counter() - self._begin
+
+    def to_dict(self):
+        """JSON 직렬화용 요약 (오디오 길이가 있으면 실시간 배율 RTF 포함)"""
+        wall_sec = self.wall_sec
+        with self._lock:
+            data = {
+                "name": self.name,
+                "started_at": self.started_at,
+                "wall_sec": wall_sec,
+                "spans": dict(self.spans),
+                "counters": dict(self.counters),
+                "values": dict(self.values),
+                "peak_rss_mb": self.peak_rss_mb,
+            }
+        audio_sec = data["values"].get("audio_sec")
+        data["rtf"] = wall_sec / audio_sec if audio_sec else None
+        return data
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식"""
+        data = self.to_dict()
+        job = data["name"]
+        lines = [
+            "# TYPE speechnote_stage_seconds gauge",
+            *(
+                f'speechnote_stage_seconds{{job="{job}",stage="{stage}"}} {seconds:.6f}'
+                for stage, seconds in data["spans"].items()
+            ),
+            "# TYPE speechnote_counter_total counter",
+            *(
+                f'speechnote_counter_total{{job="{job}",name="{name}"}} {value}'
+                for name, value in data["counters"].items()
+            ),
+            "# TYPE speechnote_wall_seconds gauge",
+            f'speechnote_wall_seconds{{job="{job}"}} {data["wall_sec"]:.6f}',
+        ]
+        if data["rtf"] is not None:
+            lines += [
+                "# TYPE speechnote_real_time_factor gauge",
+                f'speechnote_real_time_factor{{job="{job}"}} {data["rtf"]:.6f}',
+            ]
+        if data["peak_rss_mb"] is not None:
+            lines += [
+                "# TYPE speechnote_peak_rss_megabytes gauge",
+                f'speechnote_peak_rss_megabytes{{job="{job}"}} {data["peak_rss_mb"]:.1f}',
+            ]
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory):
+        """<directory>/<name>.json, <name>.prom 으로 최근 실행 결과 저장 (임시 파일 후 교체)"""
+        os.makedirs(directory, exist_ok=True)
+        outputs = {
+            f"{self.name}.json": json.dumps(self.to_dict(), ensure_ascii=False, indent=2),
+            f"{self.name}.prom": self.to_prometheus(),
+        }
+        for file_name, content in outputs.items():
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, os.path.join(directory, file_name))
+
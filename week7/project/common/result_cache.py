@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+class ResultCache:
+    """오디오 내용 해시 + 설정 지문을 키로 쓰는 디스크 결과 캐시
+
+    단계(namespace)별로 JSON 파일 하나에 결과 하나를 저장한다.
+    조회할 때마다 파일 수정 시간을 갱신하고, 전체 크기가 한도를 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제한다 (LRU).
+    전체 크기는 처음 저장할 때 한 번만 디렉토리를 훑어 구하고 이후에는 저장/삭제할 때
+    갱신하므로, 디렉토리를 다시 훑는 것은 한도를 넘었을 때뿐이다.
+    """
+
+    def __init__(self, cache_dir, max_size_mb):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._size = None  # 캐시 전체 크기 (bytes, 처음 저장할 때 계산)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_file(file_name, block_size=1024 * 1024):
+        """파일 내용 SHA-256 해시 (블록 단위로 읽어 메모리 사용 제한)"""
+        digest = hashlib.sha256()
+        with open(file_name, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_text(text):
+        """텍스트 내용 SHA-256 해시"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def fingerprint(**params):
+        """모델/설정 값으로 캐시 지문 생성"""
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(*parts):
+        return "_".join(str(part) for part in parts)
+
+    def _path(self, namespace, key):
+        return os.path.join(self.cache_dir, namespace, key[:2], f"{key}.json")
+
+    def get(self, namespace, key):
+        """캐시 조회 (없으면 None)"""
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # LRU 순서 갱신
+            return value
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, namespace, key, value):
+        """캐시 저장 (임시 파일에 쓴 뒤 교체하여 중간 상태가 남지 않도록 함)"""
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+
+        with self._lock:
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = sum(entry[1] for entry in self._scan())
+            else:
+                self._size += size - replaced
+            if self._size > self.max_size:
+                self._evict()
+
+    def _scan(self):
+        """캐시 항목 (마지막 사용 시각, 크기, 경로) 목록"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """오래 사용되지 않은 항목부터 한도 이하가 될 때까지 삭제 (잠금을 잡은 상태에서 호출)
+
+        다른 프로세스가 같은 디렉토리에 저장했을 수도 있으므로 실제 크기를 다시 훑어 맞춘다.
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
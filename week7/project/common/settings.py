@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+import yaml
+
+# 실행 위치(CWD)와 관계없이 프로젝트 루트의 config.yml 사용
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.environ.get(
+    "SPEECHNOTE_CONFIG", os.path.join(PROJECT_DIR, "config.yml")
+)
+
+# 파일 변경 확인 간격 (초): 설정을 자주 읽어도 stat은 이 간격으로만 호출
+RELOAD_CHECK_SEC = 1.0
+
+NUMBER = (int, float)
+
+# WAV 헤더 크기 (bytes)
+WAV_HEADER_BYTES = 44
+
+# 필수 항목과 타입 (로드/재로드 시 검증)
+SCHEMA = {
+    "app": {"title": str, "icon": str, "description": str},
+    "paths": {"save_dir": str},
+    "file": {
+        "allowed_audio_extensions": list,
+        "binary_extensions": list,
+        "mmap_threshold_mb": NUMBER,
+        "detect_sample_kb": int,
+        "catalog_ttl_sec": NUMBER,
+    },
+    "ui": {
+        "default_text_height": int,
+        "new_note_label": str,
+        "transcript_page_size": int,
+    },
+    "transcriber": {
+        "openai": {
+            "models": {"default": str, "available": list},
+            "transcript_model": str,
+        },
+        "audio": {
+            "target_size_mb": NUMBER,
+            "split_length_min": NUMBER,
+            "sample_rate": int,
+        },
+        "pipeline": {"parallel_diarization": bool, "incremental_output": bool},
+        "concurrency": {
+            "max_workers": int,
+            "max_retries": int,
+            "retry_backoff_sec": NUMBER,
+        },
+        "summary_prompt": str,
+        "summary": {
+            "chunk_tokens": int,
+            "max_workers": int,
+            "map_prompt": str,
+            "reduce_prompt": str,
+        },
+    },
+    "word2back": {
+        "inference": {
+            "window_sec": NUMBER,
+            "stride_sec": NUMBER,
+            "batch_size": int,
+            "backend": str,
+            "onnx_path": str,
+        },
+    },
+    "models": {"idle_timeout_sec": NUMBER, "min_available_memory_mb": NUMBER},
+    "jobs": {"dir": str, "max_workers": int, "poll_interval_sec": NUMBER},
+    "cache": {"dir": str, "max_size_mb": NUMBER},
+    "metrics": {"dir": str, "memory_sample_sec": NUMBER},
+    "logging": {
+        "file_level": str,
+        "console_level": str,
+        "format": str,
+        "directory": str,
+        "backup_count": int,
+    },
+}
+
+
+class SettingsError(ValueError):
+    """설정 파일 형식 오류"""
+
+
+class Settings(Mapping):
+    """읽기 전용 설정 (기존 dict 접근 config["a"]["b"]와 속성 접근 config.a.b 모두 지원)"""
+
+    def __init__(self, data):
+        object.__setattr__(self, "_data", {key: _freeze(value) for key, value in data.items()})
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings는 변경할 수 없습니다")
+
+    def __repr__(self):
+        return f"Settings({self._data!r})"
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return Settings(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _validate(data, schema, path=""):
+    if not isinstance(data, dict):
+        raise SettingsError(f"{path or '설정'}: 항목 목록이어야 합니다")
+    for key, expected in schema.items():
+        name = f"{path}.{key}" if path else key
+        if key not in data:
+            raise SettingsError(f"{name}: 필수 항목이 없습니다")
+        value = data[key]
+        if isinstance(expected, dict):
+            _validate(value, expected, name)
+            continue
+        expected = expected if isinstance(expected, tuple) else (expected,)
+        # bool은 int의 하위 타입이므로 숫자 항목에 true/false가 들어가지 않도록 따로 확인
+        if not isinstance(value, expected) or (
+            isinstance(value, bool) and bool not in expected
+        ):
+            raise SettingsError(f"{name}: 타입이 올바르지 않습니다 (현재 {value!r})")
+
+
+def wav_chunk_mb(split_length_min, sample_rate):
+    """분할 업로드 청크(16비트 모노 WAV) 한 개의 크기 (MB)"""
+    return (split_length_min * 60 * sample_rate * 2 + WAV_HEADER_BYTES) / (1024 * 1024)
+
+
+def _validate_audio(audio):
+    """분할 청크가 업로드 크기(target_size_mb)를 넘지 않는지 확인"""
+    chunk_mb = wav_chunk_mb(audio["split_length_min"], audio["sample_rate"])
+    if audio["split_length_min"] <= 0 or chunk_mb > audio["target_size_mb"]:
+        max_min = (audio["target_size_mb"] * 1024 * 1024 - WAV_HEADER_BYTES) / (
+            60 * audio["sample_rate"] * 2
+        )
+        raise SettingsError(
+            f"transcriber.audio.split_length_min: 0보다 크고 {max_min:.1f}분 이하여야 합니다 "
+            f"({audio['sample_rate']}Hz WAV 청크 {chunk_mb:.1f}MB, "
+            f"target_size_mb {audio['target_size_mb']}MB)"
+        )
+
+
+def load_settings(path=CONFIG_PATH):
+    """config.yml 로드 및 검증"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    _validate(data, SCHEMA)
+    _validate_audio(data["transcriber"]["audio"])
+    return Settings(data)
+
+
+class _SettingsCache:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._settings = None
+        self._mtime_ns = None
+        self._checked_at = 0.0
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._settings is not None and now - self._checked_at < RELOAD_CHECK_SEC:
+                return self._settings
+            self._checked_at = now
+
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if mtime_ns == self._mtime_ns:
+                return self._settings
+            try:
+                settings = load_settings(self.path)
+            except (OSError, yaml.YAMLError, SettingsError) as e:
+                if self._settings is None:
+                    raise
+                # 편집 중인 잘못된 설정으로 실행 중인 앱이 멈추지 않도록 이전 설정 유지
+                logging.getLogger("SpeechNote").error(
+                    f"설정 파일 재로드 실패, 이전 설정 유지: {str(e)}"
+                )
+                self._mtime_ns = mtime_ns
+                return self._settings
+            self._settings = settings
+            self._mtime_ns = mtime_ns
+            return settings
+
+
+_cache = _SettingsCache(CONFIG_PATH)
+
+
+def get_settings():
+    """프로세스 전역 설정 (config.yml이 바뀌면 자동으로 다시 로드)"""
+    return _cache.get()
@@ -0,0 +1,282 @@
+import json
+import os
+import struct
+from bisect import bisect_left
+
+try:
+    import fcntl  # 선택 의존성: 작업 프로세스와 UI 프로세스가 인덱스를 함께 갱신할 때 잠금
+except ImportError:
+    fcntl = None
+
+# 인덱스 레코드: 줄 시작 위치, 줄 길이(bytes), 시작 시간, 종료 시간, 화자 번호
+_RECORD = struct.Struct("<QIddI")
+
+
+class _StartTimes:
+    """인덱스 파일의 시작 시간을 시퀀스처럼 조회 (bisect용, 접근할 때마다 레코드 1개만 읽음)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        return self.store._record(index)[2]
+
+
+class TranscriptStore:
+    """인덱스 사이드카를 둔 추가 전용 노트 저장소
+
+    본문은 기존과 같은 JSONL(<노트>.jsonl)이고, 옆에 줄마다 고정 크기 레코드를 기록한
+    인덱스(<노트>.jsonl.idx)와 화자 이름 목록(<노트>.jsonl.labels)을 둔다.
+    페이지/시간 구간 조회는 필요한 레코드와 줄만 읽으므로 노트 크기가 아니라
+    읽는 양에 비례하는 비용이 든다.
+
+    다른 프로세스가 본문 끝에 줄을 추가했다면 다음 조회 때 늘어난 부분만 인덱싱하고,
+    본문이 잘렸거나 다시 쓰였으면 인덱스를 새로 만든다.
+    세그먼트는 시간 순서대로 추가된다고 가정한다.
+    """
+
+    SCAN_RECORDS = 4096  # 화자 조회 시 인덱스를 한 번에 읽는 레코드 수
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.index_path = f"{file_path}.idx"
+        self.labels_path = f"{file_path}.labels"
+        self._labels = []
+        self._count = 0
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # 인덱스 관리
+
+    def _lock(self):
+        """인덱스 갱신 잠금 파일 열기 (fcntl이 없으면 잠금 없이 진행)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        lock_file = open(f"{self.index_path}.lock", "a")
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _load_labels(self):
+        try:
+            with open(self.labels_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save_labels(self):
+        tmp_path = f"{self.labels_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._labels, f, ensure_ascii=False)
+        os.replace(tmp_path, self.labels_path)
+
+    def _label_id(self, label):
+        if label not in self._labels:
+            self._labels.append(label)
+            self._save_labels()
+        return self._labels.index(label)
+
+    def _record(self, index):
+        with open(self.index_path, "rb") as f:
+            f.seek(index * _RECORD.size)
+            return _RECORD.unpack(f.read(_RECORD.size))
+
+    def _records(self, first, count):
+        """인덱스 레코드 first부터 최대 count개"""
+        count = max(0, min(count, self._count - first))
+        if count == 0:
+            return []
+        with open(self.index_path, "rb") as f:
+            f.seek(first * _RECORD.size)
+            data = f.read(count * _RECORD.size)
+        return list(_RECORD.iter_unpack(data[: len(data) - len(data) % _RECORD.size]))
+
+    def _indexed_size(self):
+        """인덱스가 가리키는 본문 길이 (마지막 줄이 그대로 남아 있지 않으면 None)"""
+        if self._count == 0:
+            return 0
+        offset, length, start, end, _ = self._record(self._count - 1)
+        try:
+            with open(self.file_path, "rb") as f:
+                f.seek(offset)
+                line = f.read(length)
+            item = json.loads(line)
+        except (OSError, ValueError):
+            return None
+        if not line.endswith(b"\n") or (item["start"], item["end"]) != (start, end):
+            return None
+        return offset + length
+
+    def _index_tail(self, offset):
+        """본문 offset 이후의 완성된 줄을 인덱스에 추가"""
+        records = []
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 아직 기록 중인 줄
+                item = json.loads(line)
+                records.append(
+                    _RECORD.pack(
+                        offset,
+                        len(line),
+                        item["start"],
+                        item["end"],
+                        self._label_id(item["label"]),
+                    )
+                )
+                offset += len(line)
+        if records:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(records))
+            self._count += len(records)
+
+    def _reset_index(self):
+        self._labels = []
+        self._count = 0
+        for path in (self.index_path, self.labels_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def refresh(self):
+        """본문 변경 사항을 인덱스에 반영"""
+        if not os.path.exists(self.file_path):
+            self._reset_index()
+            return
+
+        with self._lock():
+            self._labels = self._load_labels()
+            index_size = (
+                os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+            )
+            self._count = index_size // _RECORD.size
+
+            indexed = self._indexed_size()
+            if indexed is None or indexed > os.path.getsize(self.file_path):
+                self._reset_index()
+                indexed = 0
+            elif index_size % _RECORD.size:
+                # 기록 중 중단된 레코드 제거
+                with open(self.index_path, "ab") as f:
+                    f.truncate(self._count * _RECORD.size)
+            self._index_tail(indexed)
+
+    # ------------------------------------------------------------------
+    # 쓰기
+
+    def append(self, items):
+        """본문 끝에 세그먼트 추가 후 디스크에 반영(fsync)하고 본문 길이(bytes) 반환"""
+        lines = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        with self._lock():
+            with open(self.file_path, "ab") as f:
+                f.write(lines.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+        self.refresh()
+        return size
+
+    def replace(self, items):
+        """노트 전체를 다시 기록 (인덱스도 새로 생성)"""
+        with self._lock():
+            with open(self.file_path, "w", encoding="utf-8") as f:
+                for item in items:
+                    json.dump(item, f, ensure_ascii=False)
+                    f.write("\n")
+            self._reset_index()
+        self.refresh()
+
+    def move(self, file_path):
+        """본문과 인덱스를 file_path로 옮겨 그 자리의 노트를 교체하고 새 저장소 반환"""
+        with self._lock():
+            for suffix in (".idx", ".labels"):
+                if os.path.exists(f"{self.file_path}{suffix}"):
+                    os.replace(f"{self.file_path}{suffix}", f"{file_path}{suffix}")
+            os.replace(self.file_path, file_path)
+        return TranscriptStore(file_path)
+
+    def truncate(self, size):
+        """본문을 size bytes로 자르기 (중단된 기록 정리용)"""
+        with self._lock():
+            with open(self.file_path, "ab") as f:
+                f.truncate(size)
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # 읽기
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def speakers(self):
+        """노트에 등장한 화자 목록 (등장 순서)"""
+        return list(self._labels)
+
+    def read(self, first, count):
+        """first번째 세그먼트부터 최대 count개 (연속 구간을 한 번에 읽음)"""
+        records = self._records(first, count)
+        if not records:
+            return []
+        begin = records[0][0]
+        end = records[-1][0] + records[-1][1]
+        with open(self.file_path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def page(self, page, page_size):
+        """0부터 시작하는 페이지 번호로 조회"""
+        return self.read(page * page_size, page_size)
+
+    def num_pages(self, page_size):
+        return max(1, -(-self._count // page_size))
+
+    def range_by_time(self, start, end, limit=None):
+        """[start, end) 구간과 겹치는 세그먼트 (시작 시간 이분 탐색)"""
+        first = bisect_left(_StartTimes(self), start)
+        # 앞 세그먼트가 start 이후까지 이어지면 포함
+        while first > 0 and self._record(first - 1)[3] > start:
+            first -= 1
+
+        items = []
+        index = first
+        while index < self._count and (limit is None or len(items) < limit):
+            batch = self._records(index, self.SCAN_RECORDS)
+            for record in batch:
+                if record[2] >= end or (limit is not None and len(items) >= limit):
+                    return self._read_records(items)
+                items.append(record)
+            index += len(batch)
+        return self._read_records(items)
+
+    def by_speaker(self, label, offset=0, limit=None):
+        """화자의 세그먼트를 offset번째부터 최대 limit개 (본문이 아니라 인덱스만 훑음)"""
+        if label not in self._labels:
+            return []
+        label_id = self._labels.index(label)
+
+        items = []
+        skipped = 0
+        for first in range(0, self._count, self.SCAN_RECORDS):
+            for record in self._records(first, self.SCAN_RECORDS):
+                if record[4] != label_id:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                items.append(record)
+                if limit is not None and len(items) >= limit:
+                    return self._read_records(items)
+        return self._read_records(items)
+
+    def _read_records(self, records):
+        """레코드가 가리키는 줄만 읽어 파싱"""
+        items = []
+        with open(self.file_path, "rb") as f:
+            for offset, length, *_ in records:
+                f.seek(offset)
+                items.append(json.loads(f.read(length)))
+        return items
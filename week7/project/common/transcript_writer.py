@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+
+
+class IncrementalTranscriptWriter:
+    """청크 단위로 매칭 결과를 노트 JSONL에 이어 쓰는 클래스
+
+    청크 결과는 완료 순서와 관계없이 들어오지만 파일에는 청크 순서대로만 기록한다.
+    청크 하나를 기록할 때마다 fsync 후 체크포인트(<노트>.jsonl.ckpt)에
+    마지막 청크 번호와 파일 길이를 남기므로, 중단된 작업은 마지막으로 기록된
+    청크 다음부터 이어서 진행할 수 있다.
+
+    청크의 마지막 화자 구간은 다음 청크에서 이어질 수 있으므로 바로 쓰지 않고
+    체크포인트에 보관했다가 다음 청크의 같은 구간과 합쳐 기록한다.
+    입력이 다른 기존 노트가 있으면 임시 노트(<노트>.jsonl.partial)에 기록하고
+    변환이 끝났을 때 교체하므로, 새 변환이 실패해도 기존 노트는 남는다.
+    """
+
+    def __init__(self, file_manager, output_path, key, match):
+        """
+        Args:
+            file_manager: JSONL 기록에 사용할 FileManager
+            output_path: 노트 JSONL 경로
+            key: 입력 오디오 + 설정 식별자 (다르면 처음부터 다시 기록)
+            match: match(segments, diarization) 화자 매칭 함수
+        """
+        self.file_manager = file_manager
+        self.output_path = output_path
+        self.staging_path = f"{output_path}.partial"
+        self.checkpoint_path = f"{output_path}.ckpt"
+        self.key = key
+        self.match = match
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._diarization = None
+        self._open_turn = None
+        self.committed = self._resume()
+        self._next_index = self.committed + 1
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_checkpoint(self, chunk, offset, complete=False):
+        """체크포인트 원자적 갱신 (fsync 후 교체)"""
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "key": self.key,
+                    "chunk": chunk,
+                    "offset": offset,
+                    "complete": complete,
+                    "staging": self.staging,
+                    "open_turn": self._open_turn,
+                },
+                f,
+                ensure_ascii=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _resume(self):
+        """마지막으로 기록된 청크 번호 반환 (-1이면 처음부터)
+
+        체크포인트 이후에 일부만 기록된 줄은 잘라낸다.
+        """
+        checkpoint = self._read_checkpoint()
+        if checkpoint is None or checkpoint["key"] != self.key:
+            # 기존 노트는 새 변환이 끝날 때까지 그대로 둔다
+            self.staging = os.path.exists(self.output_path)
+            self.store = self.file_manager.open_transcript(self._write_path)
+            self.store.replace([])
+            self._write_checkpoint(-1, 0)
+            return -1
+
+        self.staging = checkpoint.get("staging", False)
+        self._open_turn = checkpoint.get("open_turn")
+        if checkpoint["complete"]:
+            # 교체 직전에 중단되었으면 마저 교체
+            self._publish()
+        self.store = self.file_manager.open_transcript(self._write_path)
+        self.store.truncate(checkpoint["offset"])
+        return checkpoint["chunk"]
+
+    @property
+    def _write_path(self):
+        return self.staging_path if self.staging else self.output_path
+
+    def _publish(self):
+        """임시 노트를 기존 노트 자리로 교체"""
+        if self.staging and os.path.exists(self.staging_path):
+            self.store = self.file_manager.open_transcript(self.staging_path).move(
+                self.output_path
+            )
+        self.staging = False
+
+    @property
+    def complete(self):
+        checkpoint = self._read_checkpoint()
+        return bool(checkpoint and checkpoint["key"] == self.key and checkpoint["complete"])
+
+    def add_chunk(self, index, segments):
+        """청크 변환 결과 추가 (순서가 맞고 화자 분리가 준비되면 바로 기록)"""
+        with self._lock:
+            if index > self.committed:
+                self._pending[index] = segments
+                self._flush()
+
+    def set_diarization(self, diarization):
+        """화자 구간 설정 (그동안 쌓인 청크 기록)"""
+        with self._lock:
+            self._diarization = diarization
+            self._flush()
+
+    def _flush(self):
+        while self._diarization is not None and self._next_index in self._pending:
+            index = self._next_index
+            items = self.match(self._pending.pop(index), self._diarization)
+            if self._open_turn is not None:
+                if items and _same_turn(items[0], self._open_turn):
+                    # 청크 경계를 넘어 이어진 구간은 한 줄로 합친다
+                    text = self._open_turn["text"] + items[0]["text"]
+                    items[0] = {**items[0], "text": text}
+                else:
+                    items.insert(0, self._open_turn)
+            self._open_turn = items.pop() if items else None
+            offset = self.store.append(items)
+            self._write_checkpoint(index, offset)
+            self.committed = index
+            self._next_index += 1
+
+    def finish(self, num_chunks):
+        """모든 청크가 기록되었는지 확인하고 완료 표시 (임시 노트였다면 기존 노트와 교체)"""
+        with self._lock:
+            self._flush()
+            if self.committed != num_chunks - 1:
+                raise RuntimeError(
+                    f"기록되지 않은 청크가 있습니다: {self.committed + 1}/{num_chunks}"
+                )
+            if self._open_turn is not None:
+                self.store.append([self._open_turn])
+                self._open_turn = None
+            self._write_checkpoint(
+                self.committed, os.path.getsize(self._write_path), complete=True
+            )
+            self._publish()
+
+
+def _same_turn(a, b):
+    return (a["start"], a["end"], a["label"]) == (b["start"], b["end"], b["label"])
@@ -1,3 +1,116 @@
+from heapq import heappop, heappush
+
+try:
+    import tiktoken  # 선택 의존성: 정확한 토큰 수 계산
+except ImportError:
+    tiktoken = None
+
+
 def format_transcript(transcript_data):
     """텍스트 변환 데이터를 보기 좋게 정리"""
-    return "\n".join(f"{item['label']}: {item['text']}" for item in transcript_data)
\ No newline at end of file
+    return "\n".join(f"{item['label']}: {item['text']}" for item in transcript_data)
+
+
+def count_tokens(text, model=None):
+    """텍스트 토큰 수 (tiktoken이 없으면 UTF-8 3바이트 ≈ 1토큰으로 추정)
+
+    model이 없거나 tiktoken이 모르는 모델이면 cl100k_base 인코딩을 사용한다.
+    """
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    # 한글 1자(3바이트) ≈ 1토큰, 영문은 실제보다 약간 많게 추정된다
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _encoding(model):
+    """tiktoken 인코딩 선택 (tiktoken이 인코딩을 내부에서 캐시한다)"""
+    if model is None:
+        return tiktoken.get_encoding("cl100k_base")
+    try:
+        return tiktoken.encoding_for_model(model)
+    except (KeyError, ValueError, AttributeError):
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def split_by_token_budget(lines, budget, count=count_tokens):
+    """줄 단위로 묶어 토큰 예산 이하의 청크 목록 생성
+
+    앞에서부터 채우므로 뒤에 줄이 추가되어도 앞쪽 청크 경계는 바뀌지 않는다.
+    예산보다 긴 줄은 단독 청크가 된다.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for line in lines:
+        tokens = count(line)
+        if current and used + tokens > budget:
+            chunks.append("\n".join(current))
+            current = []
+            used = 0
+        current.append(line)
+        used += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def match_segments_with_speakers(segments, diarization):
+    """변환된 텍스트를 가장 많이 겹치는 화자 구간에 매칭
+
+    세그먼트와 화자 구간을 시작 시간 순으로 함께 훑으며(sweep) 현재 세그먼트와
+    겹칠 수 있는 구간만 활성 집합에 둔다. 세그먼트 시작 전에 끝난 구간은 종료 시간 힙에서
+    꺼내 버리므로 긴 구간이 있어도 후보가 늘어나지 않는다.
+    전체 구간을 모두 비교하던 방식과 동일하게 겹침이 같으면 앞쪽 구간을 선택하고,
+    텍스트는 원래 세그먼트 순서대로 이어 붙인다.
+    """
+    matched_segments = [
+        {
+            "start": diar["start"],
+            "end": diar["end"],
+            "label": diar["label"],
+            "text": "",
+        }
+        for diar in diarization
+    ]
+
+    # 시작 시간 순 정렬 (동일 시작 시간은 원래 순서 유지)
+    order = sorted(range(len(diarization)), key=lambda idx: diarization[idx]["start"])
+    active = {}  # 구간 번호 → 화자 구간
+    ends = []  # (종료 시간, 구간 번호) 최소 힙
+    next_turn = 0
+
+    best = [None] * len(segments)
+    for seg_idx in sorted(range(len(segments)), key=lambda idx: segments[idx]["start"]):
+        segment = segments[seg_idx]
+        # 세그먼트 종료 전에 시작한 구간 추가
+        while (
+            next_turn < len(order)
+            and diarization[order[next_turn]]["start"] < segment["end"]
+        ):
+            idx = order[next_turn]
+            active[idx] = diarization[idx]
+            heappush(ends, (diarization[idx]["end"], idx))
+            next_turn += 1
+        # 세그먼트 시작 전에 끝난 구간 제거 (이후 세그먼트는 더 늦게 시작하므로 다시 쓰이지 않음)
+        while ends and ends[0][0] <= segment["start"]:
+            del active[heappop(ends)[1]]
+
+        max_overlap = 0
+        max_overlap_idx = 0
+        for idx, diar in active.items():
+            overlap = min(segment["end"], diar["end"]) - max(
+                segment["start"], diar["start"]
+            )
+            if overlap > max_overlap or (
+                overlap == max_overlap and overlap > 0 and idx < max_overlap_idx
+            ):
+                max_overlap = overlap
+                max_overlap_idx = idx
+        if max_overlap > 0:
+            best[seg_idx] = max_overlap_idx
+
+    for segment, idx in zip(segments, best):
+        if idx is not None:
+            matched_segments[idx]["text"] += segment["text"].strip() + " "
+
+    return [item for item in matched_segments if item["text"]]
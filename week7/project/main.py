@@ -1,18 +1,20 @@
 import os
+import time
 import streamlit as st
-import yaml
 
 from streamlit_option_menu import option_menu
 from common.file_manager import FileManager
-from model.transcriber import Transcriber
+from common.settings import get_settings
+from common.job_queue import JobStatus, get_job_queue
+from model.jobs import HANDLERS
 from common.constants import FileExtension, MimeType
+from common.utils import format_transcript
 
 # 환경변수에서 API 키 로드
 from dotenv import load_dotenv
 
-# 설정 파일 로드
-with open("config.yml", "r", encoding="utf-8") as f:
-    config = yaml.safe_load(f)
+# 설정 로드 (프로세스 전역 캐시, 파일이 바뀌면 다음 rerun에 반영)
+config = get_settings()
 
 # 환경 .evn 파일 불러오기
 load_dotenv()
@@ -20,10 +22,6 @@ load_dotenv()
 # 기본 디렉터리 설정
 SAVE_DIR = config["paths"]["save_dir"]
 file_manager = FileManager(SAVE_DIR)
-transcriber = Transcriber(
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    hf_token=os.getenv("HUGGINGFACE_AUTH_TOKEN"),
-)
 
 # UI 설정
 st.set_page_config(
@@ -32,6 +30,30 @@ st.set_page_config(
 st.title(config["app"]["title"])
 st.write(config["app"]["description"])
 
+# 변환/요약은 작업 프로세스에서 실행 (스크립트 스레드를 막지 않음)
+job_queue = get_job_queue(
+    config["jobs"]["dir"], config["jobs"]["max_workers"], HANDLERS
+)
+JOB_LABELS = {"transcribe": "변환", "summarize": "요약"}
+
+# 새로고침 후에도 URL의 job 파라미터로 진행 중인 작업을 이어서 조회
+if "job_id" not in st.session_state and "job" in st.query_params:
+    st.session_state.job_id = st.query_params["job"]
+
+
+def start_job(kind, params):
+    """작업 제출 후 현재 세션/URL에 작업 ID 기록"""
+    job_id = job_queue.submit(kind, params)
+    st.session_state.job_id = job_id
+    st.query_params["job"] = job_id
+
+
+def clear_job():
+    """완료/실패한 작업 ID 정리"""
+    st.session_state.pop("job_id", None)
+    st.query_params.pop("job", None)
+
+
 # 파일 업로드
 sound_file = st.file_uploader(
     "내담자와 대화한 파일을 업로드하세요",
@@ -46,11 +68,7 @@ with st.sidebar:
     if st.button("새로운 노트 생성"):
         if new_note_name:
             # 새로운 노트 이름으로 폴더 생성
-            notes_list = file_manager.get_note_list()
-            if new_note_name not in notes_list:
-                os.makedirs(
-                    file_manager.get_file_path(new_note_name, ""), exist_ok=True
-                )  # 폴더 생성
+            if file_manager.create_note(new_note_name):
                 st.success(f"{new_note_name} 노트가 생성되었습니다.")
             else:
                 st.error("이미 존재하는 노트 이름입니다.")
@@ -67,9 +85,53 @@ if selected_note != config["ui"]["new_note_label"]:
     transcript_file = file_manager.get_file_path(
         selected_note, f"{selected_note}{FileExtension.JSONL.value}"
     )
-    transcript_data = file_manager.load_jsonl(transcript_file)
+    transcript_store = file_manager.open_transcript(transcript_file)
 else:
-    transcript_data = []
+    transcript_store = None
+
+
+@st.cache_data(max_entries=8)
+def load_transcript_text(transcript_path, size):
+    """다운로드용 전체 텍스트 (파일 길이가 바뀔 때만 다시 생성)"""
+    return format_transcript(file_manager.load_jsonl(transcript_path))
+
+
+# 작업 진행 상황 표시
+polling = False
+job = None
+if "job_id" in st.session_state:
+    job = job_queue.get(st.session_state.job_id)
+    if job is None:
+        clear_job()
+
+if job is not None:
+    label = JOB_LABELS[job["kind"]]
+    if job["status"] in (JobStatus.QUEUED, JobStatus.RUNNING):
+        done, total = job["progress"]["done"], job["progress"]["total"]
+        stage = job["progress"]["stage"] or "대기"
+        st.progress(
+            done / total if total else 0.0,
+            text=f"{label} 중... ({stage} {done}/{total})",
+        )
+        if job["kind"] == "transcribe" and transcript_store:
+            st.caption(f"기록된 구간까지 표시 중 ({len(transcript_store)}개 세그먼트)")
+        polling = True
+    elif job["status"] == JobStatus.DONE:
+        # 지표 파일은 다른 작업이 덮어쓰므로 이 작업 결과에 담긴 지표를 보관해 표시
+        st.session_state.job_metrics = (label, job["result"]["metrics"])
+        if job["kind"] == "transcribe":
+            transcript_store = file_manager.open_transcript(
+                job["result"]["output_path"]
+            )
+        else:
+            st.session_state.summary_text = file_manager.load_file(
+                job["result"]["output_path"]
+            )
+        st.success(f"{label} 완료")
+        clear_job()
+    else:
+        st.error(f"{label} 실패: {job['error']}")
+        clear_job()
 
 # 오디오 파일 저장 및 변환
 if sound_file:
@@ -78,58 +140,123 @@ if sound_file:
     file_name = sound_file.name
     file_path = file_manager.get_file_path(selected_note, file_name)
 
-    if not file_manager.load_file(file_path):
-        with open(file_path, "wb") as f:
-            f.write(sound_file.read())
+    if not os.path.exists(file_path):
+        file_manager.save_binary(file_path, sound_file.read())
+
+    transcript_file = file_manager.get_file_path(
+        selected_note, f"{selected_note}{FileExtension.JSONL.value}"
+    )
 
     col1, col2 = st.columns(2)
-    if col1.button("변환 시작"):
-        with st.spinner("변환 중..."):
-            transcript_data = transcriber.transcribe(file_name=file_path)
-            transcript_file = file_manager.get_file_path(
-                selected_note, f"{selected_note}{FileExtension.JSONL.value}"
-            )
-            file_manager.save_jsonl(transcript_file, transcript_data)
+    if col1.button("변환 시작", disabled=polling):
+        start_job(
+            "transcribe",
+            {
+                "file_path": file_path,
+                "speaker_num": 2,
+                "save_dir": SAVE_DIR,
+                "output_path": transcript_file,
+            },
+        )
+        st.rerun()
 
-    if transcript_data:
+    if transcript_store:
         st.write("변환된 텍스트:")
-        for item in transcript_data:
+        # 현재 페이지의 세그먼트만 읽는다 (노트 전체를 불러오지 않음)
+        page_size = config["ui"]["transcript_page_size"]
+        speaker = st.selectbox("화자", ["전체"] + transcript_store.speakers)
+        if speaker == "전체":
+            page = st.number_input(
+                "페이지", min_value=1, max_value=transcript_store.num_pages(page_size)
+            )
+            page_items = transcript_store.page(page - 1, page_size)
+        else:
+            page = st.number_input("페이지", min_value=1)
+            page_items = transcript_store.by_speaker(
+                speaker, offset=(page - 1) * page_size, limit=page_size
+            )
+
+        for item in page_items:
             st.text_area(
                 f"{item['label']} ({item['start']} - {item['end']})",
                 item["text"],
                 height=config["ui"]["default_text_height"],
             )
 
-        formatted_text = "\n".join(
-            f"{t['label']}: {t['text']}" for t in transcript_data
-        )
         st.download_button(
-            "변환된 텍스트 다운로드", formatted_text, file_name="transcript.txt"
+            "변환된 텍스트 다운로드",
+            load_transcript_text(
+                transcript_store.file_path, os.path.getsize(transcript_store.file_path)
+            ),
+            file_name="transcript.txt",
         )
 
-    if col2.button("요약"):
-        with st.spinner("요약 중..."):
-            summary_text = transcriber.summarize()
-            summary_file = file_manager.get_file_path(
-                selected_note, f"{selected_note}_summary.txt"
-            )
-            file_manager.save_file(summary_file, summary_text)
-            st.write("요약 결과:")
-            st.text_area(
-                "요약", summary_text, height=config["ui"]["default_text_height"]
-            )
+    if col2.button("요약", disabled=polling):
+        summary_file = file_manager.get_file_path(
+            selected_note, f"{selected_note}_summary.txt"
+        )
+        start_job(
+            "summarize",
+            {
+                "save_dir": SAVE_DIR,
+                "transcript_path": transcript_file,
+                "output_path": summary_file,
+            },
+        )
+        st.rerun()
+
+    summary_text = st.session_state.get("summary_text")
+    if summary_text:
+        st.write("요약 결과:")
+        st.text_area("요약", summary_text, height=config["ui"]["default_text_height"])
 
-            st.download_button("요약 다운로드", summary_text, file_name="summary.txt")
+        st.download_button("요약 다운로드", summary_text, file_name="summary.txt")
 
 # 오디오 파일 다운로드 (바이너리 처리)
+@st.cache_data(max_entries=2)
+def load_audio_bytes(sound_path, mtime_ns):
+    """다운로드용 오디오 (파일이 바뀔 때만 다시 읽음)
+
+    Streamlit 다운로드 버튼은 bytes가 필요하므로 큰 파일(mmap)은 한 번만 복사해 캐시한다.
+    """
+    sound_data = file_manager.load_file(sound_path)
+    if isinstance(sound_data, bytes):
+        return sound_data
+    with sound_data:
+        return sound_data[:]
+
+
 if selected_note != config["ui"]["new_note_label"] and 'file_name' in locals():
     sound_path = file_manager.get_file_path(selected_note, file_name)
-    sound_data = file_manager.load_file(sound_path)
 
-    if isinstance(sound_data, bytes):  # 바이너리 파일인 경우
+    if os.path.exists(sound_path):
         st.download_button(
             "오디오 파일 다운로드",
-            sound_data,
+            load_audio_bytes(sound_path, os.stat(sound_path).st_mtime_ns),
             file_name=file_name,
             mime=MimeType.AUDIO.value,
         )
+
+# 이 세션에서 마지막으로 끝난 작업의 단계별 지표 (디버그)
+with st.expander("처리 지표 (디버그)"):
+    if "job_metrics" not in st.session_state:
+        st.caption("아직 기록된 지표가 없습니다.")
+    else:
+        metrics_label, metrics = st.session_state.job_metrics
+        st.caption(f"최근 {metrics_label} 작업")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("전체 시간", f"{metrics['wall_sec']:.1f}초")
+        col2.metric("RTF", f"{metrics['rtf']:.3f}" if metrics["rtf"] is not None else "-")
+        col3.metric(
+            "최대 RSS",
+            f"{metrics['peak_rss_mb']:.0f}MB" if metrics["peak_rss_mb"] is not None else "-",
+        )
+        st.write("단계별 시간(초)")
+        st.table({stage: [seconds] for stage, seconds in metrics["spans"].items()})
+        st.write("카운터")
+        st.json({**metrics["counters"], **metrics["values"]})
+
+# 작업이 끝날 때까지 주기적으로 다시 실행하여 진행 상황 갱신
+if polling:
+    time.sleep(config["jobs"]["poll_interval_sec"])
+    st.rerun()
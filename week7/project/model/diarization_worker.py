@@ -0,0 +1,58 @@
+import threading
+import time
+from common.audio_stream import DecodedAudio
+from common.logger_config import init_worker_logging
+from common.settings import get_settings
+from model.registry import get_diarization_pipeline, registry
+
+# 작업 프로세스의 Hugging Face 토큰 (파이프라인은 모델 레지스트리가 보관)
+_hf_token = None
+# 마지막 작업 후 idle_timeout_sec가 지나면 모델을 해제하는 타이머
+_collect_timer = None
+_timer_lock = threading.Lock()
+
+
+def init_worker(hf_token, log_queue=None):
+    """작업 프로세스 초기화: 로그를 부모 프로세스 큐로 보내고 화자 분리 파이프라인 로드"""
+    global _hf_token
+    init_worker_logging(log_queue)
+    _hf_token = hf_token
+    get_diarization_pipeline(hf_token)
+
+
+def _collect_models():
+    """오래 사용하지 않은 모델 해제 (메모리가 부족하면 추가 해제)"""
+    models = get_settings()["models"]
+    registry.collect(models["idle_timeout_sec"], models["min_available_memory_mb"])
+
+
+def _schedule_collect():
+    """작업이 끝날 때 한 번, 다음 작업 없이 idle_timeout_sec가 지나면 다시 한 번 해제"""
+    global _collect_timer
+    _collect_models()
+    with _timer_lock:
+        if _collect_timer is not None:
+            _collect_timer.cancel()
+        _collect_timer = threading.Timer(
+            get_settings()["models"]["idle_timeout_sec"] + 1, _collect_models
+        )
+        _collect_timer.daemon = True
+        _collect_timer.start()
+
+
+def diarize_pcm(pcm_path, sample_rate, speaker_num):
+    """부모 프로세스가 디코딩한 PCM 파일로 화자 분리 수행
+
+    파이프라인은 호출마다 모델 레지스트리에서 가져오므로 해제된 뒤에는 다시 로드된다.
+
+    Returns:
+        (to_lab 문자열, 소요 시간(초))
+    """
+    begin = time.perf_counter()
+    try:
+        pipeline = get_diarization_pipeline(_hf_token)
+        with DecodedAudio.from_pcm(pcm_path, sample_rate) as audio:
+            diar = pipeline(audio.to_pyannote_input(), num_speakers=speaker_num)
+        return diar.to_lab(), time.perf_counter() - begin
+    finally:
+        _schedule_collect()
@@ -0,0 +1,96 @@
+import copy
+import os
+import torch
+from common.logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class TorchBackend:
+    """기본 PyTorch 추론 (fp32, 모델이 올라간 장치 그대로 사용)"""
+
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model
+
+    def logits(self, input_values):
+        """(batch, samples) 입력 → (batch, frames, vocab) CPU 텐서"""
+        with torch.no_grad():
+            input_values = input_values.to(self.model.device)
+            return self.model(input_values=input_values).logits.cpu()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Linear 레이어 int8 동적 양자화 (CPU 전용)
+
+    전달받은 모델은 다른 백엔드와 공유될 수 있으므로 장치를 옮기거나 바꾸지 않고 사본을 양자화한다.
+    """
+
+    name = "quantized"
+
+    def __init__(self, model):
+        quantized = torch.quantization.quantize_dynamic(
+            copy.deepcopy(model).to("cpu"), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized)
+
+
+class OnnxBackend:
+    """ONNX Runtime CPU 추론 (모델 파일이 없으면 처음 한 번 내보내기)"""
+
+    name = "onnx"
+
+    def __init__(self, model, onnx_path):
+        import onnxruntime  # 선택 의존성: 없으면 create_backend에서 torch로 대체
+
+        if not os.path.exists(onnx_path):
+            self._export(model, onnx_path)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    @staticmethod
+    def _export(model, onnx_path):
+        logger.info(f"ONNX 모델 내보내기: {onnx_path}")
+        os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+        # 공유 모델을 CPU로 옮기지 않도록 사본으로 내보낸다
+        model = copy.deepcopy(model).to("cpu").eval()
+        dummy = torch.zeros(1, 16000)
+        torch.onnx.export(
+            model,
+            (dummy,),
+            onnx_path,
+            input_names=["input_values"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_values": {0: "batch", 1: "samples"},
+                "logits": {0: "batch", 1: "frames"},
+            },
+            opset_version=14,
+        )
+
+    def logits(self, input_values):
+        outputs = self.session.run(
+            ["logits"], {"input_values": input_values.cpu().numpy()}
+        )
+        return torch.from_numpy(outputs[0])
+
+
+def create_backend(name, model, onnx_path=None):
+    """설정 이름으로 추론 백엔드 생성 (실패하면 기본 torch 백엔드로 대체)"""
+    try:
+        if name == "quantized":
+            return QuantizedTorchBackend(model)
+        if name == "onnx":
+            return OnnxBackend(model, onnx_path)
+        if name != "torch":
+            logger.warning(f"알 수 없는 추론 백엔드: {name}")
+    except Exception as e:
+        logger.warning(f"{name} 백엔드 초기화 실패, torch 백엔드 사용: {str(e)}")
+    return TorchBackend(model)
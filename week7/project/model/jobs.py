@@ -0,0 +1,70 @@
+import os
+from dotenv import load_dotenv
+from common.file_manager import FileManager
+from model.registry import registry
+from model.transcriber import Transcriber
+
+# 작업 프로세스마다 하나씩 재사용하는 Transcriber (모델은 레지스트리에서 공유)
+_transcriber = None
+
+
+def _get_transcriber():
+    global _transcriber
+    if _transcriber is None:
+        load_dotenv()
+        _transcriber = Transcriber(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            hf_token=os.getenv("HUGGINGFACE_AUTH_TOKEN"),
+        )
+    return _transcriber
+
+
+def _collect_models():
+    """작업이 끝난 뒤 오래 사용하지 않은 모델 해제 (메모리가 부족하면 추가 해제)"""
+    models = _transcriber.config["models"]
+    registry.collect(models["idle_timeout_sec"], models["min_available_memory_mb"])
+
+
+def transcribe_job(params, progress):
+    """음성 변환 작업: 결과를 노트 JSONL로 저장
+
+    이어 쓰기 모드에서는 청크가 끝날 때마다 노트 JSONL에 바로 기록되므로
+    작업 중에도 화면에서 변환된 부분까지 볼 수 있고, 중단되면 이어서 변환한다.
+    """
+    transcriber = _get_transcriber()
+    incremental = transcriber.config["transcriber"]["pipeline"]["incremental_output"]
+    transcripts = transcriber.transcribe(
+        params["file_path"],
+        speaker_num=params["speaker_num"],
+        progress=progress,
+        output_path=params["output_path"] if incremental else None,
+    )
+    if not incremental:
+        FileManager(params["save_dir"]).save_jsonl(params["output_path"], transcripts)
+    _collect_models()
+    return {
+        "output_path": params["output_path"],
+        "segments": len(transcripts),
+        "metrics": transcriber.metrics.to_dict(),
+    }
+
+
+def summarize_job(params, progress):
+    """요약 작업: 노트 JSONL을 읽어 요약 후 텍스트 파일로 저장"""
+    transcriber = _get_transcriber()
+    file_manager = FileManager(params["save_dir"])
+    transcriber.transcripts = file_manager.load_jsonl(params["transcript_path"])
+
+    summary = transcriber.summarize(progress=progress)
+    file_manager.save_file(params["output_path"], summary)
+    _collect_models()
+    return {
+        "output_path": params["output_path"],
+        "metrics": transcriber.metrics.to_dict(),
+    }
+
+
+HANDLERS = {
+    "transcribe": transcribe_job,
+    "summarize": summarize_job,
+}
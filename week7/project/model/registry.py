@@ -0,0 +1,139 @@
+import threading
+import time
+import torch
+from pyannote.audio import Pipeline
+from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+from common.logger_config import setup_logger
+from model.inference_backend import create_backend
+
+try:
+    import psutil  # 선택 의존성: 메모리 압박 감지용
+except ImportError:
+    psutil = None
+
+logger = setup_logger()
+
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+WAV2VEC2_MODEL = "facebook/wav2vec2-base-960h"
+
+
+def default_device():
+    """사용 가능한 가속 장치 선택"""
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.model = None
+        self.last_used = 0.0
+
+
+class ModelRegistry:
+    """프로세스 전역 모델 레지스트리
+
+    모델은 처음 요청될 때 한 번만 로드되고 같은 프로세스의 모든 인스턴스/세션이 공유한다.
+    키마다 별도 잠금을 두어 서로 다른 모델은 동시에 로드할 수 있고,
+    같은 모델을 여러 스레드가 요청해도 로드는 한 번만 일어난다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, loader):
+        """key에 해당하는 모델 반환 (없으면 loader()로 로드)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+
+        with entry.lock:
+            if entry.model is None:
+                logger.info(f"모델 로드 시작: {key}")
+                begin = time.perf_counter()
+                entry.model = loader()
+                logger.info(f"모델 로드 완료: {key} ({time.perf_counter() - begin:.1f}초)")
+            entry.last_used = time.monotonic()
+            return entry.model
+
+    def loaded(self):
+        """현재 메모리에 올라와 있는 모델 키 목록"""
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.model is not None]
+
+    def evict(self, key):
+        """모델 해제 (다음 요청 시 다시 로드)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        with entry.lock:
+            entry.model = None
+        logger.info(f"모델 해제: {key}")
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def collect(self, idle_timeout_sec, min_available_mb=0):
+        """오래 사용하지 않은 모델 해제, 메모리가 부족하면 가장 오래된 모델부터 추가 해제"""
+        now = time.monotonic()
+        with self._lock:
+            by_last_used = sorted(
+                (entry.last_used, key)
+                for key, entry in self._entries.items()
+                if entry.model is not None
+            )
+
+        remaining = []
+        for last_used, key in by_last_used:
+            if now - last_used > idle_timeout_sec:
+                self.evict(key)
+            else:
+                remaining.append(key)
+
+        if not min_available_mb or psutil is None:
+            return
+        for key in remaining:
+            available_mb = psutil.virtual_memory().available / (1024 * 1024)
+            if available_mb >= min_available_mb:
+                break
+            logger.warning(f"가용 메모리 부족 ({available_mb:.0f}MB), 모델 해제: {key}")
+            self.evict(key)
+
+
+# 프로세스 전역 레지스트리
+registry = ModelRegistry()
+
+
+def get_diarization_pipeline(hf_token):
+    """공유 화자 분리 파이프라인"""
+
+    def load():
+        pipeline = Pipeline.from_pretrained(DIARIZATION_MODEL, use_auth_token=hf_token)
+        pipeline.to(torch.device(default_device()))
+        return pipeline
+
+    return registry.get(("pyannote", DIARIZATION_MODEL), load)
+
+
+def get_wav2vec2_processor():
+    """공유 Wav2Vec2 전처리기"""
+    return registry.get(
+        ("processor", WAV2VEC2_MODEL),
+        lambda: Wav2Vec2Processor.from_pretrained(WAV2VEC2_MODEL),
+    )
+
+
+def get_wav2vec2_backend(backend_name, onnx_path):
+    """공유 Wav2Vec2 추론 백엔드 (백엔드마다 자체 모델 사본 보유)"""
+
+    def load():
+        model = Wav2Vec2ForCTC.from_pretrained(WAV2VEC2_MODEL).eval()
+        model.to(torch.device(default_device()))
+        return create_backend(backend_name, model, onnx_path)
+
+    return registry.get(("wav2vec2", WAV2VEC2_MODEL, backend_name), load)
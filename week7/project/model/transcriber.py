@@ -1,14 +1,52 @@
 import os
-import torch
-import yaml
+import time
+import multiprocessing
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+import openai
 from openai import OpenAI
-from pydub import AudioSegment
-from pyannote.audio import Pipeline
-from common.logger_config import setup_logger
+from common.logger_config import get_log_queue, setup_logger
+from common.settings import get_settings
+from common.audio_stream import ChunkManifest, DecodedAudio
 from common.file_manager import FileManager
+from common.metrics import Metrics
+from common.result_cache import ResultCache
+from common.transcript_writer import IncrementalTranscriptWriter
+from common.utils import (
+    count_tokens,
+    match_segments_with_speakers,
+    split_by_token_budget,
+)
+from model import diarization_worker
+from model.registry import DIARIZATION_MODEL, get_diarization_pipeline
 
 logger = setup_logger()
 
+# 구간 요약을 다시 합치는 최대 단계 수 (요약이 줄어들지 않는 경우의 안전장치)
+MAX_REDUCE_LEVELS = 4
+
+
+def _no_progress(done, total, stage=None):
+    pass
+
+
+def is_transient_error(error):
+    """재시도하면 성공할 수 있는 오류인지 (시간 초과, 연결 오류, 429, 5xx)
+
+    인증 실패(401), 잘못된 요청(400) 등은 몇 번을 다시 보내도 같은 결과이므로 재시도하지 않는다.
+    """
+    if isinstance(error, (openai.APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in (408, 429) or status >= 500)
+
+
 class Transcriber:
     """음성을 텍스트로 변환하고 요약하는 클래스"""
 
@@ -22,11 +60,6 @@ class Transcriber:
                     "API 키가 설정되지 않았습니다. .env 파일을 확인해주세요."
                 )
 
-            # 설정 파일 로드
-            with open("config.yml", "r", encoding="utf-8") as f:
-                self.config = yaml.safe_load(f)
-                logger.debug("설정 파일 로드 완료")
-
             # FileManager 초기화
             self.file_manager = FileManager(base_dir)  # FileManager 인스턴스 생성
 
@@ -34,77 +67,95 @@ class Transcriber:
             self.client = OpenAI(api_key=openai_api_key)
             logger.debug("OpenAI 클라이언트 초기화 완료")
 
-            # 화자 분리 파이프라인 초기화
-            logger.info("화자 분리 파이프라인 초기화 시작")
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=hf_token,
+            # 화자 분리 파이프라인은 처음 사용할 때 모델 레지스트리에서 가져온다
+            # (병렬 모드에서는 별도 작업 프로세스가 로드)
+            self.hf_token = hf_token
+            self._diarization_executor = None
+
+            # 변환/화자 분리 결과 캐시
+            self.cache = ResultCache(
+                self.config["cache"]["dir"], self.config["cache"]["max_size_mb"]
             )
-            self.pipeline.to(torch.device("mps" if torch.mps.is_available() else "cpu"))
-            logger.info("화자 분리 파이프라인 초기화 완료")
 
             self.is_split = False
             self.transcripts = []
             self.summary = ""
+            self.metrics = Metrics("transcribe")
 
         except Exception as e:
             logger.error(f"초기화 중 오류 발생: {str(e)}")
             raise
 
+    @property
+    def config(self):
+        """공유 설정 (config.yml 변경 시 자동 반영)"""
+        return get_settings()
+
+    @property
+    def parallel_diarization(self):
+        """화자 분리를 ASR과 동시에 별도 프로세스에서 실행할지 여부"""
+        return self.config["transcriber"]["pipeline"]["parallel_diarization"]
+
     def _convert_audio(self, file_name):
+        """디코딩 오디오를 준비하고 분할 업로드가 필요한지 판단 (디코딩은 필요할 때 1회)"""
         logger.info(f"오디오 파일 변환 시작: {file_name}")
         try:
-            logger.info(os.path)
             file_size_mb = os.path.getsize(file_name) / (1024 * 1024)
             logger.debug(f"파일 크기: {file_size_mb:.2f}MB")
 
-            if file_size_mb > self.config["transcriber"]["audio"]["target_size_mb"]:
-                logger.info("파일 분할 시작")
-                audio = AudioSegment.from_file(file_name)
-
-                # FileManager를 사용하여 경로 생성
-                output_dir = self.file_manager.get_file_path(
-                    "split_chunks", ""
-                )  # "split_chunks" 폴더 경로
-                os.makedirs(output_dir, exist_ok=True)
+            audio = DecodedAudio(
+                file_name, sample_rate=self.config["transcriber"]["audio"]["sample_rate"]
+            )
 
-                split_length = (
-                    self.config["transcriber"]["audio"]["split_length_min"] * 60 * 1000
-                )
-                for i in range(0, len(audio), split_length):
-                    chunk = audio[i : i + split_length]
-                    chunk_name = os.path.join(
-                        output_dir, f"chunk_{i // split_length}.mp3"
-                    )
-                    chunk.export(chunk_name, format="mp3")
+            if file_size_mb > self.config["transcriber"]["audio"]["target_size_mb"]:
+                logger.info("파일 분할 업로드 사용")
                 self.is_split = True
-                logger.info(
-                    f"파일 분할 완료: {len(os.listdir(output_dir))}개 청크 생성"
-                )
             else:
                 logger.debug("파일 분할 불필요")
                 self.is_split = False
+            return audio
 
         except Exception as e:
             logger.error(f"오디오 변환 중 오류 발생: {str(e)}")
             raise
 
-    def _diarize_speaker(self, file_name, speaker_num=2):
-        """화자 분리 수행"""
-        file_dir, file_ext = os.path.splitext(file_name)
-        if file_ext == ".wav":
-            wav_file = file_name
-        else:
-            audio = AudioSegment.from_file(file_name)
-            wav_file = f"{file_dir}.wav"
-            audio.export(wav_file, format="wav")
-
-        diar = self.pipeline(wav_file, num_speakers=speaker_num)
-        speaker = diar.to_lab()
-
-        if file_ext != ".wav":
-            os.remove(wav_file)
-        return speaker
+    def _iter_chunks(self, audio, manifest, skip=()):
+        """매니페스트 경계대로 업로드용 WAV 청크를 하나씩 생성 (디스크 저장 없음)
+
+        skip에 포함된 청크(캐시 적중)는 인코딩하지 않고 건너뛴다.
+        """
+        for index, (start, length) in enumerate(zip(manifest.starts, manifest.lengths)):
+            if index in skip:
+                continue
+            samples = audio.samples[start : start + length]
+            yield index, f"chunk_{index}.wav", audio.to_wav_bytes(samples)
+
+    @property
+    def pipeline(self):
+        """공유 화자 분리 파이프라인 (지연 로드)"""
+        return get_diarization_pipeline(self.hf_token)
+
+    def _diarize_speaker(self, audio, speaker_num=2):
+        """화자 분리 수행 (디코딩된 파형을 그대로 입력)"""
+        diar = self.pipeline(audio.to_pyannote_input(), num_speakers=speaker_num)
+        return diar.to_lab()
+
+    def _asr_fingerprint(self):
+        """ASR 결과에 영향을 주는 설정 지문"""
+        return ResultCache.fingerprint(
+            model=self.config["transcriber"]["openai"]["transcript_model"],
+            split_length_min=self.config["transcriber"]["audio"]["split_length_min"],
+            sample_rate=self.config["transcriber"]["audio"]["sample_rate"],
+            split=self.is_split,
+        )
+
+    def _diarization_fingerprint(self, speaker_num):
+        """화자 분리 결과에 영향을 주는 설정 지문"""
+        return ResultCache.fingerprint(
+            model=DIARIZATION_MODEL,
+            speaker_num=speaker_num,
+            sample_rate=self.config["transcriber"]["audio"]["sample_rate"],
+        )
 
     def _compress_diarization(self, segments_diar):
         """화자 분리 결과 압축"""
@@ -128,130 +179,510 @@ class Transcriber:
 
         return compressed_diar
 
-    def transcribe(self, file_name, speaker_num=2):
+    @staticmethod
+    def _segment_value(segment, key):
+        """응답 세그먼트 값 조회 (dict / 객체 응답 모두 지원)"""
+        if isinstance(segment, dict):
+            return segment[key]
+        return getattr(segment, key)
+
+    def _transcribe_chunk(self, chunk, stop=None):
+        """청크 하나를 변환 (일시적인 오류만 지수 백오프로 재시도)
+
+        stop 이벤트가 설정되면 (다른 청크가 실패하면) 더 이상 재시도하지 않는다.
+        """
+        _, chunk_name, chunk_data = chunk
+        concurrency = self.config["transcriber"]["concurrency"]
+        max_retries = concurrency["max_retries"]
+        if stop is None:
+            stop = threading.Event()
+
+        for attempt in range(max_retries + 1):
+            self.metrics.incr("asr_requests")
+            self.metrics.incr("asr_upload_bytes", len(chunk_data))
+            try:
+                response = self.client.audio.transcriptions.create(
+                    file=(chunk_name, chunk_data),
+                    model=self.config["transcriber"]["openai"]["transcript_model"],
+                    response_format="verbose_json",
+                    timestamp_granularities=["segment"],
+                )
+                return [
+                    {
+                        "start": self._segment_value(segment, "start"),
+                        "end": self._segment_value(segment, "end"),
+                        "text": self._segment_value(segment, "text"),
+                    }
+                    for segment in response.segments
+                ]
+            except Exception as e:
+                if attempt == max_retries or not is_transient_error(e) or stop.is_set():
+                    logger.error(f"청크 변환 실패: {chunk_name} ({str(e)})")
+                    raise
+                self.metrics.incr("asr_retries")
+                delay = concurrency["retry_backoff_sec"] * (2**attempt)
+                logger.warning(
+                    f"청크 변환 재시도 {attempt + 1}/{max_retries}: {chunk_name} "
+                    f"({str(e)}), {delay:.1f}초 후 재시도"
+                )
+                # 대기 중에 다른 청크가 실패하면 바로 중단
+                if stop.wait(delay):
+                    raise
+
+    def _transcribe_chunks(self, chunks, on_result=None):
+        """청크들을 동시에 변환하고 {청크 인덱스: 세그먼트} 반환
+
+        동시에 메모리에 올라가는 청크 수를 작업자 수로 제한하기 위해
+        진행 중인 요청이 가득 차면 하나가 끝날 때까지 다음 청크를 만들지 않는다.
+        on_result(index, segments)는 청크가 끝날 때마다 작업 스레드에서 호출된다.
+        한 청크라도 (재시도 후) 실패하면 남은 청크는 제출하지 않고 대기 중인 작업을 취소한 뒤
+        진행 중인 요청만 끝나기를 기다려 그 오류를 다시 발생시킨다.
+        """
+        max_workers = self.config["transcriber"]["concurrency"]["max_workers"]
+        logger.info(f"청크 동시 변환 시작 (최대 {max_workers}개)")
+        stop = threading.Event()
+
+        def run(chunk):
+            segments = self._transcribe_chunk(chunk, stop)
+            if on_result:
+                on_result(chunk[0], segments)
+            return chunk[0], segments
+
+        def raise_failed(done):
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+
+        futures = []
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for chunk in chunks:
+                    if len(pending) >= max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        raise_failed(done)
+                    future = executor.submit(run, chunk)
+                    futures.append(future)
+                    pending.add(future)
+                done, _ = wait(pending, return_when=FIRST_EXCEPTION)
+                raise_failed(done)
+            except BaseException:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                raise
+        return dict(future.result() for future in futures)
+
+    def _transcribe_split(self, audio, audio_hash, progress, writer=None):
+        """분할 업로드 변환 (캐시에 있는 청크는 재전송하지 않음)
+
+        writer가 주어지면 이미 기록된 청크는 건너뛰고, 나머지 청크는 끝나는 대로
+        전체 시간 기준으로 보정해 writer에 넘긴다.
+        (청크 매니페스트, 보정된 세그먼트)를 반환한다.
+        """
+        split_length_sec = self.config["transcriber"]["audio"]["split_length_min"] * 60
+        fingerprint = self._asr_fingerprint()
+
+        def cache_key(index):
+            return ResultCache.make_key(audio_hash, fingerprint, index)
+
+        # 매니페스트도 캐시해 두어 모든 청크가 적중하면 디코딩 자체를 건너뛴다
+        manifest = self.cache.get("asr", cache_key("manifest"))
+        if manifest is None:
+            manifest = ChunkManifest.from_audio(audio, split_length_sec)
+            self.cache.set("asr", cache_key("manifest"), manifest.to_dict())
+        else:
+            manifest = ChunkManifest.from_dict(manifest)
+
+        committed = writer.committed if writer is not None else -1
+        chunk_segments = {}
+        for index in range(committed + 1, len(manifest)):
+            cached = self.cache.get("asr", cache_key(index))
+            if cached is not None:
+                chunk_segments[index] = cached
+                if writer is not None:
+                    writer.add_chunk(index, manifest.rebase({index: cached}))
+        logger.info(
+            f"청크 {len(manifest)}개 중 기록 완료 {committed + 1}개, "
+            f"캐시 적중 {len(chunk_segments)}개"
+        )
+        self.metrics.set("audio_sec", manifest.duration)
+        self.metrics.set("chunks", len(manifest))
+        self.metrics.incr("chunks_cached", len(chunk_segments))
+
+        completed = [committed + 1 + len(chunk_segments)]
+        lock = threading.Lock()
+        progress(completed[0], len(manifest), "asr")
+
+        def save(index, segments):
+            self.cache.set("asr", cache_key(index), segments)
+            if writer is not None:
+                writer.add_chunk(index, manifest.rebase({index: segments}))
+            with lock:
+                completed[0] += 1
+                progress(completed[0], len(manifest), "asr")
+
+        skip = set(range(committed + 1)) | set(chunk_segments)
+        chunk_segments.update(
+            self._transcribe_chunks(
+                self._iter_chunks(audio, manifest, skip=skip),
+                on_result=save,
+            )
+        )
+
+        # 청크 시작 샘플 기준으로 시간 보정
+        return manifest, manifest.rebase(chunk_segments)
+
+    def _transcribe_single(self, file_name, audio_hash, progress):
+        """원본 파일 한 번에 변환"""
+        cache_key = ResultCache.make_key(audio_hash, self._asr_fingerprint(), "full")
+        segments = self.cache.get("asr", cache_key)
+        if segments is not None:
+            logger.info("변환 결과 캐시 적중")
+            progress(1, 1, "asr")
+            return segments
+
+        progress(0, 1, "asr")
+
+        self.metrics.incr("asr_requests")
+        self.metrics.incr("asr_upload_bytes", os.path.getsize(file_name))
+        with open(file_name, "rb") as audio_file:
+            response = self.client.audio.transcriptions.create(
+                file=audio_file,
+                model=self.config["transcriber"]["openai"]["transcript_model"],
+                response_format="verbose_json",
+                timestamp_granularities=["segment", "word"],
+            )
+
+        segments = [
+            {
+                "start": self._segment_value(seg, "start"),
+                "end": self._segment_value(seg, "end"),
+                "text": self._segment_value(seg, "text"),
+            }
+            for seg in response.segments
+        ]
+        self.cache.set("asr", cache_key, segments)
+        progress(1, 1, "asr")
+        return segments
+
+    def _get_diarization_executor(self):
+        """화자 분리 전용 작업 프로세스 (처음 사용할 때 한 번만 생성)"""
+        if self._diarization_executor is None:
+            logger.info("화자 분리 작업 프로세스 시작")
+            self._diarization_executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=diarization_worker.init_worker,
+                initargs=(self.hf_token, get_log_queue()),
+            )
+        return self._diarization_executor
+
+    def _submit_diarization(self, audio, speaker_num):
+        """화자 분리를 별도 프로세스에 제출 (ASR 요청과 동시에 실행)"""
+        return self._get_diarization_executor().submit(
+            diarization_worker.diarize_pcm,
+            audio.pcm_path,
+            audio.sample_rate,
+            speaker_num,
+        )
+
+    def _log_metrics(self):
+        """단계별 소요 시간 로그 및 지표 파일 저장 (가장 오래 걸린 단계가 임계 경로)"""
+        self.metrics.stop_sampling()
+        data = self.metrics.to_dict()
+        summary = ", ".join(
+            f"{stage}={seconds:.2f}s" for stage, seconds in data["spans"].items()
+        )
+        rtf = f", RTF={data['rtf']:.3f}" if data["rtf"] is not None else ""
+        logger.info(f"단계별 소요 시간: {summary}{rtf}")
+        try:
+            self.metrics.export(self.config["metrics"]["dir"])
+        except OSError as e:
+            logger.warning(f"지표 저장 실패: {str(e)}")
+
+    def _open_writer(self, output_path, audio_hash, speaker_num):
+        """출력 파일 이어 쓰기 준비 (입력/설정이 같을 때만 체크포인트에서 재개)"""
+        key = ResultCache.make_key(
+            audio_hash,
+            self._asr_fingerprint(),
+            self._diarization_fingerprint(speaker_num),
+        )
+        writer = IncrementalTranscriptWriter(
+            self.file_manager, output_path, key, self._match_segments_with_speakers
+        )
+        if writer.committed >= 0:
+            logger.info(f"체크포인트에서 재개: 청크 {writer.committed + 1}개 기록됨")
+        return writer
+
+    def transcribe(self, file_name, speaker_num=2, progress=None, output_path=None):
+        """음성 변환 + 화자 분리 + 매칭
+
+        progress(done, total, stage)가 주어지면 청크/단계가 끝날 때마다 호출한다.
+        output_path가 주어지면 매칭 결과를 청크가 끝나는 대로 JSONL에 이어 쓰고,
+        같은 입력으로 다시 호출하면 마지막으로 기록된 청크 다음부터 재개한다.
+        """
         logger.info(f"음성 변환 시작: {file_name}")
+        self.metrics = Metrics("transcribe")
+        self.metrics.start_sampling(self.config["metrics"]["memory_sample_sec"])
+        if progress is None:
+            progress = _no_progress
         try:
-            self._convert_audio(file_name)
-
-            if self.is_split:
-                logger.info("분할된 파일 처리 시작")
-                split_dir = self.file_manager.get_file_path("split_chunks", "")
-                segments = []
-                for i, chunk in enumerate(sorted(os.listdir(split_dir))):
-                    if chunk.endswith(".mp3"):
-                        chunk_path = os.path.join(split_dir, chunk)
-                        with open(chunk_path, "rb") as audio_file:
-                            response = self.client.audio.transcriptions.create(
-                                file=audio_file,
-                                model=self.config["transcriber"]["openai"][
-                                    "transcript_model"
-                                ],
-                                response_format="verbose_json",
-                                timestamp_granularities=["segment"],
-                            )
-                            for segment in response.segments:
-                                segments.append(
-                                    {
-                                        "start": segment["start"]
-                                        + (
-                                            i
-                                            * self.config["transcriber"]["audio"][
-                                                "split_length_min"
-                                            ]
-                                        ),
-                                        "end": segment["end"]
-                                        + (
-                                            i
-                                            * self.config["transcriber"]["audio"][
-                                                "split_length_min"
-                                            ]
-                                        ),
-                                        "text": segment["text"],
-                                    }
-                                )
-            else:
-                logger.info("단일 파일 처리")
-                with open(file_name, "rb") as audio_file:
-                    response = self.client.audio.transcriptions.create(
-                        file=audio_file,
-                        model=self.config["transcriber"]["openai"]["transcript_model"],
-                        response_format="verbose_json",
-                        timestamp_granularities=["segment", "word"],
-                    )
-
-                    segments = [
-                        {"start": seg.start, "end": seg.end, "text": seg.text}
-                        for seg in response.segments
-                    ]
-
-            logger.info("화자 분리 시작")
-            diarization = self._diarize_speaker(file_name, speaker_num)
-            compressed_diar = self._compress_diarization(diarization)
-
-            logger.info("텍스트 매칭 시작")
-            self.transcripts = self._match_segments_with_speakers(
-                segments, compressed_diar
+            with self.metrics.span("hash"):
+                audio_hash = ResultCache.hash_file(file_name)
+            logger.debug(f"오디오 해시: {audio_hash}")
+            self.metrics.incr("input_bytes", os.path.getsize(file_name))
+            diar_key = ResultCache.make_key(
+                audio_hash, self._diarization_fingerprint(speaker_num)
             )
 
+            with self._convert_audio(file_name) as audio:
+                writer = None
+                if output_path is not None:
+                    writer = self._open_writer(output_path, audio_hash, speaker_num)
+                    if writer.complete:
+                        logger.info("이미 기록이 끝난 변환 결과 사용")
+                        self.transcripts = self.file_manager.load_jsonl(output_path)
+                        return self.transcripts
+
+                diarization = self.cache.get("diarization", diar_key)
+                diar_future = None
+                if diarization is not None:
+                    logger.info("화자 분리 캐시 적중")
+                elif self.parallel_diarization:
+                    with self.metrics.span("decode"):
+                        audio.decode()
+                    logger.info("화자 분리 시작 (병렬)")
+                    diar_future = self._submit_diarization(audio, speaker_num)
+                    if writer is not None:
+                        # 화자 분리가 끝나는 즉시 그동안 쌓인 청크부터 기록
+                        diar_future.add_done_callback(
+                            lambda future: self._on_diarized(future, writer)
+                        )
+                elif writer is not None:
+                    # 순차 모드에서 이어 쓰기를 하려면 화자 정보가 먼저 필요하다
+                    logger.info("화자 분리 시작")
+                    with self.metrics.span("diarization"):
+                        diarization = self._diarize_speaker(audio, speaker_num)
+                    self.cache.set("diarization", diar_key, diarization)
+
+                if writer is not None and diarization is not None:
+                    writer.set_diarization(self._compress_diarization(diarization))
+
+                num_chunks = 1
+                with self.metrics.span("asr"):
+                    if self.is_split:
+                        logger.info("분할된 파일 처리 시작")
+                        manifest, segments = self._transcribe_split(
+                            audio, audio_hash, progress, writer
+                        )
+                        num_chunks = len(manifest)
+                    else:
+                        logger.info("단일 파일 처리")
+                        segments = self._transcribe_single(
+                            file_name, audio_hash, progress
+                        )
+                        if writer is not None:
+                            writer.add_chunk(0, segments)
+
+                progress(0, 1, "diarization")
+                if diar_future is not None:
+                    # ASR이 끝난 뒤 화자 분리를 기다린 시간 (0에 가까우면 ASR이 임계 경로)
+                    with self.metrics.span("diarization_wait"):
+                        diarization, diar_seconds = diar_future.result()
+                    self.metrics.record("diarization", diar_seconds)
+                    self.cache.set("diarization", diar_key, diarization)
+                elif diarization is None:
+                    logger.info("화자 분리 시작")
+                    with self.metrics.span("diarization"):
+                        diarization = self._diarize_speaker(audio, speaker_num)
+                    self.cache.set("diarization", diar_key, diarization)
+
+                if audio.decoded and "audio_sec" not in self.metrics.values:
+                    self.metrics.set("audio_sec", audio.duration)
+
+            progress(1, 1, "diarization")
+            with self.metrics.span("matching"):
+                compressed_diar = self._compress_diarization(diarization)
+
+                logger.info("텍스트 매칭 시작")
+                if writer is not None:
+                    # 아직 기록되지 않은 청크를 마저 기록하고 완료 표시
+                    writer.set_diarization(compressed_diar)
+                    writer.finish(num_chunks)
+                    self.transcripts = self.file_manager.load_jsonl(output_path)
+                else:
+                    self.transcripts = self._match_segments_with_speakers(
+                        segments, compressed_diar
+                    )
+
+            self.metrics.set("segments", len(self.transcripts))
             logger.info(f"변환 완료: {len(self.transcripts)}개 세그먼트 생성")
             return self.transcripts
 
         except Exception as e:
             logger.error(f"변환 중 오류 발생: {str(e)}")
+            self.metrics.set("error", f"{type(e).__name__}: {e}")
             raise
+        finally:
+            self._log_metrics()
+
+    def _on_diarized(self, future, writer):
+        """병렬 화자 분리 완료 콜백 (실패는 transcribe에서 result()로 처리)"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            writer.set_diarization(self._compress_diarization(future.result()[0]))
+        except Exception as e:
+            logger.error(f"청크 기록 중 오류 발생: {str(e)}")
+
+    def close(self):
+        """화자 분리 작업 프로세스 종료"""
+        if self._diarization_executor is not None:
+            self._diarization_executor.shutdown()
+            self._diarization_executor = None
 
     def _match_segments_with_speakers(self, segments, diarization):
         """변환된 텍스트와 화자 정보 매칭"""
-        matched_segments = [
-            {
-                "start": diar["start"],
-                "end": diar["end"],
-                "label": diar["label"],
-                "text": "",
-            }
-            for diar in diarization
-        ]
+        return match_segments_with_speakers(segments, diarization)
+
+    def _chat(self, prompt, text):
+        """채팅 완성 1회 (일시적인 오류만 지수 백오프로 재시도)"""
+        concurrency = self.config["transcriber"]["concurrency"]
+        max_retries = concurrency["max_retries"]
 
-        for segment in segments:
-            max_overlap = 0
-            max_overlap_idx = 0
-            for idx, diar in enumerate(diarization):
-                overlap = min(segment["end"], diar["end"]) - max(
-                    segment["start"], diar["start"]
+        for attempt in range(max_retries + 1):
+            self.metrics.incr("llm_requests")
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.config["transcriber"]["openai"]["models"]["default"],
+                    messages=[{"role": "user", "content": f"{prompt}\n\n{text}"}],
                 )
-                if overlap > max_overlap:
-                    max_overlap = overlap
-                    max_overlap_idx = idx
-            if max_overlap > 0:
-                matched_segments[max_overlap_idx]["text"] += (
-                    segment["text"].strip() + " "
+                return response.choices[0].message.content
+            except Exception as e:
+                if attempt == max_retries or not is_transient_error(e):
+                    logger.error(f"요약 요청 실패: {str(e)}")
+                    raise
+                self.metrics.incr("llm_retries")
+                delay = concurrency["retry_backoff_sec"] * (2**attempt)
+                logger.warning(
+                    f"요약 요청 재시도 {attempt + 1}/{max_retries}: ({str(e)}), "
+                    f"{delay:.1f}초 후 재시도"
                 )
-
-        return [item for item in matched_segments if item["text"]]
-
-    def summarize(self):
+                time.sleep(delay)
+
+    def _summarize_text(self, prompt, text):
+        """텍스트 요약 (같은 내용 + 프롬프트 + 모델이면 캐시된 결과 사용)"""
+        key = ResultCache.make_key(
+            ResultCache.hash_text(text),
+            ResultCache.fingerprint(
+                model=self.config["transcriber"]["openai"]["models"]["default"],
+                prompt=prompt,
+            ),
+        )
+        summary = self.cache.get("summary", key)
+        if summary is not None:
+            self.metrics.incr("summary_cache_hits")
+            return summary
+        summary = self._chat(prompt, text)
+        self.cache.set("summary", key, summary)
+        return summary
+
+    def _summarize_many(self, prompt, texts, progress=_no_progress):
+        """여러 청크를 동시에 요약 (입력 순서대로 반환)"""
+        max_workers = self.config["transcriber"]["summary"]["max_workers"]
+        completed = [0]
+        lock = threading.Lock()
+        progress(0, len(texts), "summary")
+
+        def run(text):
+            summary = self._summarize_text(prompt, text)
+            with lock:
+                completed[0] += 1
+                progress(completed[0], len(texts), "summary")
+            return summary
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, texts))
+
+    def _summary_chunks(self, transcripts, budget):
+        """화자 발화 단위로 토큰 예산 이하의 청크 생성 (예산보다 긴 발화는 나눠서 배치)"""
+        lines = []
+        for item in transcripts:
+            line = f"{item['label']}: {item['text']}"
+            tokens = self._count_tokens(line)
+            if tokens <= budget:
+                lines.append(line)
+                continue
+            # 긴 발화는 토큰 비율에 맞춰 글자 수로 나누고 각 조각에 화자를 붙인다
+            size = max(1, len(item["text"]) * budget // tokens)
+            lines.extend(
+                f"{item['label']}: {item['text'][i : i + size]}"
+                for i in range(0, len(item["text"]), size)
+            )
+        return split_by_token_budget(lines, budget, count=self._count_tokens)
+
+    def _count_tokens(self, text):
+        """요약 모델 기준 토큰 수"""
+        model = self.config["transcriber"]["openai"]["models"]["default"]
+        return count_tokens(text, model)
+
+    def summarize(self, progress=None):
+        """대화 요약 (map-reduce)
+
+        전사 결과를 화자 발화 단위로 토큰 예산 이하의 청크로 나눠 동시에 요약(map)한 뒤,
+        구간 요약을 다시 합쳐 최종 요약(reduce)을 만든다. 구간 요약을 합쳐도 예산을 넘으면
+        예산 안에 들어올 때까지 단계적으로 합친다.
+        청크별 결과는 내용 해시로 캐시되므로, 세션이 추가된 노트를 다시 요약하면
+        새로 생긴(또는 마지막) 청크만 요약 요청을 보낸다.
+        """
         logger.info("요약 시작")
+        self.metrics = Metrics("summarize")
+        self.metrics.start_sampling(self.config["metrics"]["memory_sample_sec"])
+        if progress is None:
+            progress = _no_progress
         try:
             if not self.transcripts:
                 logger.warning("변환된 텍스트가 없습니다")
                 return "변환된 텍스트가 없습니다."
 
-            full_text = "\n".join(
-                f"{t['label']}: {t['text']}" for t in self.transcripts
-            )
-            logger.debug(f"요약할 텍스트 길이: {len(full_text)} 문자")
-
-            prompt = self.config["transcriber"]["summary_prompt"]
+            summary_config = self.config["transcriber"]["summary"]
+            budget = summary_config["chunk_tokens"]
+            final_prompt = self.config["transcriber"]["summary_prompt"]
+
+            with self.metrics.span("chunking"):
+                chunks = self._summary_chunks(self.transcripts, budget)
+            self.metrics.set("chunks", len(chunks))
+            logger.debug(f"요약 청크 수: {len(chunks)}")
+
+            with self.metrics.span("map"):
+                if len(chunks) == 1:
+                    partials = chunks
+                else:
+                    partials = self._summarize_many(
+                        summary_config["map_prompt"], chunks, progress
+                    )
 
-            response = self.client.chat.completions.create(
-                model=self.model,  # 선택된 모델 사용
-                messages=[{"role": "user", "content": f"{prompt}\n\n{full_text}"}],
-            )
+            with self.metrics.span("reduce"):
+                for _ in range(MAX_REDUCE_LEVELS):
+                    merged = "\n\n".join(partials)
+                    if len(partials) == 1 or self._count_tokens(merged) <= budget:
+                        break
+                    groups = split_by_token_budget(
+                        partials, budget, count=self._count_tokens
+                    )
+                    partials = self._summarize_many(
+                        summary_config["reduce_prompt"], groups
+                    )
+                self.summary = self._summarize_text(final_prompt, "\n\n".join(partials))
 
-            self.summary = response.choices[0].message.content
+            progress(1, 1, "summary")
             logger.info("요약 완료")
             return self.summary
 
         except Exception as e:
             logger.error(f"요약 중 오류 발생: {str(e)}")
+            self.metrics.set("error", f"{type(e).__name__}: {e}")
             raise
+        finally:
+            self._log_metrics()
@@ -1,15 +1,54 @@
 import os
+import numpy as np
 import torch
-import yaml
-import torchaudio
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
-from pydub import AudioSegment
-from pyannote.audio import Pipeline
 from common.logger_config import setup_logger
+from common.settings import get_settings
+from common.audio_stream import DecodedAudio
 from common.file_manager import FileManager
+from common.metrics import Metrics
+from common.utils import match_segments_with_speakers
+from model.registry import (
+    get_diarization_pipeline,
+    get_wav2vec2_backend,
+    get_wav2vec2_processor,
+)
 
 logger = setup_logger()
 
+# Wav2Vec2 입력 샘플링 레이트
+SAMPLE_RATE = 16000
+
+
+def ctc_word_alignments(ids, blank_id, delimiter_id):
+    """CTC argmax 결과에서 단어별 토큰과 프레임 구간 추출
+
+    반복 토큰 병합과 blank 제거를 텐서 연산으로 처리하고, 단어 구분자 기준으로 묶는다.
+
+    Returns:
+        (단어별 토큰 id 리스트, 시작 프레임 텐서, 종료 프레임 텐서)
+        종료 프레임은 마지막 토큰 프레임 + 1 이다.
+    """
+    frames = torch.arange(len(ids))
+    # 직전 프레임과 같은 토큰은 병합 (CTC 규칙: blank를 사이에 둔 반복은 유지)
+    keep = torch.ones(len(ids), dtype=torch.bool)
+    keep[1:] = ids[1:] != ids[:-1]
+    keep &= ids != blank_id
+    tokens, token_frames = ids[keep], frames[keep]
+
+    # 구분자마다 단어 번호 증가, 구분자 자체는 제외
+    is_delimiter = tokens == delimiter_id
+    word_index = torch.cumsum(is_delimiter.long(), dim=0)[~is_delimiter]
+    tokens, token_frames = tokens[~is_delimiter], token_frames[~is_delimiter]
+    if len(tokens) == 0:
+        return [], torch.zeros(0), torch.zeros(0)
+
+    _, counts = torch.unique_consecutive(word_index, return_counts=True)
+    word_tokens = [t.tolist() for t in torch.split(tokens, counts.tolist())]
+    ends = torch.cumsum(counts, dim=0)
+    start_frames = token_frames[ends - counts]
+    end_frames = token_frames[ends - 1] + 1
+    return word_tokens, start_frames.double(), end_frames.double()
+
 
 class Word2backTranscriber:
     """음성을 텍스트로 변환하고 요약하는 클래스"""
@@ -21,165 +60,207 @@ class Word2backTranscriber:
                 logger.error("Hugging Face 토큰이 설정되지 않았습니다")
                 raise ValueError("Hugging Face 토큰이 필요합니다.")
 
-            with open("config.yml", "r", encoding="utf-8") as f:
-                self.config = yaml.safe_load(f)
-                logger.debug("설정 파일 로드 완료")
-
             self.file_manager = FileManager(base_dir)
 
-            # Wav2Vec2 모델 로드
-            self.processor = Wav2Vec2Processor.from_pretrained(
-                "facebook/wav2vec2-base-960h"
-            )
-            self.model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h")
-
-            self.model.to(torch.device("mps" if torch.mps.is_available() else "cpu"))
-            logger.debug("Wav2Vec2 모델 로드 완료")
+            # 모델은 처음 사용할 때 모델 레지스트리에서 가져온다 (프로세스 내 공유)
+            self.hf_token = hf_token
 
-            # 화자 분리 파이프라인 로드
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1", use_auth_token=hf_token
-            )
-            self.pipeline.to(
-                torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            )
-            logger.info("화자 분리 파이프라인 초기화 완료")
-
-            self.is_split = False
             self.transcripts = []
+            self.metrics = Metrics("word2back")
 
         except Exception as e:
             logger.error(f"초기화 중 오류 발생: {str(e)}")
             raise
 
-    def _convert_audio(self, file_name):
-        """오디오 파일을 변환하고 필요하면 분할하는 함수"""
-        logger.info(f"오디오 파일 변환 시작: {file_name}")
-        try:
-            file_size_mb = os.path.getsize(file_name) / (1024 * 1024)
-            logger.debug(f"파일 크기: {file_size_mb:.2f}MB")
+    @property
+    def config(self):
+        """공유 설정 (config.yml 변경 시 자동 반영)"""
+        return get_settings()
 
-            if file_size_mb > self.config["transcriber"]["audio"]["target_size_mb"]:
-                logger.info("파일 분할 시작")
-                audio = AudioSegment.from_file(file_name)
-                output_dir = self.file_manager.get_file_path("split_chunks", "")
-                os.makedirs(output_dir, exist_ok=True)
+    @property
+    def processor(self):
+        """공유 Wav2Vec2 전처리기 (지연 로드)"""
+        return get_wav2vec2_processor()
 
-                split_length = (
-                    self.config["transcriber"]["audio"]["split_length_min"] * 60 * 1000
-                )
-                for i in range(0, len(audio), split_length):
-                    chunk = audio[i : i + split_length]
-                    chunk_name = os.path.join(
-                        output_dir, f"chunk_{i // split_length}.mp3"
-                    )
-                    chunk.export(chunk_name, format="mp3")
-                self.is_split = True
-                logger.info(
-                    f"파일 분할 완료: {len(os.listdir(output_dir))}개 청크 생성"
-                )
-            else:
-                self.is_split = False
+    @property
+    def backend(self):
+        """공유 Wav2Vec2 추론 백엔드 (torch / quantized / onnx, 지연 로드)"""
+        inference = self.config["word2back"]["inference"]
+        return get_wav2vec2_backend(inference["backend"], inference["onnx_path"])
 
-        except Exception as e:
-            logger.error(f"오디오 변환 중 오류 발생: {str(e)}")
-            raise
+    @property
+    def pipeline(self):
+        """공유 화자 분리 파이프라인 (지연 로드)"""
+        return get_diarization_pipeline(self.hf_token)
 
     def transcribe(self, file_name):
         """음성을 텍스트로 변환하는 메소드"""
         logger.info(f"음성 변환 시작: {file_name}")
+        self.metrics = Metrics("word2back")
+        self.metrics.start_sampling(self.config["metrics"]["memory_sample_sec"])
         try:
-            self._convert_audio(file_name)
-            if self.is_split:
-                split_dir = self.file_manager.get_file_path("split_chunks", "")
-                segments = []
-                for chunk in sorted(os.listdir(split_dir)):
-                    if chunk.endswith(".mp3"):
-                        chunk_path = os.path.join(split_dir, chunk)
-                        segments.extend(self._transcribe_audio(chunk_path))
-            else:
-                segments = self._transcribe_audio(file_name)
-
-            logger.info("화자 분리 시작")
-            diarization = self._diarize_speaker(file_name)
-            self.transcripts = self._match_segments_with_speakers(segments, diarization)
+            self.metrics.incr("input_bytes", os.path.getsize(file_name))
+            # 한 번 디코딩한 16kHz PCM을 윈도우 추론과 화자 분리가 함께 사용
+            with DecodedAudio(file_name, sample_rate=SAMPLE_RATE) as audio:
+                with self.metrics.span("decode"):
+                    audio.decode()
+                self.metrics.set("audio_sec", audio.duration)
+
+                with self.metrics.span("asr"):
+                    segments = self._transcribe_audio(audio)
 
+                logger.info("화자 분리 시작")
+                with self.metrics.span("diarization"):
+                    diarization = self._diarize_speaker(audio)
+
+            with self.metrics.span("matching"):
+                self.transcripts = self._match_segments_with_speakers(
+                    segments, diarization
+                )
+
+            self.metrics.set("segments", len(self.transcripts))
             logger.info(f"변환 완료: {len(self.transcripts)}개 세그먼트 생성")
             return self.transcripts
         except Exception as e:
             logger.error(f"변환 중 오류 발생: {str(e)}")
+            self.metrics.set("error", f"{type(e).__name__}: {e}")
             raise
+        finally:
+            self.metrics.stop_sampling()
+            try:
+                self.metrics.export(self.config["metrics"]["dir"])
+            except OSError as e:
+                logger.warning(f"지표 저장 실패: {str(e)}")
 
-    def _transcribe_audio(self, file_name):
-        """Wav2Vec2를 이용한 오디오 변환"""
-        logger.info(f"Wav2Vec2를 이용한 변환 시작: {file_name}")
+    def _iter_windows(self, num_samples):
+        """겹침(stride)을 둔 추론 윈도우 생성
 
-        # 오디오 파일 로드
-        speech_array, sample_rate = torchaudio.load(file_name)
-        logger.debug(
-            f"원본 샘플링 레이트: {sample_rate}, 데이터 크기: {speech_array.shape}"
-        )
+        Returns:
+            (윈도우 시작, 윈도우 끝, 유지 구간 시작, 유지 구간 끝) 샘플 위치.
+            양 옆 stride 구간은 문맥으로만 쓰고 결과에서는 버린다.
+        """
+        window_config = self.config["word2back"]["inference"]
+        window = int(window_config["window_sec"] * SAMPLE_RATE)
+        stride = int(window_config["stride_sec"] * SAMPLE_RATE)
+        step = window - 2 * stride
+        if step <= 0:
+            raise ValueError("window_sec는 stride_sec의 두 배보다 커야 합니다.")
 
-        # 샘플링 레이트 변환 (16kHz가 아닐 경우 변환)
-        target_sample_rate = 16000
-        if sample_rate != target_sample_rate:
-            resampler = torchaudio.transforms.Resample(
-                orig_freq=sample_rate, new_freq=target_sample_rate
+        for core_start in range(0, num_samples, step):
+            core_end = min(core_start + step, num_samples)
+            yield (
+                max(0, core_start - stride),
+                min(num_samples, core_end + stride),
+                core_start,
+                core_end,
             )
-            speech_array = resampler(speech_array).squeeze()
-            logger.debug(f"샘플링 레이트 변환 후 데이터 크기: {speech_array.shape}")
-        else:
-            speech_array = speech_array.squeeze()
 
-        # 데이터 전처리
-        speech_array = speech_array.numpy()
+    def _transcribe_audio(self, audio):
+        """Wav2Vec2 슬라이딩 윈도우 배치 추론 (단어 단위 타임스탬프 반환)
+
+        전체 오디오를 한 번에 넣지 않고 고정 길이 윈도우를 batch_size개씩 묶어 추론하므로
+        메모리 사용량은 녹음 길이가 아니라 배치 크기에 비례한다.
+        윈도우별 유지 구간의 CTC 프레임은 이어 붙인 뒤 디코딩하므로
+        유지 구간 경계에 걸친 단어도 하나로 이어진다.
+        """
+        logger.info(f"Wav2Vec2를 이용한 변환 시작: {audio.file_name}")
+        batch_size = self.config["word2back"]["inference"]["batch_size"]
+        delimiter_id = self.processor.tokenizer.word_delimiter_token_id
+
+        words = []
+        # 아직 디코딩하지 않은 프레임 (토큰 id, 프레임 시작/종료 시간)
+        pending = (
+            torch.zeros(0, dtype=torch.long),
+            torch.zeros(0, dtype=torch.float64),
+            torch.zeros(0, dtype=torch.float64),
+        )
+
+        def append_and_decode(frames):
+            merged = tuple(torch.cat(parts) for parts in zip(pending, frames))
+            # 마지막 단어 구분자까지만 디코딩하고 나머지는 다음 윈도우와 이어 붙인다
+            delimiters = torch.nonzero(merged[0] == delimiter_id)
+            if len(delimiters) == 0:
+                return merged
+            cut = int(delimiters[-1]) + 1
+            words.extend(self._decode_frames(*(part[:cut] for part in merged)))
+            return tuple(part[cut:] for part in merged)
+
+        batch = []
+        for window in self._iter_windows(audio.num_samples):
+            batch.append(window)
+            if len(batch) == batch_size:
+                pending = append_and_decode(self._infer_batch(audio, batch))
+                batch = []
+        if batch:
+            pending = append_and_decode(self._infer_batch(audio, batch))
+        words.extend(self._decode_frames(*pending))
+
+        self.metrics.incr("words", len(words))
+        logger.debug(f"변환된 단어 수: {len(words)}")
+        return words
+
+    def _infer_batch(self, audio, batch):
+        """윈도우 묶음 한 번의 forward pass로 유지 구간 프레임의 argmax 토큰과 시간 계산
+
+        Returns:
+            (토큰 id, 프레임 시작 시간(초), 프레임 종료 시간(초)) - 윈도우 순서대로 이어 붙인 값
+        """
         inputs = self.processor(
-            speech_array,
-            sampling_rate=target_sample_rate,
+            [np.asarray(audio.samples[start:end]) for start, end, _, _ in batch],
+            sampling_rate=SAMPLE_RATE,
             return_tensors="pt",
             padding=True,
         )
-        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
-
-        # 모델 추론
-        with torch.no_grad():
-            logits = self.model(**inputs).logits
-
-        # 결과 해석
+        logits = self.backend.logits(inputs["input_values"])
         predicted_ids = torch.argmax(logits, dim=-1)
-        transcription = self.processor.batch_decode(predicted_ids)[0]
 
-        logger.debug(f"변환된 텍스트 길이: {len(transcription)}")
+        # 입력 샘플 → 출력 프레임 비율 (패딩 포함 길이 기준)
+        frames_per_sample = logits.shape[1] / inputs["input_values"].shape[1]
+
+        ids, starts, ends = [], [], []
+        for window_ids, (start, _, core_start, core_end) in zip(predicted_ids, batch):
+            first = int(round((core_start - start) * frames_per_sample))
+            last = int(round((core_end - start) * frames_per_sample))
+            # 유지 구간 기준 프레임 → 전체 오디오 기준 초
+            frames = torch.arange(first, last + 1, dtype=torch.float64)
+            times = (start + frames / frames_per_sample) / SAMPLE_RATE
+            ids.append(window_ids[first:last])
+            starts.append(times[:-1])
+            ends.append(times[1:])
+        return torch.cat(ids), torch.cat(starts), torch.cat(ends)
 
+    def _decode_frames(self, ids, starts, ends):
+        """이어 붙인 프레임 토큰을 단어별 시작/종료 시간으로 변환"""
+        tokenizer = self.processor.tokenizer
+        word_tokens, start_frames, end_frames = ctc_word_alignments(
+            ids, tokenizer.pad_token_id, tokenizer.word_delimiter_token_id
+        )
+        start_times = starts[start_frames.long()].tolist()
+        end_times = ends[end_frames.long() - 1].tolist()
         return [
             {
-                "start": 0,
-                "end": len(speech_array) / target_sample_rate,
-                "text": transcription,
+                "start": word_start,
+                "end": word_end,
+                "text": "".join(tokenizer.convert_ids_to_tokens(tokens)),
             }
+            for tokens, word_start, word_end in zip(word_tokens, start_times, end_times)
         ]
 
-    def _diarize_speaker(self, file_name):
-        """화자 분리 수행"""
-        diar = self.pipeline(file_name)
+    def _diarize_speaker(self, audio):
+        """화자 분리 수행 (디코딩된 파형을 그대로 입력)"""
+        diar = self.pipeline(audio.to_pyannote_input())
         return diar.to_lab()
 
     def _match_segments_with_speakers(self, segments, diarization):
-        """변환된 텍스트와 화자 정보 매칭"""
-        matched_segments = []
+        """단어별 타임스탬프를 가장 많이 겹치는 화자 구간에 매칭"""
+        speakers = []
         for diar in diarization.split("\n"):
             try:
                 start_time, end_time, speaker = diar.split(" ")
-                start_time, end_time = float(start_time), float(end_time)
-                matched_segments.append(
-                    {"start": start_time, "end": end_time, "label": speaker, "text": ""}
+                speakers.append(
+                    {"start": float(start_time), "end": float(end_time), "label": speaker}
                 )
             except ValueError:
                 continue
 
-        for segment in segments:
-            for diar in matched_segments:
-                if diar["start"] <= segment["start"] <= diar["end"]:
-                    diar["text"] += segment["text"] + " "
-
-        return [item for item in matched_segments if item["text"]]
+        return match_segments_with_speakers(segments, speakers)
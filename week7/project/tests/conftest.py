@@ -0,0 +1,23 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import yaml
+
+# 테스트 로그가 프로젝트의 logs/에 쌓이지 않도록 로그 디렉토리만 임시 디렉토리로 바꾼 설정을 사용한다.
+# common.settings가 import될 때 SPEECHNOTE_CONFIG를 읽으므로 테스트 모듈보다 먼저 설정하며,
+# 작업 프로세스도 환경변수를 물려받아 같은 설정을 쓴다.
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TEST_DIR = tempfile.mkdtemp(prefix="speechnote-test-")
+
+with open(os.path.join(_PROJECT_DIR, "config.yml"), "r", encoding="utf-8") as f:
+    _config = yaml.safe_load(f)
+_config["logging"]["directory"] = os.path.join(_TEST_DIR, "logs")
+_config_path = os.path.join(_TEST_DIR, "config.yml")
+with open(_config_path, "w", encoding="utf-8") as f:
+    yaml.safe_dump(_config, f, allow_unicode=True)
+os.environ["SPEECHNOTE_CONFIG"] = _config_path
+
+# 로그 리스너(atexit)가 남은 로그를 기록한 뒤에 지워지도록 가장 먼저 등록한다
+atexit.register(shutil.rmtree, _TEST_DIR, ignore_errors=True)
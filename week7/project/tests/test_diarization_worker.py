@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from model import diarization_worker
+from model.registry import ModelRegistry
+
+
+class FakeDiarization:
+    def to_lab(self):
+        return "0.000 1.000 SPEAKER_00\n"
+
+
+@pytest.fixture
+def worker(monkeypatch, tmp_path):
+    """모델 로드 횟수를 세는 가짜 레지스트리/파이프라인으로 바꾼 작업 프로세스 모듈"""
+    registry = ModelRegistry()
+    loads = []
+
+    def get_pipeline(hf_token):
+        def load():
+            loads.append(hf_token)
+            return lambda waveform, num_speakers: FakeDiarization()
+
+        return registry.get("pyannote", load)
+
+    settings = {"models": {"idle_timeout_sec": 1800, "min_available_memory_mb": 0}}
+    monkeypatch.setattr(diarization_worker, "registry", registry)
+    monkeypatch.setattr(diarization_worker, "get_diarization_pipeline", get_pipeline)
+    monkeypatch.setattr(diarization_worker, "get_settings", lambda: settings)
+    monkeypatch.setattr(diarization_worker, "init_worker_logging", lambda log_queue: None)
+
+    pcm_path = tmp_path / "audio.f32"
+    np.zeros(16000, dtype=np.float32).tofile(pcm_path)
+    yield diarization_worker, registry, settings, loads, str(pcm_path)
+    if diarization_worker._collect_timer is not None:
+        diarization_worker._collect_timer.cancel()
+
+
+def test_pipeline_reloaded_after_collect(worker):
+    module, registry, settings, loads, pcm_path = worker
+    module.init_worker("token")
+    module.diarize_pcm(pcm_path, 16000, 2)
+    assert loads == ["token"]
+    assert registry.loaded() == ["pyannote"]
+
+    # 유휴 시간이 지나 해제되면 다음 작업에서 다시 로드
+    settings["models"]["idle_timeout_sec"] = -1
+    module._collect_models()
+    assert registry.loaded() == []
+
+    lab, _ = module.diarize_pcm(pcm_path, 16000, 2)
+    assert lab.startswith("0.000 1.000")
+    assert loads == ["token", "token"]
+
+
+def test_idle_timer_collects_after_last_job(worker):
+    module, registry, settings, loads, pcm_path = worker
+    settings["models"]["idle_timeout_sec"] = 0.5
+    module.init_worker("token")
+    module.diarize_pcm(pcm_path, 16000, 2)
+    assert registry.loaded() == ["pyannote"]
+
+    module._collect_timer.join(timeout=5)
+    assert registry.loaded() == []
@@ -0,0 +1,109 @@
+import os
+import time
+import uuid
+
+import pytest
+
+from common.job_queue import MAX_ATTEMPTS, JobQueue, JobStatus, read_job, write_job
+
+
+def _succeed(params, progress):
+    progress(1, 1, "work")
+    return {"value": params["value"] * 2}
+
+
+def _raise(params, progress):
+    raise ValueError("bad input")
+
+
+def _crash(params, progress):
+    # 작업 프로세스 비정상 종료 (BrokenProcessPool)
+    os._exit(1)
+
+
+HANDLERS = {"succeed": _succeed, "raise": _raise, "crash": _crash}
+
+
+def wait_for(queue, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (JobStatus.DONE, JobStatus.FAILED):
+            return job
+        time.sleep(0.1)
+    pytest.fail(f"작업이 끝나지 않음: {queue.get(job_id)}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path, max_workers=1, handlers=HANDLERS)
+    yield queue
+    queue.shutdown()
+
+
+def test_done_job_records_result(queue):
+    job = wait_for(queue, queue.submit("succeed", {"value": 21}))
+
+    assert job["status"] == JobStatus.DONE
+    assert job["result"] == {"value": 42}
+    assert job["progress"] == {"done": 1, "total": 1, "stage": "work"}
+    assert job["attempts"] == 1
+
+
+def test_handler_error_marks_failed(queue):
+    job = wait_for(queue, queue.submit("raise", {}))
+
+    assert job["status"] == JobStatus.FAILED
+    assert job["error"] == "ValueError: bad input"
+
+
+def test_worker_crash_marks_failed_and_pool_recovers(queue):
+    job = wait_for(queue, queue.submit("crash", {}))
+
+    assert job["status"] == JobStatus.FAILED
+    assert job["error"].startswith("BrokenProcessPool")
+
+    # 풀이 깨진 뒤에도 다음 작업은 새 풀에서 실행된다
+    job = wait_for(queue, queue.submit("succeed", {"value": 1}))
+    assert job["status"] == JobStatus.DONE
+
+
+def make_unfinished(jobs_dir, attempts):
+    state = {
+        "id": uuid.uuid4().hex,
+        "kind": "succeed",
+        "params": {"value": 5},
+        "status": JobStatus.RUNNING,
+        "progress": {"done": 0, "total": 0, "stage": None},
+        "result": None,
+        "error": None,
+        "attempts": attempts,
+        "created_at": time.time(),
+    }
+    write_job(str(jobs_dir), state)
+    return state["id"]
+
+
+def test_resume_reruns_unfinished_job(tmp_path):
+    job_id = make_unfinished(tmp_path, attempts=MAX_ATTEMPTS - 1)
+
+    queue = JobQueue(tmp_path, max_workers=1, handlers=HANDLERS)
+    try:
+        job = wait_for(queue, job_id)
+    finally:
+        queue.shutdown()
+
+    assert job["status"] == JobStatus.DONE
+    assert job["attempts"] == MAX_ATTEMPTS
+
+
+def test_resume_gives_up_after_max_attempts(tmp_path):
+    job_id = make_unfinished(tmp_path, attempts=MAX_ATTEMPTS)
+
+    queue = JobQueue(tmp_path, max_workers=1, handlers=HANDLERS)
+    queue.shutdown()
+
+    job = read_job(str(tmp_path), job_id)
+    assert job["status"] == JobStatus.FAILED
+    assert job["attempts"] == MAX_ATTEMPTS
+    assert job["result"] is None
@@ -0,0 +1,56 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from common.logger_config import get_log_queue, init_worker_logging, setup_logger
+
+
+def _spawn_pool(log_queue):
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker_logging,
+        initargs=(log_queue,),
+    )
+
+
+def _log_in_worker(message):
+    logger = setup_logger()
+    logger.info(message)
+    return [type(handler).__name__ for handler in logger.handlers]
+
+
+def _log_in_nested_worker(message):
+    """작업 프로세스가 만든 작업 프로세스에서 로그 기록"""
+    setup_logger().info(f"{message} (parent)")
+    with _spawn_pool(get_log_queue()) as executor:
+        return executor.submit(_log_in_worker, f"{message} (child)").result()
+
+
+def _drain(log_queue, count):
+    return [log_queue.get(timeout=30).getMessage() for _ in range(count)]
+
+
+def test_worker_logs_only_to_parent_queue():
+    log_queue = multiprocessing.get_context("spawn").Queue()
+    with _spawn_pool(log_queue) as executor:
+        handlers = executor.submit(_log_in_worker, "hello").result()
+
+    assert handlers == ["QueueHandler"]
+    assert _drain(log_queue, 1) == ["hello"]
+
+
+def test_nested_worker_logs_reach_same_queue():
+    log_queue = multiprocessing.get_context("spawn").Queue()
+    with _spawn_pool(log_queue) as executor:
+        handlers = executor.submit(_log_in_nested_worker, "job").result()
+
+    assert handlers == ["QueueHandler"]
+    assert sorted(_drain(log_queue, 2)) == ["job (child)", "job (parent)"]
+
+
+def test_main_process_owns_file_handler():
+    log_queue = get_log_queue()
+    assert log_queue is not None
+    handler = logging.getLogger("SpeechNote").handlers[0]
+    assert handler.queue is log_queue
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from common import metrics as metrics_module
+from common.metrics import Metrics, current_rss_mb
+
+ALLOC_MB = 200
+
+
+def test_sampler_records_peak_between_spans():
+    metrics = Metrics("test")
+    metrics.start_sampling(0.01)
+    data = np.ones(ALLOC_MB * 1024 * 1024 // 8)  # span 밖에서 잠깐 쓰고 해제
+    time.sleep(0.2)
+    del data
+    metrics.stop_sampling()
+
+    assert metrics.peak_rss_mb >= current_rss_mb() + ALLOC_MB * 0.8
+    assert metrics._sampler is None
+
+
+def test_peak_is_per_job():
+    data = np.ones(ALLOC_MB * 1024 * 1024 // 8)
+    first = Metrics("first")
+    del data
+    second = Metrics("second")
+
+    assert second.peak_rss_mb < first.peak_rss_mb - ALLOC_MB * 0.8
+
+
+@pytest.mark.skipif(metrics_module.psutil is None, reason="psutil 필요")
+def test_rss_includes_child_processes():
+    before = current_rss_mb()
+    child = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, time; data = bytearray({ALLOC_MB} * 1024 * 1024); "
+            "print('ready', flush=True); time.sleep(30)",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert child.stdout.readline().strip() == "ready"
+        assert current_rss_mb() >= before + ALLOC_MB * 0.8
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,33 @@
+import os
+
+from common.result_cache import ResultCache
+
+
+def test_set_scans_directory_only_once_under_limit(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path), max_size_mb=1)
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda *args: walks.append(args) or real_walk(*args))
+
+    for i in range(20):
+        cache.set("asr", f"key{i:02d}", {"text": "x" * 100})
+    cache.set("asr", "key00", {"text": "y" * 200})
+
+    assert len(walks) == 1
+    assert cache._size == sum(entry[1] for entry in cache._scan())
+
+
+def test_evicts_least_recently_used_over_limit(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size_mb=3500 / (1024 * 1024))
+    value = {"text": "x" * 1000}
+    for i in range(3):
+        cache.set("asr", f"key{i}", value)
+        os.utime(cache._path("asr", f"key{i}"), (i, i))
+    cache.get("asr", "key0")  # key0을 가장 최근 사용으로 갱신
+
+    cache.set("asr", "key3", value)
+
+    assert cache.get("asr", "key1") is None
+    assert cache.get("asr", "key0") == value
+    assert cache.get("asr", "key3") == value
+    assert cache._size <= cache.max_size
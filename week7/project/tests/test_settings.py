@@ -0,0 +1,32 @@
+import pytest
+import yaml
+
+from common.settings import CONFIG_PATH, SettingsError, load_settings, wav_chunk_mb
+
+
+def write_config(tmp_path, **audio):
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data["transcriber"]["audio"].update(audio)
+    path = tmp_path / "config.yml"
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    return str(path)
+
+
+def test_default_config_chunk_fits_upload_size():
+    audio = load_settings()["transcriber"]["audio"]
+    chunk_mb = wav_chunk_mb(audio["split_length_min"], audio["sample_rate"])
+    assert chunk_mb <= audio["target_size_mb"]
+
+
+@pytest.mark.parametrize("split_length_min", [10, 10.4])
+def test_split_length_within_upload_size(tmp_path, split_length_min):
+    path = write_config(tmp_path, split_length_min=split_length_min, target_size_mb=20)
+    assert load_settings(path)["transcriber"]["audio"]["split_length_min"] == split_length_min
+
+
+@pytest.mark.parametrize("split_length_min", [0, 11, 15])
+def test_split_length_over_upload_size_rejected(tmp_path, split_length_min):
+    path = write_config(tmp_path, split_length_min=split_length_min, target_size_mb=20)
+    with pytest.raises(SettingsError, match="split_length_min"):
+        load_settings(path)
@@ -0,0 +1,184 @@
+import hashlib
+import threading
+import types
+
+import pytest
+
+import common.utils
+import model.transcriber
+from common.metrics import Metrics
+from common.result_cache import ResultCache
+from common.utils import count_tokens
+from model.transcriber import MAX_REDUCE_LEVELS, Transcriber
+
+MAP_PROMPT = "map"
+REDUCE_PROMPT = "reduce"
+FINAL_PROMPT = "final"
+
+
+class FakeCompletions:
+    """프롬프트별로 정해진 단어 수의 요약을 돌려주는 채팅 API 대역
+
+    요약 첫 단어는 입력 해시라서 입력이 다르면 요약도 달라진다(캐시 충돌 방지).
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self.calls = {MAP_PROMPT: 0, REDUCE_PROMPT: 0, FINAL_PROMPT: 0}
+        self.lock = threading.Lock()
+
+    def create(self, model, messages):
+        prompt, text = messages[0]["content"].split("\n\n", 1)
+        with self.lock:
+            self.calls[prompt] += 1
+        digest = hashlib.sha256(text.encode()).hexdigest()[:8]
+        content = " ".join([f"{prompt}-{digest}"] + ["w"] * (self.words[prompt] - 1))
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+class FakeTranscriber(Transcriber):
+    def __init__(self, completions, cache_dir, metrics_dir, budget=10):
+        self.metrics = Metrics("test")
+        self.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        self.cache = ResultCache(cache_dir, max_size_mb=10)
+        self.transcripts = []
+        self._config = {
+            "transcriber": {
+                "openai": {"models": {"default": "gpt-4o-mini"}},
+                "concurrency": {"max_workers": 4, "max_retries": 0, "retry_backoff_sec": 0},
+                "summary_prompt": FINAL_PROMPT,
+                "summary": {
+                    "chunk_tokens": budget,
+                    "max_workers": 4,
+                    "map_prompt": MAP_PROMPT,
+                    "reduce_prompt": REDUCE_PROMPT,
+                },
+            },
+            "metrics": {"dir": str(metrics_dir), "memory_sample_sec": 0.5},
+        }
+
+    @property
+    def config(self):
+        return self._config
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    """토큰 수를 단어 수로 고정해 청크 경계를 예측 가능하게 만든다"""
+    monkeypatch.setattr(
+        model.transcriber, "count_tokens", lambda text, model=None: len(text.split())
+    )
+
+
+def make_transcriber(tmp_path, words, utterances):
+    completions = FakeCompletions(words)
+    transcriber = FakeTranscriber(completions, tmp_path / "cache", tmp_path / "metrics")
+    # 발화 1개 = "S1: u{i} b c d" 5단어 -> 예산 10이면 청크당 발화 2개
+    transcriber.transcripts = [
+        {"label": "S1", "text": f"u{i} b c d"} for i in range(utterances)
+    ]
+    return transcriber, completions
+
+
+def test_single_chunk_skips_map_and_reduce(tmp_path):
+    words = {MAP_PROMPT: 4, REDUCE_PROMPT: 3, FINAL_PROMPT: 2}
+    transcriber, completions = make_transcriber(tmp_path, words, utterances=2)
+
+    summary = transcriber.summarize()
+
+    assert summary.startswith(FINAL_PROMPT)
+    assert completions.calls == {MAP_PROMPT: 0, REDUCE_PROMPT: 0, FINAL_PROMPT: 1}
+
+
+def test_map_then_final_when_partials_fit_budget(tmp_path):
+    # 청크 2개 -> 구간 요약 2개(4단어씩) = 8단어 <= 예산 10
+    words = {MAP_PROMPT: 4, REDUCE_PROMPT: 3, FINAL_PROMPT: 2}
+    transcriber, completions = make_transcriber(tmp_path, words, utterances=4)
+
+    transcriber.summarize()
+
+    assert transcriber.metrics.to_dict()["counters"].get("summary_cache_hits") is None
+    assert completions.calls == {MAP_PROMPT: 2, REDUCE_PROMPT: 0, FINAL_PROMPT: 1}
+
+
+def test_multi_level_reduce(tmp_path):
+    # 청크 8개 -> 구간 요약 8개(4단어) -> 2개씩 합쳐 4개(3단어) -> 3+1로 합쳐 2개 -> 6단어
+    words = {MAP_PROMPT: 4, REDUCE_PROMPT: 3, FINAL_PROMPT: 2}
+    transcriber, completions = make_transcriber(tmp_path, words, utterances=16)
+
+    transcriber.summarize()
+
+    assert completions.calls == {MAP_PROMPT: 8, REDUCE_PROMPT: 4 + 2, FINAL_PROMPT: 1}
+
+
+def test_reduce_stops_at_max_levels(tmp_path):
+    # 구간 요약이 예산을 넘게 길어 매 단계 줄어들지 않아도 MAX_REDUCE_LEVELS에서 멈춘다
+    words = {MAP_PROMPT: 6, REDUCE_PROMPT: 6, FINAL_PROMPT: 2}
+    transcriber, completions = make_transcriber(tmp_path, words, utterances=8)
+
+    summary = transcriber.summarize()
+
+    assert summary.startswith(FINAL_PROMPT)
+    assert completions.calls == {
+        MAP_PROMPT: 4,
+        REDUCE_PROMPT: 4 * MAX_REDUCE_LEVELS,
+        FINAL_PROMPT: 1,
+    }
+
+
+def test_summary_cache_reuses_unchanged_chunks(tmp_path):
+    words = {MAP_PROMPT: 4, REDUCE_PROMPT: 3, FINAL_PROMPT: 2}
+    transcriber, completions = make_transcriber(tmp_path, words, utterances=4)
+
+    first = transcriber.summarize()
+    assert transcriber.summarize() == first
+    assert completions.calls == {MAP_PROMPT: 2, REDUCE_PROMPT: 0, FINAL_PROMPT: 1}
+    assert transcriber.metrics.to_dict()["counters"]["summary_cache_hits"] == 3
+    assert "llm_requests" not in transcriber.metrics.to_dict()["counters"]
+
+    # 세션이 추가되면 새 청크와 그 뒤의 합치기·최종 요약만 다시 요청한다
+    transcriber.transcripts.append({"label": "S2", "text": "u9 b c d"})
+    transcriber.summarize()
+    assert completions.calls == {MAP_PROMPT: 3, REDUCE_PROMPT: 2, FINAL_PROMPT: 2}
+    assert transcriber.metrics.to_dict()["counters"]["summary_cache_hits"] == 2
+
+
+class FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+
+class FakeTiktoken:
+    """encoding_for_model(None)에서 AttributeError를 내는 tiktoken 대역"""
+
+    def __init__(self):
+        self.requested = []
+
+    def encoding_for_model(self, model):
+        self.requested.append(model)
+        if model is None:
+            raise AttributeError("'NoneType' object has no attribute 'startswith'")
+        if model != "gpt-4o-mini":
+            raise KeyError(model)
+        return FakeEncoding()
+
+    def get_encoding(self, name):
+        assert name == "cl100k_base"
+        return FakeEncoding()
+
+
+@pytest.mark.parametrize("model", [None, "gpt-4o-mini", "unknown-model"])
+def test_count_tokens_with_tiktoken(monkeypatch, model):
+    fake = FakeTiktoken()
+    monkeypatch.setattr(common.utils, "tiktoken", fake)
+
+    assert count_tokens("a b c", model=model) == 3
+    # 모델이 없으면 encoding_for_model을 부르지 않는다
+    assert fake.requested == ([] if model is None else [model])
+
+
+def test_count_tokens_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(common.utils, "tiktoken", None)
+
+    assert count_tokens("가나다") == 4
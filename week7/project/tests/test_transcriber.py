@@ -0,0 +1,97 @@
+import threading
+import time
+import types
+
+import pytest
+
+from common.metrics import Metrics
+from model.transcriber import Transcriber, is_transient_error
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FakeTranscriptions:
+    """지정한 횟수만큼 오류를 낸 뒤 세그먼트 하나를 돌려주는 API 대역"""
+
+    def __init__(self, error, failures):
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def create(self, file, **kwargs):
+        with self.lock:
+            self.calls += 1
+            fail = self.calls <= self.failures
+        time.sleep(0.01)
+        if fail:
+            raise self.error
+        segment = {"start": 0.0, "end": 1.0, "text": file[0]}
+        return types.SimpleNamespace(segments=[segment])
+
+
+class FakeTranscriber(Transcriber):
+    def __init__(self, transcriptions):
+        self.metrics = Metrics("test")
+        self.client = types.SimpleNamespace(
+            audio=types.SimpleNamespace(transcriptions=transcriptions)
+        )
+        self._config = {
+            "transcriber": {
+                "openai": {"transcript_model": "whisper-1"},
+                "concurrency": {"max_workers": 4, "max_retries": 3, "retry_backoff_sec": 0.5},
+            }
+        }
+
+    @property
+    def config(self):
+        return self._config
+
+
+def make_chunks(count):
+    return [(i, f"chunk_{i}.wav", b"data") for i in range(count)]
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (StatusError(401), False),
+        (StatusError(400), False),
+        (StatusError(429), True),
+        (StatusError(503), True),
+        (TimeoutError(), True),
+        (ValueError(), False),
+    ],
+)
+def test_is_transient_error(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_permanent_error_fails_fast_without_retry():
+    transcriptions = FakeTranscriptions(StatusError(401), failures=100)
+    transcriber = FakeTranscriber(transcriptions)
+
+    begin = time.perf_counter()
+    with pytest.raises(StatusError):
+        transcriber._transcribe_chunks(make_chunks(25))
+
+    # 진행 중이던 요청(작업자 수)까지만 보내고 재시도/백오프 없이 중단
+    assert transcriptions.calls <= 4
+    assert time.perf_counter() - begin < 0.5
+    assert transcriber.metrics.counters.get("asr_retries", 0) == 0
+
+
+def test_transient_error_is_retried():
+    transcriptions = FakeTranscriptions(StatusError(429), failures=1)
+    transcriber = FakeTranscriber(transcriptions)
+    transcriber._config["transcriber"]["concurrency"]["retry_backoff_sec"] = 0.01
+
+    results = transcriber._transcribe_chunks(make_chunks(3))
+
+    assert sorted(results) == [0, 1, 2]
+    assert results[1][0]["text"] == "chunk_1.wav"
+    assert transcriptions.calls == 4
@@ -0,0 +1,95 @@
+import json
+
+from common.file_manager import FileManager
+from common.transcript_writer import IncrementalTranscriptWriter
+from common.utils import match_segments_with_speakers
+
+# 두 번째, 네 번째 화자 구간이 청크 경계(10초, 20초)를 넘는다
+DIARIZATION = [
+    {"start": 0.0, "end": 4.0, "label": "A"},
+    {"start": 4.0, "end": 13.0, "label": "B"},
+    {"start": 13.0, "end": 16.0, "label": "A"},
+    {"start": 16.0, "end": 30.0, "label": "B"},
+]
+
+
+def make_chunks():
+    """10초 청크 3개로 나눈 1초 단위 세그먼트"""
+    segments = [
+        {"start": float(t), "end": t + 1.0, "text": f"w{t}"} for t in range(30)
+    ]
+    return [segments[0:10], segments[10:20], segments[20:30]]
+
+
+def open_writer(tmp_path, key="key"):
+    return IncrementalTranscriptWriter(
+        FileManager(str(tmp_path)),
+        str(tmp_path / "note.jsonl"),
+        key,
+        match_segments_with_speakers,
+    )
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_turn_across_chunks_is_written_once(tmp_path):
+    chunks = make_chunks()
+    writer = open_writer(tmp_path)
+    writer.set_diarization(DIARIZATION)
+    for index, segments in reversed(list(enumerate(chunks))):
+        writer.add_chunk(index, segments)
+    writer.finish(len(chunks))
+
+    expected = match_segments_with_speakers(sum(chunks, []), DIARIZATION)
+    assert read_lines(tmp_path / "note.jsonl") == expected
+    assert len(writer.store) == len(expected)
+
+
+def test_resume_keeps_open_turn(tmp_path):
+    chunks = make_chunks()
+    writer = open_writer(tmp_path)
+    writer.set_diarization(DIARIZATION)
+    writer.add_chunk(0, chunks[0])
+
+    # 중단 후 같은 입력으로 재개
+    writer = open_writer(tmp_path)
+    assert writer.committed == 0
+    writer.set_diarization(DIARIZATION)
+    writer.add_chunk(1, chunks[1])
+    writer.add_chunk(2, chunks[2])
+    writer.finish(len(chunks))
+
+    expected = match_segments_with_speakers(sum(chunks, []), DIARIZATION)
+    assert read_lines(tmp_path / "note.jsonl") == expected
+
+
+def test_existing_note_kept_until_new_run_finishes(tmp_path):
+    chunks = make_chunks()
+    writer = open_writer(tmp_path, key="old")
+    writer.set_diarization(DIARIZATION)
+    writer.add_chunk(0, chunks[0])
+    writer.finish(1)
+    old = read_lines(tmp_path / "note.jsonl")
+
+    # 다른 입력으로 다시 변환하다 중단되어도 기존 노트는 그대로
+    writer = open_writer(tmp_path, key="new")
+    writer.set_diarization(DIARIZATION)
+    writer.add_chunk(0, chunks[0])
+    writer.add_chunk(1, chunks[1])
+    assert read_lines(tmp_path / "note.jsonl") == old
+
+    writer = open_writer(tmp_path, key="new")
+    assert writer.committed == 1
+    writer.set_diarization(DIARIZATION)
+    writer.add_chunk(2, chunks[2])
+    writer.finish(len(chunks))
+
+    expected = match_segments_with_speakers(sum(chunks, []), DIARIZATION)
+    assert read_lines(tmp_path / "note.jsonl") == expected
+    assert not (tmp_path / "note.jsonl.partial").exists()
+    store = FileManager(str(tmp_path)).open_transcript(str(tmp_path / "note.jsonl"))
+    assert len(store) == len(expected)
+    assert open_writer(tmp_path, key="new").complete
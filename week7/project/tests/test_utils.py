@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from benchmark.match_benchmark import naive_match_segments_with_speakers
+from common.utils import match_segments_with_speakers
+
+
+def random_case(rng, num_segments, num_turns, duration=60):
+    """정수 격자 시간으로 겹침 동률, 길이 0 세그먼트, 겹치는/긴 화자 구간을 자주 만든다"""
+    diarization = []
+    for _ in range(num_turns):
+        start = rng.randint(0, duration)
+        length = rng.choice([0, 1, 2, 3, 5, 8, duration])
+        diarization.append(
+            {"start": float(start), "end": float(start + length), "label": f"S{rng.randint(0, 2)}"}
+        )
+    segments = []
+    for i in range(num_segments):
+        start = rng.randint(0, duration) / rng.choice([1, 2])
+        length = rng.choice([0, 0.5, 1, 2, 4])
+        segments.append({"start": start, "end": start + length, "text": f" w{i} "})
+    if rng.random() < 0.5:
+        segments.sort(key=lambda segment: segment["start"])
+    return segments, diarization
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_naive_on_random_inputs(seed):
+    rng = random.Random(seed)
+    segments, diarization = random_case(rng, rng.randint(0, 40), rng.randint(0, 15))
+
+    assert match_segments_with_speakers(segments, diarization) == (
+        naive_match_segments_with_speakers(segments, diarization)
+    )
+
+
+def test_tie_prefers_earlier_turn():
+    diarization = [
+        {"start": 2.0, "end": 6.0, "label": "B"},
+        {"start": 0.0, "end": 4.0, "label": "A"},
+    ]
+    segments = [{"start": 2.0, "end": 4.0, "text": "tie"}]
+
+    result = match_segments_with_speakers(segments, diarization)
+
+    assert [item["label"] for item in result] == ["B"]
+
+
+def test_long_turn_matches_naive():
+    diarization = [{"start": 0.0, "end": 1000.0, "label": "A"}] + [
+        {"start": float(t), "end": float(t) + 0.9, "label": "B"} for t in range(1, 999)
+    ]
+    segments = [
+        {"start": t + 0.1, "end": t + 0.5, "text": f"w{t}"} for t in range(1, 999)
+    ]
+
+    result = match_segments_with_speakers(segments, diarization)
+
+    assert result == naive_match_segments_with_speakers(segments, diarization)
@@ -0,0 +1,110 @@
+import types
+
+import numpy as np
+import pytest
+import torch
+
+from common.metrics import Metrics
+from model.word2back_transcriber import SAMPLE_RATE, Word2backTranscriber
+
+SAMPLES_PER_FRAME = 320  # Wav2Vec2 출력 프레임 간격 (20ms)
+VOCAB = ["<pad>", "<s>", "</s>", "<unk>", "|", "D", "E", "H", "L", "O", "R", "W"]
+TOKEN_ID = {token: i for i, token in enumerate(VOCAB)}
+
+
+class FakeTokenizer:
+    pad_token_id = TOKEN_ID["<pad>"]
+    word_delimiter_token_id = TOKEN_ID["|"]
+
+    def convert_ids_to_tokens(self, ids):
+        return [VOCAB[i] for i in ids]
+
+
+class FakeProcessor:
+    """정규화 없이 윈도우를 0으로 패딩해 묶는 전처리기"""
+
+    tokenizer = FakeTokenizer()
+
+    def __call__(self, arrays, sampling_rate, return_tensors, padding):
+        length = max(len(array) for array in arrays)
+        batch = np.zeros((len(arrays), length), dtype=np.float32)
+        for row, array in zip(batch, arrays):
+            row[: len(array)] = array
+        return {"input_values": torch.from_numpy(batch)}
+
+
+class FakeBackend:
+    """샘플 값에 새겨 둔 토큰 id를 프레임별 one-hot logits로 돌려주는 모델 대역"""
+
+    def logits(self, input_values):
+        centers = input_values[:, SAMPLES_PER_FRAME // 2 :: SAMPLES_PER_FRAME]
+        ids = torch.round(centers * 100).long()
+        return torch.nn.functional.one_hot(ids, len(VOCAB)).float()
+
+
+class FakeWord2back(Word2backTranscriber):
+    def __init__(self, batch_size):
+        self.metrics = Metrics("test")
+        self._config = {
+            "word2back": {
+                "inference": {"window_sec": 1.0, "stride_sec": 0.2, "batch_size": batch_size}
+            }
+        }
+
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def processor(self):
+        return FakeProcessor()
+
+    @property
+    def backend(self):
+        return FakeBackend()
+
+
+def make_audio(frame_tokens):
+    """프레임별 토큰 열을 샘플 값으로 새긴 가짜 오디오"""
+    ids = np.array([TOKEN_ID[token] for token in frame_tokens], dtype=np.float32)
+    samples = np.repeat(ids / 100, SAMPLES_PER_FRAME)
+    return types.SimpleNamespace(file_name="fake.wav", samples=samples, num_samples=len(samples))
+
+
+def frames(*spans):
+    """(토큰, 프레임 수) 나열 → 프레임별 토큰 열"""
+    return [token for token, count in spans for _ in range(count)]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 8])
+def test_word_across_core_boundary_is_not_split(batch_size):
+    # window 1.0s, stride 0.2s → 유지 구간은 0.6s(30프레임)마다 바뀐다.
+    # "HELLO"는 26~35 프레임에 걸쳐 첫 유지 구간 경계(30프레임)를 넘는다.
+    # (단어 종료 시간은 마지막 토큰이 시작된 프레임 + 1)
+    frame_tokens = frames(
+        ("<pad>", 26),
+        ("H", 2), ("E", 2), ("L", 2), ("<pad>", 1), ("L", 1), ("O", 2),
+        ("|", 2),
+        ("W", 2), ("O", 2), ("R", 2), ("L", 2), ("D", 2),
+        ("<pad>", 40),
+    )
+    audio = make_audio(frame_tokens)
+
+    words = FakeWord2back(batch_size)._transcribe_audio(audio)
+
+    frame_sec = SAMPLES_PER_FRAME / SAMPLE_RATE
+    assert [word["text"] for word in words] == ["HELLO", "WORLD"]
+    assert words[0]["start"] == pytest.approx(26 * frame_sec)
+    assert words[0]["end"] == pytest.approx(35 * frame_sec)
+    assert words[1]["start"] == pytest.approx(38 * frame_sec)
+    assert words[1]["end"] == pytest.approx(47 * frame_sec)
+
+
+def test_repeated_letter_split_by_boundary_stays_merged():
+    # 경계(30프레임)를 사이에 둔 같은 토큰은 한 글자로 합쳐져야 한다
+    frame_tokens = frames(("<pad>", 27), ("H", 2), ("O", 4), ("<pad>", 47))
+    audio = make_audio(frame_tokens)
+
+    words = FakeWord2back(1)._transcribe_audio(audio)
+
+    assert [word["text"] for word in words] == ["HO"]